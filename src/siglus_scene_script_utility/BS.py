@@ -1,14 +1,18 @@
 import os
 import glob
+import hashlib
 import struct
-import copy
 import time
 from . import const as C
-from .CA import absp, rd, wr, _rt, CharacterAnalizer
+from . import tracing
+from .artifacts import artifact_store
+from .CA import absp, rd, wr, _rt, _rt_compile, _rt_overlay, CharacterAnalizer
 from .IA import IncAnalyzer
 from .LA import la_analize
 from .SA import SA
-from .MA import MA
+from .MA import MA, FormTable
+from .incdeps import inc_symbols, script_deps
+from .stage_cache import make_key, open_stage_cache
 
 TNMSERR_BS_NONE = 0
 TNMSERR_BS_ILLEGAL_DEFAULT_ARG = 1
@@ -91,16 +95,39 @@ def get_elm_owner(code):
         return 0
 
 
-def _copy_replace_tree(rt):
-    if not isinstance(rt, dict):
-        return {"c": {}, "r": None}
-    return {
-        "c": {k: _copy_replace_tree(v) for k, v in rt.get("c", {}).items()},
-        "r": rt.get("r"),
-    }
+class _NameSetLayer:
+    """Set of declared names: the shared include names plus a script's own."""
+
+    __slots__ = ("base", "own")
+
+    def __init__(s, base=()):
+        s.base = base
+        s.own = set()
+
+    def __contains__(s, name):
+        return name in s.own or name in s.base
+
+    def add(s, name):
+        if name not in s.base:
+            s.own.add(name)
+
+    def __iter__(s):
+        yield from s.base
+        yield from s.own
+
+    def __len__(s):
+        return len(s.base) + len(s.own)
 
 
 def _copy_ia_data(base):
+    """
+    Per-script ia_data layered over the shared include data.
+
+    Nothing reachable from base is modified by compiling a script: the
+    replace tree, form table and name set record the script's additions in
+    their own layer, and the property/command lists are shallow copies
+    (include entries are only read).
+    """
     if not isinstance(base, dict):
         return {
             "replace_tree": _rt(),
@@ -112,12 +139,14 @@ def _copy_ia_data(base):
             "inc_property_cnt": 0,
             "inc_command_cnt": 0,
         }
+    ft = base.get("form_table")
     return {
-        "form_table": copy.deepcopy(base.get("form_table")),
-        "replace_tree": _copy_replace_tree(base.get("replace_tree")),
-        "name_set": set(base.get("name_set") or []),
-        "property_list": [copy.deepcopy(p) for p in base.get("property_list") or []],
-        "command_list": [copy.deepcopy(c) for c in base.get("command_list") or []],
+        "form_table": ft.overlay() if isinstance(ft, FormTable) else None,
+        "replace_tree": _rt_overlay(base.get("replace_tree")),
+        "replace_ac": base.get("replace_ac"),
+        "name_set": _NameSetLayer(base.get("name_set") or ()),
+        "property_list": list(base.get("property_list") or []),
+        "command_list": list(base.get("command_list") or []),
         "property_cnt": int(base.get("property_cnt", 0) or 0),
         "command_cnt": int(base.get("command_cnt", 0) or 0),
         "inc_property_cnt": int(base.get("inc_property_cnt", 0) or 0),
@@ -178,22 +207,31 @@ def build_ia_data(ctx):
         "inc_command_cnt": 0,
     }
     ia2 = []
+    ia_hash = hashlib.sha1(enc.encode("ascii"))
+    for name in sorted(iad["name_set"]):
+        ia_hash.update(b"D" + str(name).encode("utf-8", "surrogatepass") + b"\0")
     start = time.time()
     for inc in inc_list:
         inc_path = inc if os.path.isabs(inc) else os.path.join(sp, inc)
         _log_stage("IA", inc_path)
         if not os.path.isfile(inc_path):
             raise FileNotFoundError(f"inc not found: {inc_path}")
+        t = time.time()
         txt = rd(inc_path, 0, enc=enc)
+        ia_hash.update(os.path.basename(inc_path).encode("utf-8", "surrogatepass"))
+        ia_hash.update(b"\0" + txt.encode("utf-8", "surrogatepass") + b"\0")
         iad2 = {"pt": [], "pl": [], "ct": [], "cl": []}
         ia = IncAnalyzer(txt, C.FM_GLOBAL, iad, iad2)
         if not ia.step1():
             raise RuntimeError(f"{os.path.basename(inc_path)} line({ia.el}): {ia.es}")
         ia2.append((os.path.basename(inc_path), iad2))
+        tracing.record("IA", os.path.basename(inc_path), t, bytes_in=len(txt))
     for name, iad2 in ia2:
+        t = time.time()
         ia = IncAnalyzer("", C.FM_GLOBAL, iad, iad2)
         if not ia.step2():
             raise RuntimeError(f"{name} line({ia.el}): {ia.es}")
+        tracing.record("IA", name, t)
         if ctx.get("test_check"):
             wr(
                 os.path.join(
@@ -205,7 +243,13 @@ def build_ia_data(ctx):
                 0,
                 enc=enc,
             )
+    # Compiled once here and shared by every script's CA pass
+    iad["replace_ac"] = _rt_compile(iad["replace_tree"])
     _record_stage_time(ctx, "IA", time.time() - start)
+    if isinstance(ctx, dict):
+        # Identifies this include set in stage cache keys
+        ctx["ia_hash"] = ia_hash.hexdigest()
+        ctx["inc_symbols"] = inc_symbols(iad)
     return iad
 
 
@@ -236,13 +280,80 @@ def set_shuffle_seed(seed=1):
     return seed_i
 
 
-def _u16(t):
-    b = t.encode("utf-16le", "surrogatepass")
-    return [b[i] | (b[i + 1] << 8) for i in range(0, len(b), 2)]
+def get_shuffle_state():
+    return int(_MSR.x) & 0xFFFFFFFF
+
+
+def plan_shuffle_seeds(str_counts, seed=None):
+    """Walk the shuffle PRNG over per-script string counts.
+
+    Each script's string table is shuffled exactly once (in BS.compile) with a
+    list of len(str_list) entries, so the state a script starts from only
+    depends on the string counts of the scripts compiled before it.
+
+    Args:
+        str_counts: len(str_list) of each script, in compile order
+        seed: Starting PRNG state (None = current _MSR state)
+
+    Returns:
+        Tuple of (start state for each script, final state)
+    """
+    from .native_ops import msvcrand_shuffle_inplace
+
+    x = get_shuffle_state() if seed is None else int(seed) & 0xFFFFFFFF
+    seeds = []
+    for n in str_counts:
+        seeds.append(x)
+        x = msvcrand_shuffle_inplace(x, list(range(int(n or 0))))
+    return seeds, x
+
+
+def _u16_len(t):
+    return len(t.encode("utf-16le", "surrogatepass")) >> 1
+
+
+def _str_key(orig):
+    return ((28807 * orig) & 0xFFFF).to_bytes(2, "little")
+
+
+def _xor_u16(data, key):
+    """XOR every UTF-16 code unit of data with a 2-byte key, as one big int."""
+    n = len(data)
+    if not n:
+        return b""
+    x = int.from_bytes(data, "little") ^ int.from_bytes(key * (n >> 1), "little")
+    return x.to_bytes(n, "little")
+
+
+def _encode_str_pool(sl, order):
+    """
+    Encode the scene string pool.
+
+    Strings are stored in shuffled order as UTF-16LE, every code unit XORed
+    with the 16-bit key 28807 * (original index). All strings and their key
+    streams are joined and encoded once, then XORed in one pass.
 
+    Args:
+        sl: Strings in original index order
+        order: Original indices in storage order
 
-def _w_u16(b, v):
-    b.extend(struct.pack("<H", int(v) & 0xFFFF))
+    Returns:
+        (pool bytes, list of code-unit counts in original index order)
+    """
+    texts = [sl[orig] for orig in order]
+    data = "".join(texts).encode("utf-16le", "surrogatepass")
+    units = [len(t) for t in texts]
+    if len(data) != 2 * sum(units):
+        # Characters outside the BMP take two code units
+        units = [_u16_len(t) for t in texts]
+    lens = [0] * len(sl)
+    for orig, n in zip(order, units):
+        lens[orig] = n
+    if not data:
+        return b"", lens
+    key = b"".join([_str_key(orig) * n for orig, n in zip(order, units)])
+    x = int.from_bytes(data, "little") ^ int.from_bytes(key, "little")
+    return x.to_bytes(len(data), "little"), lens
 
 
 def _w_i32(b, v):
@@ -268,12 +379,17 @@ def _mk_index_list(strings):
     idx = []
     ofs = 0
     for s in strings:
-        n = len(_u16(s))
+        n = _u16_len(s)
         idx.append((ofs, n))
         ofs += n
     return idx
 
 
+_I32 = struct.Struct("<i")
+# Instruction shapes: opcode byte followed by 0, 1 or 2 i32 operands
+_OP_SHAPES = (struct.Struct("<B"), struct.Struct("<Bi"), struct.Struct("<Bii"))
+
+
 class BinaryStream:
     __slots__ = ("buf",)
 
@@ -290,16 +406,19 @@ class BinaryStream:
         return bytes(s.buf)
 
     def push_u8(s, v):
-        s.buf.extend(struct.pack("<B", int(v) & 0xFF))
+        s.buf.append(int(v) & 0xFF)
 
     def push_i32(s, v):
-        s.buf.extend(struct.pack("<i", int(v)))
+        s.buf += _I32.pack(int(v))
+
+    def push_op(s, op, *args):
+        s.buf += _OP_SHAPES[len(args)].pack(int(op) & 0xFF, *args)
 
     def write_i32_at(s, ofs, v):
-        s.buf[ofs : ofs + 4] = struct.pack("<i", int(v))
+        _I32.pack_into(s.buf, ofs, int(v))
 
     def write_u8_at(s, ofs, v):
-        s.buf[ofs : ofs + 1] = struct.pack("<B", int(v) & 0xFF)
+        s.buf[ofs] = int(v) & 0xFF
 
 
 def _build_scn_dat(piad, plad, psad, out_scn):
@@ -321,28 +440,19 @@ def _build_scn_dat(piad, plad, psad, out_scn):
             _MSR.shuffle(order)
     idx_src = out_scn.get("str_index_list") if isinstance(out_scn, dict) else None
     use_idx = isinstance(idx_src, (list, tuple)) and len(idx_src) == n
-    idx = [(0, 0)] * n
-    u16_map = {}
+    pool, lens = _encode_str_pool(sl, order)
     if use_idx:
-        for i in range(n):
-            it = idx_src[i]
-            idx[i] = (int(it[0]), int(it[1]))
-        for orig in order:
-            u16_map[orig] = _u16(sl[orig])
+        idx = [(int(it[0]), int(it[1])) for it in idx_src]
     else:
+        idx = [(0, 0)] * n
         ofs = 0
         for orig in order:
-            u = _u16(sl[orig])
-            u16_map[orig] = u
-            idx[orig] = (ofs, len(u))
-            ofs += len(u)
+            idx[orig] = (ofs, lens[orig])
+            ofs += lens[orig]
     sec("str_index_list_ofs", "str_index_cnt", len(b), n)
     _w_idx(b, idx)
     sec("str_list_ofs", "str_cnt", len(b), n)
-    for orig in order:
-        k = (28807 * orig) & 0xFFFFFFFF
-        for w in u16_map[orig]:
-            _w_u16(b, (w ^ k) & 0xFFFF)
+    b.extend(pool)
     scn = bytes(out_scn.get("scn_bytes") or b"")
     sec("scn_ofs", "scn_size", len(b), len(scn))
     b.extend(scn)
@@ -483,6 +593,9 @@ class BS:
     def scn_push_i32(s, v):
         s.out_scn["scn"].push_i32(v)
 
+    def scn_push_op(s, op, *args):
+        s.out_scn["scn"].push_op(op, *args)
+
     def scn_size(s):
         return s.out_scn["scn"].size()
 
@@ -570,8 +683,7 @@ class BS:
         return pm.get(c)
 
     def _bs_write_cd_nl(s, node_line):
-        s.scn_push_u8(C.CD_NL)
-        s.scn_push_i32(int(node_line or 0))
+        s.scn_push_op(C.CD_NL, int(node_line or 0))
         s.add_out_txt("CD_NL, " + str(int(node_line or 0)))
 
     def bs_block(s, block):
@@ -736,12 +848,12 @@ class BS:
                 if not s.bs_exp(idx, True):
                     return False
             else:
-                s.scn_push_u8(C.CD_PUSH)
-                s.scn_push_i32(_fc(C.FM_INT))
-                s.scn_push_i32(0)
-        s.scn_push_u8(getattr(C, "CD_DEC_PROP", C.CD_DEC_PROP))
-        s.scn_push_i32(_fc(form_code))
-        s.scn_push_i32(int(def_prop.get("prop_id", 0) or 0))
+                s.scn_push_op(C.CD_PUSH, _fc(C.FM_INT), 0)
+        s.scn_push_op(
+            getattr(C, "CD_DEC_PROP", C.CD_DEC_PROP),
+            _fc(form_code),
+            int(def_prop.get("prop_id", 0) or 0),
+        )
         return True
 
     def bs_def_cmd(s, def_cmd):
@@ -752,8 +864,7 @@ class BS:
             return False
         label_no_end = len(s.out_scn["label_list"])
         s.out_scn["label_list"].append(0)
-        s.scn_push_u8(C.CD_GOTO)
-        s.scn_push_i32(label_no_end)
+        s.scn_push_op(C.CD_GOTO, label_no_end)
         cmd_label = {
             "cmd_id": int(def_cmd.get("cmd_id", 0) or 0),
             "offset": s.scn_size(),
@@ -765,8 +876,7 @@ class BS:
         s.scn_push_u8(C.CD_ARG)
         if not s.bs_block(def_cmd.get("block")):
             return False
-        s.scn_push_u8(C.CD_RETURN)
-        s.scn_push_i32(0)
+        s.scn_push_op(C.CD_RETURN, 0)
         s.add_out_txt("CD_RETURN")
         s.out_scn["label_list"][label_no_end] = s.scn_size()
         inc_cnt = int(s.m_piad.get("inc_command_cnt", 0) or 0)
@@ -797,8 +907,7 @@ class BS:
                     or (gt.get("label") or {}).get("label_id", 0)
                     or 0
                 )
-                s.scn_push_u8(C.CD_GOTO)
-                s.scn_push_i32(lid)
+                s.scn_push_op(C.CD_GOTO, lid)
                 s.add_out_txt("CD_GOTO: " + str(lid))
                 return True
             else:
@@ -807,16 +916,14 @@ class BS:
                     or (gt.get("z_label") or {}).get("opt", 0)
                     or 0
                 )
-                s.scn_push_u8(C.CD_GOTO)
-                s.scn_push_i32(lid)
+                s.scn_push_op(C.CD_GOTO, lid)
                 s.add_out_txt("CD_GOTO: " + str(lid))
                 return True
         if nt in (C.NT_GOTO_GOSUB, C.NT_GOTO_GOSUBSTR):
             if not s.bs_goto_exp(gt):
                 return False
             form = C.FM_INT if nt == C.NT_GOTO_GOSUB else C.FM_STR
-            s.scn_push_u8(C.CD_POP)
-            s.scn_push_i32(_fc(form))
+            s.scn_push_op(C.CD_POP, _fc(form))
             s.add_out_txt("CD_POP, " + s.tostr_form(form))
             return True
         s.es = "Unknown goto node_type"
@@ -839,11 +946,9 @@ class BS:
             or 0
         )
         if nt == C.NT_GOTO_GOSUB:
-            s.scn_push_u8(C.CD_GOSUB)
-            s.scn_push_i32(label_no)
+            s.scn_push_op(C.CD_GOSUB, label_no)
         else:
-            s.scn_push_u8(C.CD_GOSUBSTR)
-            s.scn_push_i32(label_no)
+            s.scn_push_op(C.CD_GOSUBSTR, label_no)
         args = list((goto.get("arg_list") or {}).get("arg") or [])
         s.scn_push_i32(len(args))
         for a in args:
@@ -872,15 +977,13 @@ class BS:
         if nt == C.NT_RETURN_WITH_ARG:
             if not s.bs_exp(rt.get("exp"), True):
                 return False
-            s.scn_push_u8(C.CD_RETURN)
-            s.scn_push_i32(1)
+            s.scn_push_op(C.CD_RETURN, 1)
             form = _fc(dereference((rt.get("exp") or {}).get("node_form")))
             s.scn_push_i32(form)
             s.add_out_txt("CD_RETURN, 1, form")
             return True
         if nt == C.NT_RETURN_WITHOUT_ARG:
-            s.scn_push_u8(C.CD_RETURN)
-            s.scn_push_i32(0)
+            s.scn_push_op(C.CD_RETURN, 0)
             s.add_out_txt("CD_RETURN, 0")
             return True
         s.es = "Unknown return node_type"
@@ -905,12 +1008,10 @@ class BS:
                 s.out_scn["label_list"].append(0)
                 if not s.bs_exp(sb.get("cond"), True):
                     return False
-                s.scn_push_u8(C.CD_GOTO_FALSE)
-                s.scn_push_i32(label_no_if)
+                s.scn_push_op(C.CD_GOTO_FALSE, label_no_if)
                 if not s.bs_block(sb.get("block")):
                     return False
-                s.scn_push_u8(C.CD_GOTO)
-                s.scn_push_i32(label_no_end)
+                s.scn_push_op(C.CD_GOTO, label_no_end)
                 s.out_scn["label_list"][label_no_if] = s.scn_size()
             else:
                 if not s.bs_block(sb.get("block")):
@@ -932,20 +1033,17 @@ class BS:
         s.loop_label.append({"Continue": label_no_loop, "Break": label_no_out})
         if not s.bs_block(for_.get("init")):
             return False
-        s.scn_push_u8(C.CD_GOTO)
-        s.scn_push_i32(label_no_init)
+        s.scn_push_op(C.CD_GOTO, label_no_init)
         s.out_scn["label_list"][label_no_loop] = s.scn_size()
         if not s.bs_block(for_.get("loop")):
             return False
         s.out_scn["label_list"][label_no_init] = s.scn_size()
         if not s.bs_exp(for_.get("cond"), True):
             return False
-        s.scn_push_u8(C.CD_GOTO_FALSE)
-        s.scn_push_i32(label_no_out)
+        s.scn_push_op(C.CD_GOTO_FALSE, label_no_out)
         if not s.bs_block(for_.get("block")):
             return False
-        s.scn_push_u8(C.CD_GOTO)
-        s.scn_push_i32(label_no_loop)
+        s.scn_push_op(C.CD_GOTO, label_no_loop)
         s.out_scn["label_list"][label_no_out] = s.scn_size()
         s.loop_label.pop()
         return True
@@ -964,12 +1062,10 @@ class BS:
         s.out_scn["label_list"][label_no_loop] = s.scn_size()
         if not s.bs_exp(while_.get("cond"), True):
             return False
-        s.scn_push_u8(C.CD_GOTO_FALSE)
-        s.scn_push_i32(label_no_out)
+        s.scn_push_op(C.CD_GOTO_FALSE, label_no_out)
         if not s.bs_block(while_.get("block")):
             return False
-        s.scn_push_u8(C.CD_GOTO)
-        s.scn_push_i32(label_no_loop)
+        s.scn_push_op(C.CD_GOTO, label_no_loop)
         s.out_scn["label_list"][label_no_out] = s.scn_size()
         s.loop_label.pop()
         return True
@@ -982,8 +1078,7 @@ class BS:
                 TNMSERR_BS_CONTINUE_NO_LOOP, (cont.get("Continue") or {}).get("atom")
             )
         label_no = s.loop_label[-1].get("Continue", 0)
-        s.scn_push_u8(C.CD_GOTO)
-        s.scn_push_i32(label_no)
+        s.scn_push_op(C.CD_GOTO, label_no)
         return True
 
     def bs_break(s, brk):
@@ -994,8 +1089,7 @@ class BS:
                 TNMSERR_BS_BREAK_NO_LOOP, (brk.get("Break") or {}).get("atom")
             )
         label_no = s.loop_label[-1].get("Break", 0)
-        s.scn_push_u8(C.CD_GOTO)
-        s.scn_push_i32(label_no)
+        s.scn_push_op(C.CD_GOTO, label_no)
         return True
 
     def bs_switch(s, switch):
@@ -1017,34 +1111,27 @@ class BS:
             return False
         for idx, cs in enumerate(cases):
             form_r = _fc(dereference((cs.get("value") or {}).get("node_form")))
-            s.scn_push_u8(C.CD_COPY)
-            s.scn_push_i32(form_l)
+            s.scn_push_op(C.CD_COPY, form_l)
             if not s.bs_exp(cs.get("value"), True):
                 return False
-            s.scn_push_u8(C.CD_OPERATE_2)
-            s.scn_push_i32(form_l)
-            s.scn_push_i32(form_r)
+            s.scn_push_op(C.CD_OPERATE_2, form_l, form_r)
             s.scn_push_u8(C.OP_EQUAL)
-            s.scn_push_u8(C.CD_GOTO_TRUE)
-            s.scn_push_i32(label_no_case + idx)
-        s.scn_push_u8(C.CD_POP)
-        s.scn_push_i32(form_l)
-        s.scn_push_u8(C.CD_GOTO)
-        s.scn_push_i32(label_no_default if switch.get("Default") else label_no_out)
+            s.scn_push_op(C.CD_GOTO_TRUE, label_no_case + idx)
+        s.scn_push_op(C.CD_POP, form_l)
+        s.scn_push_op(
+            C.CD_GOTO, label_no_default if switch.get("Default") else label_no_out
+        )
         for idx, cs in enumerate(cases):
             s.out_scn["label_list"][label_no_case + idx] = s.scn_size()
-            s.scn_push_u8(C.CD_POP)
-            s.scn_push_i32(form_l)
+            s.scn_push_op(C.CD_POP, form_l)
             if not s.bs_block(cs.get("block")):
                 return False
-            s.scn_push_u8(C.CD_GOTO)
-            s.scn_push_i32(label_no_out)
+            s.scn_push_op(C.CD_GOTO, label_no_out)
         if switch.get("Default"):
             s.out_scn["label_list"][label_no_default] = s.scn_size()
             if not s.bs_block((switch.get("Default") or {}).get("block")):
                 return False
-            s.scn_push_u8(C.CD_GOTO)
-            s.scn_push_i32(label_no_out)
+            s.scn_push_op(C.CD_GOTO, label_no_out)
         s.out_scn["label_list"][label_no_out] = s.scn_size()
         return True
 
@@ -1067,14 +1154,12 @@ class BS:
         form_l = _fc(dereference((assign.get("left") or {}).get("node_form")))
         form_r = _fc(dereference((assign.get("right") or {}).get("node_form")))
         if opr_opt != C.OP_NONE:
-            s.scn_push_u8(C.CD_OPERATE_2)
-            s.scn_push_i32(form_l)
-            s.scn_push_i32(form_r)
+            s.scn_push_op(C.CD_OPERATE_2, form_l, form_r)
             s.bs_assign_operator(assign.get("equal"))
         form_r2 = _fc(dereference(assign.get("equal_form", assign.get("node_form"))))
-        s.scn_push_u8(C.CD_ASSIGN)
-        s.scn_push_i32(_fc((assign.get("left") or {}).get("node_form")))
-        s.scn_push_i32(form_r2)
+        s.scn_push_op(
+            C.CD_ASSIGN, _fc((assign.get("left") or {}).get("node_form")), form_r2
+        )
         s.scn_push_i32(int(assign.get("al_id", 0) or 0))
         s.add_out_txt(
             "CD_ASSIGN, "
@@ -1093,8 +1178,7 @@ class BS:
         if not s.bs_elm_exp(command.get("command"), True):
             return False
         form = _fc((command.get("command") or {}).get("node_form"))
-        s.scn_push_u8(C.CD_POP)
-        s.scn_push_i32(form)
+        s.scn_push_op(C.CD_POP, form)
         s.add_out_txt("CD_POP, " + s.tostr_form(form))
         return True
 
@@ -1108,11 +1192,8 @@ class BS:
         line = int(
             ((text.get("text") or text or {}).get("atom") or {}).get("line", 0) or 0
         )
-        s.scn_push_u8(C.CD_PUSH)
-        s.scn_push_i32(_fc(C.FM_STR))
-        s.scn_push_i32(opt)
-        s.scn_push_u8(C.CD_TEXT)
-        s.scn_push_i32(s.cur_read_flag_no)
+        s.scn_push_op(C.CD_PUSH, _fc(C.FM_STR), opt)
+        s.scn_push_op(C.CD_TEXT, s.cur_read_flag_no)
         s.cur_read_flag_no += 1
         s.out_scn["read_flag_list"].append({"line_no": line})
         s.add_out_txt("CD_TEXT")
@@ -1159,8 +1240,7 @@ class BS:
             if not s.bs_exp(exp.get("exp_1"), True):
                 return False
             form = _fc(dereference((exp.get("exp_1") or {}).get("node_form")))
-            s.scn_push_u8(C.CD_OPERATE_1)
-            s.scn_push_i32(form)
+            s.scn_push_op(C.CD_OPERATE_1, form)
             s.add_out_txt("CD_OPERATE_1")
             return s.bs_operator_1(exp.get("opr"))
         if nt == C.NT_EXP_OPR2:
@@ -1172,9 +1252,7 @@ class BS:
                 return False
             form_l = _fc(dereference((exp.get("exp_1") or {}).get("node_form")))
             form_r = _fc(dereference((exp.get("exp_2") or {}).get("node_form")))
-            s.scn_push_u8(C.CD_OPERATE_2)
-            s.scn_push_i32(form_l)
-            s.scn_push_i32(form_r)
+            s.scn_push_op(C.CD_OPERATE_2, form_l, form_r)
             s.add_out_txt("CD_OPERATE_2")
             return s.bs_operator_2(exp.get("opr"))
         s.es = "Unknown expression node_type"
@@ -1246,9 +1324,9 @@ class BS:
             return False
         nt = int(element.get("node_type", 0) or 0)
         if nt == C.NT_ELM_ELEMENT:
-            s.scn_push_u8(C.CD_PUSH)
-            s.scn_push_i32(_fc(C.FM_INT))
-            s.scn_push_i32(_to_int(element.get("element_code", 0) or 0))
+            s.scn_push_op(
+                C.CD_PUSH, _fc(C.FM_INT), _to_int(element.get("element_code", 0) or 0)
+            )
             s.add_out_txt(
                 "CD_PUSH, "
                 + s.tostr_form(C.FM_INT)
@@ -1279,8 +1357,7 @@ class BS:
                         tf = (ta or {}).get("form")
                         if tf in (C.FM___ARGS, C.FM___ARGSREF):
                             break
-                        s.scn_push_u8(C.CD_PUSH)
-                        s.scn_push_i32(_fc(tf))
+                        s.scn_push_op(C.CD_PUSH, _fc(tf))
                         if tf == C.FM_INT:
                             s.scn_push_i32(int((ta or {}).get("def_int", 0) or 0))
                         else:
@@ -1289,9 +1366,9 @@ class BS:
                                 (element.get("name") or {}).get("atom"),
                             )
                         arg_cnt += 1
-                s.scn_push_u8(C.CD_COMMAND)
-                s.scn_push_i32(int(element.get("arg_list_id", 0) or 0))
-                s.scn_push_i32(int(arg_cnt))
+                s.scn_push_op(
+                    C.CD_COMMAND, int(element.get("arg_list_id", 0) or 0), int(arg_cnt)
+                )
                 if isinstance(temp_args, list) and len(arg_list.get("arg") or []) < len(
                     temp_args
                 ):
@@ -1320,9 +1397,7 @@ class BS:
                 s.scn_push_i32(_fc(element.get("node_form")))
             return True
         if nt == C.NT_ELM_ARRAY:
-            s.scn_push_u8(C.CD_PUSH)
-            s.scn_push_i32(_fc(C.FM_INT))
-            s.scn_push_i32(int(C.ELM_ARRAY))
+            s.scn_push_op(C.CD_PUSH, _fc(C.FM_INT), int(C.ELM_ARRAY))
             s.add_out_txt("CD_PUSH, " + s.tostr_form(C.FM_INT) + ", ELM_ARRAY")
             s.bs_exp(element.get("exp"), True)
             return True
@@ -1344,9 +1419,7 @@ class BS:
             if not isinstance(cur, int):
                 s.es = "Missing ELM_GLOBAL_CUR_CALL"
                 return False
-            s.scn_push_u8(C.CD_PUSH)
-            s.scn_push_i32(_fc(C.FM_INT))
-            s.scn_push_i32(int(cur))
+            s.scn_push_op(C.CD_PUSH, _fc(C.FM_INT), int(cur))
             s.add_out_txt("CD_PUSH, " + s.tostr_form(C.FM_INT) + ", " + str(int(cur)))
         for el in elm_list.get("element") or []:
             if not s.bs_element(el):
@@ -1479,8 +1552,7 @@ class BS:
             else None
         )
         if form == C.FM_LABEL:
-            s.scn_push_u8(C.CD_PUSH)
-            s.scn_push_i32(_fc(C.FM_INT))
+            s.scn_push_op(C.CD_PUSH, _fc(C.FM_INT))
             s.scn_push_i32(
                 int(opt if opt is not None else Literal.get("label_id", 0) or 0)
             )
@@ -1491,8 +1563,7 @@ class BS:
                 + str(int(opt if opt is not None else Literal.get("label_id", 0) or 0))
             )
         else:
-            s.scn_push_u8(C.CD_PUSH)
-            s.scn_push_i32(_fc(form))
+            s.scn_push_op(C.CD_PUSH, _fc(form))
             s.scn_push_i32(
                 int(
                     opt
@@ -1528,15 +1599,12 @@ class BS:
 
     def bs_push_msg_block(s):
         s.scn_push_u8(C.CD_ELM_POINT)
-        s.scn_push_u8(C.CD_PUSH)
-        s.scn_push_i32(_fc(C.FM_INT))
+        s.scn_push_op(C.CD_PUSH, _fc(C.FM_INT))
         msg_block = getattr(C, "ELM_GLOBAL_MSG_BLOCK", None)
         if not isinstance(msg_block, int):
             msg_block = int(msg_block or 0)
         s.scn_push_i32(int(msg_block))
-        s.scn_push_u8(C.CD_COMMAND)
-        s.scn_push_i32(0)
-        s.scn_push_i32(0)
+        s.scn_push_op(C.CD_COMMAND, 0, 0)
         s.scn_push_i32(0)
         s.scn_push_i32(_fc(C.FM_VOID))
 
@@ -1587,7 +1655,7 @@ class BS:
             str_index_list = [(0, 0)] * str_cnt
             out_scn["str_list"] = [sl[i] for i in str_sort_index]
             for orig in str_sort_index:
-                ln = len(_u16(sl[orig]))
+                ln = _u16_len(sl[orig])
                 str_index_list[orig] = (ofs, ln)
                 ofs += ln
             out_scn["str_index_list"] = str_index_list
@@ -1607,7 +1675,7 @@ class BS:
             ofs = 0
             idx = []
             for nm in out_scn["scn_prop_name_list"]:
-                ln = len(_u16(nm))
+                ln = _u16_len(nm)
                 idx.append((ofs, ln))
                 ofs += ln
             out_scn["scn_prop_name_index_list"] = idx
@@ -1616,7 +1684,7 @@ class BS:
             ofs = 0
             idx = []
             for nm in out_scn["scn_cmd_name_list"]:
-                ln = len(_u16(nm))
+                ln = _u16_len(nm)
                 idx.append((ofs, ln))
                 ofs += ln
             out_scn["scn_cmd_name_index_list"] = idx
@@ -1624,7 +1692,7 @@ class BS:
             ofs = 0
             idx = []
             for nm in out_scn["call_prop_name_list"]:
-                ln = len(_u16(nm))
+                ln = _u16_len(nm)
                 idx.append((ofs, ln))
                 ofs += ln
             out_scn["call_prop_name_index_list"] = idx
@@ -1692,6 +1760,48 @@ def find_ss(ctx, only=None):
     return sorted(glob.glob(os.path.join(sp, "*.ss"))) if sp else []
 
 
+# ia_data entries BS reads; the MA resume point in the stage cache keeps only
+# these so it does not carry the whole form table / replace tree per script.
+_BS_IAD_KEYS = (
+    "property_list",
+    "command_list",
+    "property_cnt",
+    "command_cnt",
+    "inc_property_cnt",
+    "inc_command_cnt",
+)
+
+
+def _resolve_ia_data(ctx, ia_data=None):
+    base = ia_data
+    if not isinstance(base, dict) and isinstance(ctx, dict):
+        base = ctx.get("ia_data")
+    if not isinstance(base, dict):
+        base = build_ia_data(ctx)
+        if isinstance(ctx, dict):
+            ctx["ia_data"] = base
+    return base
+
+
+def _script_deps(ctx, ca, lad):
+    symbols = ctx.get("inc_symbols") if isinstance(ctx, dict) else None
+    if not isinstance(symbols, dict):
+        return None
+    return script_deps(ca.used_names, lad, symbols)
+
+
+def _cached_deps(cache, front_key):
+    meta = cache.get("meta", front_key)
+    return meta.get("deps") if isinstance(meta, dict) else None
+
+
+def _front_key(ctx, cache, ss_path, enc):
+    ia_hash = ctx.get("ia_hash") if isinstance(ctx, dict) else None
+    if cache is None or not ia_hash:
+        return None
+    return cache.front_key(rd(ss_path, 1), ia_hash, enc)
+
+
 def compile_one_pipeline(
     ctx,
     ss_path,
@@ -1711,6 +1821,10 @@ def compile_one_pipeline(
         - This function does NOT write the final .dat file; it returns the
           compiled bytes when it reaches the BS stage.
         - When stop_after is set to 'la'/'sa'/'ma', it returns None.
+        - When ctx['stage_cache'] is set (see stage_cache.py), the pipeline
+          restarts from the deepest cached stage: the finished .dat for the
+          current shuffle seed, the MA state (BS only), or the LA output for
+          an identical CA text.
     """
 
     stop_after = stop_after or (
@@ -1723,16 +1837,53 @@ def compile_one_pipeline(
         return f"{code} at {fname}:{int(line or 0)}"
 
     enc = "utf-8" if (isinstance(ctx, dict) and ctx.get("utf8")) else "cp932"
+
+    cache = open_stage_cache(ctx)
+    front_key = _front_key(ctx, cache, ss_path, enc)
+    # --debug dumps the CA output to tmp/ca, so CA has to run
+    skip_front = isinstance(ctx, dict) and bool(ctx.get("test_check"))
+    bs_key = None
+    if front_key and stop_after == "bs":
+        t = time.time()
+        seed = get_shuffle_state()
+        bs_key = make_key(front_key, seed)
+        hit = None if skip_front else cache.get("bs", bs_key)
+        if isinstance(hit, dict):
+            # Keep the PRNG chain identical to a real BS run
+            _, x = plan_shuffle_seeds([hit.get("str_cnt", 0)], seed)
+            set_shuffle_seed(x)
+            if log:
+                _log_stage("CACHE", ss_path)
+            tracing.record("CACHE", fname, t, bytes_out=len(hit.get("out_scn", b"")))
+            return {
+                "nm": nm,
+                "fname": fname,
+                "out_scn": hit.get("out_scn", b""),
+                "deps": _cached_deps(cache, front_key),
+            }
+        state = None if skip_front else cache.get("ma", front_key)
+        if isinstance(state, dict):
+            if log:
+                _log_stage("CACHE", ss_path)
+            tracing.record("CACHE", fname, t)
+            res = _pipeline_bs(
+                ctx,
+                ss_path,
+                state["iad"],
+                state["lad"],
+                state["mad"],
+                log,
+                record_time,
+                cache,
+                bs_key,
+            )
+            res["deps"] = _cached_deps(cache, front_key)
+            return res
+
     scn = rd(ss_path, 0, enc=enc)
 
     # Resolve include analyzer data
-    base = ia_data
-    if not isinstance(base, dict) and isinstance(ctx, dict):
-        base = ctx.get("ia_data")
-    if not isinstance(base, dict):
-        base = build_ia_data(ctx)
-        if isinstance(ctx, dict):
-            ctx["ia_data"] = base
+    base = _resolve_ia_data(ctx, ia_data)
 
     iad = _copy_ia_data(base)
     pcad = {}
@@ -1746,6 +1897,9 @@ def compile_one_pipeline(
         raise RuntimeError(fmt_err("UNK_ERROR", ca.get_error_line()))
     if record_time:
         _record_stage_time(ctx, "CA", time.time() - t)
+    tracing.record(
+        "CA", fname, t, bytes_in=len(scn), bytes_out=len(pcad.get("scn_text", ""))
+    )
 
     tmp = tmp_path or (ctx.get("tmp_path") if isinstance(ctx, dict) else None) or "."
     if test_check and isinstance(ctx, dict) and ctx.get("test_check"):
@@ -1755,11 +1909,25 @@ def compile_one_pipeline(
     if log:
         _log_stage("LA", ss_path)
     t = time.time()
-    lad, err = la_analize(pcad)
+    la_key = cache.la_key(pcad.get("scn_text", "")) if cache is not None else None
+    lad = cache.get("la", la_key) if la_key else None
+    err = None
+    if not isinstance(lad, dict):
+        lad, err = la_analize(pcad)
+        if not err and la_key:
+            cache.put("la", la_key, lad)
     if record_time:
         _record_stage_time(ctx, "LA", time.time() - t)
+    tracing.record("LA", fname, t, bytes_in=len(pcad.get("scn_text", "")))
     if err:
         raise RuntimeError(fmt_err("UNK_ERROR", err.get("line", 0)))
+    deps = _script_deps(ctx, ca, lad)
+    if front_key:
+        cache.put(
+            "meta",
+            front_key,
+            {"str_cnt": len(lad.get("str_list") or []), "deps": deps},
+        )
     if stop_after == "la":
         return None
 
@@ -1771,6 +1939,7 @@ def compile_one_pipeline(
     ok, sad = sa.analize()
     if record_time:
         _record_stage_time(ctx, "SA", time.time() - t)
+    tracing.record("SA", fname, t)
     if not ok:
         raise RuntimeError(
             fmt_err(
@@ -1790,6 +1959,7 @@ def compile_one_pipeline(
         ok, mad = ma.analize()
         if record_time:
             _record_stage_time(ctx, "MA", time.time() - t)
+        tracing.record("MA", fname, t)
         if ok:
             break
         code = ma.last.get("type") or "UNK_ERROR"
@@ -1813,6 +1983,26 @@ def compile_one_pipeline(
     if stop_after == "ma":
         return None
 
+    if front_key:
+        cache.put(
+            "ma",
+            front_key,
+            {
+                "iad": {k: iad[k] for k in _BS_IAD_KEYS if k in iad},
+                "lad": lad,
+                "mad": mad,
+            },
+        )
+
+    res = _pipeline_bs(ctx, ss_path, iad, lad, mad, log, record_time, cache, bs_key)
+    res["deps"] = deps
+    return res
+
+
+def _pipeline_bs(ctx, ss_path, iad, lad, mad, log, record_time, cache, bs_key):
+    nm = os.path.splitext(os.path.basename(ss_path))[0]
+    fname = os.path.basename(ss_path)
+
     # BS
     if log:
         _log_stage("BS", ss_path)
@@ -1822,13 +2012,60 @@ def compile_one_pipeline(
     if not bs.compile(
         iad, lad, mad, bsd, bool(isinstance(ctx, dict) and ctx.get("test_check"))
     ):
-        raise RuntimeError(fmt_err(bs.get_error_code(), bs.get_error_line()))
+        raise RuntimeError(
+            f"{bs.get_error_code()} at {fname}:{int(bs.get_error_line() or 0)}"
+        )
     if record_time:
         _record_stage_time(ctx, "BS", time.time() - t)
-    return {"nm": nm, "fname": fname, "out_scn": bsd.get("out_scn", b"")}
+    out_scn = bsd.get("out_scn", b"")
+    tracing.record("BS", fname, t, bytes_out=len(out_scn))
+    if bs_key:
+        cache.put(
+            "bs",
+            bs_key,
+            {"out_scn": out_scn, "str_cnt": len((lad or {}).get("str_list") or [])},
+        )
+    return {"nm": nm, "fname": fname, "out_scn": out_scn}
+
+
+def count_strings(ctx, ss_path, ia_data=None):
+    """Return len(str_list) of a script (CA + LA only, or the stage cache).
+
+    Used to plan the shuffle seeds of a parallel build.
+    """
+    enc = "utf-8" if (isinstance(ctx, dict) and ctx.get("utf8")) else "cp932"
+    cache = open_stage_cache(ctx)
+    front_key = _front_key(ctx, cache, ss_path, enc)
+    if front_key:
+        meta = cache.get("meta", front_key)
+        if isinstance(meta, dict) and "str_cnt" in meta:
+            return int(meta["str_cnt"])
+    fname = os.path.basename(ss_path)
+    t = time.time()
+    scn = rd(ss_path, 0, enc=enc)
+    iad = _copy_ia_data(_resolve_ia_data(ctx, ia_data))
+    pcad = {}
+    ca = CharacterAnalizer()
+    if not ca.analize_file(scn, iad, pcad):
+        raise RuntimeError(f"UNK_ERROR at {fname}:{int(ca.get_error_line() or 0)}")
+    lad, err = la_analize(pcad)
+    if err:
+        raise RuntimeError(f"UNK_ERROR at {fname}:{int(err.get('line', 0) or 0)}")
+    tracing.record("PLAN", fname, t, bytes_in=len(scn))
+    if front_key:
+        cache.put(
+            "meta",
+            front_key,
+            {
+                "str_cnt": len(lad.get("str_list") or []),
+                "deps": _script_deps(ctx, ca, lad),
+            },
+        )
+    return len(lad.get("str_list") or [])
 
 
 def compile_one(ctx, ss_path, stop_after=None):
+    t = time.time()
     res = compile_one_pipeline(
         ctx,
         ss_path,
@@ -1841,8 +2078,21 @@ def compile_one(ctx, ss_path, stop_after=None):
     )
     if not res:
         return
-    tmp = ctx.get("tmp_path") or "."
-    wr(os.path.join(tmp, "bs", res["nm"] + ".dat"), res["out_scn"], 1)
+    artifact_store(ctx).put(res["nm"], "dat", res["out_scn"])
+    record_compile_time(ctx, res["fname"], time.time() - t)
+    record_inc_deps(ctx, res["fname"], res.get("deps"))
+
+
+def record_inc_deps(ctx, fname, deps):
+    """Remember the inc symbols a compiled script uses (see incdeps.py)."""
+    if isinstance(ctx, dict):
+        ctx.setdefault("inc_deps", {})[str(fname).lower()] = deps
+
+
+def record_compile_time(ctx, fname, sec):
+    """Remember how long a script took; the next build schedules by it."""
+    if isinstance(ctx, dict):
+        ctx.setdefault("compile_times", {})[str(fname).lower()] = round(sec, 4)
 
 
 def compile_all(ctx, only=None, stop_after=None, max_workers=None, parallel=False):
@@ -1859,14 +2109,12 @@ def compile_all(ctx, only=None, stop_after=None, max_workers=None, parallel=Fals
         The .dat format generated by this tool uses a MSVC-compatible PRNG
         shuffle (see _MSR.shuffle) to build a per-script string table order.
         In the original (serial) implementation, that PRNG state advances
-        across files in a fixed order (find_ss sorts by file name). If you
-        compile files in separate processes, each process re-initializes the
-        PRNG to the same seed, which changes the produced .dat even when the
-        input source is identical.
-
-        Therefore, parallel compilation is opt-in. If you need bit-identical
-        output compared to the historical Python serial compiler, keep
-        parallel=False.
+        across files in a fixed order (find_ss sorts by file name). Separate
+        worker processes do not share that state, so the parallel compiler
+        first runs a CA/LA pass to count each script's strings, walks the
+        PRNG in find_ss order (plan_shuffle_seeds) and hands every worker
+        its exact starting state. The produced .dat files are bit-identical
+        to a serial build.
     """
     if isinstance(ctx, dict) and not isinstance(ctx.get("ia_data"), dict):
         ctx["ia_data"] = build_ia_data(ctx)
@@ -1883,6 +2131,7 @@ def compile_all(ctx, only=None, stop_after=None, max_workers=None, parallel=Fals
             start = time.time()
             parallel_compile(ctx, ss_files, stop_after, max_workers)
             _set_stage_time(ctx, "Compiling", time.time() - start)
+            _evict_stage_cache(ctx)
             return
         except ImportError:
             # Fall back to serial if parallel module not available
@@ -1891,6 +2140,13 @@ def compile_all(ctx, only=None, stop_after=None, max_workers=None, parallel=Fals
     # Serial compilation
     for p in ss_files:
         compile_one(ctx, p, stop_after)
+    _evict_stage_cache(ctx)
+
+
+def _evict_stage_cache(ctx):
+    cache = open_stage_cache(ctx)
+    if cache is not None:
+        cache.evict()
 
 
 BS.get_error_atom = get_error_atom
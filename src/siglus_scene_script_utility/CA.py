@@ -144,29 +144,205 @@ def _rt():
     return {"c": {}, "r": None}
 
 
+def _rt_overlay(rt):
+    """
+    Writable view of a shared replace tree.
+
+    Nodes of the overlay carry "w"; _rt_add copies the shared nodes along
+    the path of a new name into the overlay and leaves rt untouched.
+    """
+    if not isinstance(rt, dict):
+        return {"c": {}, "r": None, "w": 1}
+    return {"c": dict(rt.get("c") or {}), "r": rt.get("r"), "w": 1}
+
+
 def _rt_add(rt, name, rep):
     n = rt
+    if "w" not in rt:
+        for ch in name:
+            n = n["c"].setdefault(ch, _rt())
+        n["r"] = rep
+        return
     for ch in name:
-        n = n["c"].setdefault(ch, _rt())
+        c = n["c"].get(ch)
+        if c is None:
+            c = {"c": {}, "r": None, "w": 1}
+        elif "w" not in c:
+            c = {"c": dict(c["c"]), "r": c.get("r"), "w": 1}
+        else:
+            n = c
+            continue
+        n["c"][ch] = c
+        n = c
     n["r"] = rep
 
 
 def _rt_search(rt, text, pos):
+    """
+    Find the longest replace-tree name starting at text[pos].
+
+    Returns:
+        (entry or None, True if the walk stopped at the end of text with
+        longer names still possible)
+    """
     n = rt
     best = None
     i = pos
+    ln = len(text)
     while 1:
         if n.get("r") is not None:
             best = n["r"]
-        if i >= len(text) or text[i] == "\0":
-            break
+        if i >= ln:
+            return best, bool(n["c"])
         ch = text[i]
-        if ch in n["c"]:
-            n = n["c"][ch]
-            i += 1
-        else:
-            break
-    return best
+        if ch == "\0" or ch not in n["c"]:
+            return best, False
+        n = n["c"][ch]
+        i += 1
+
+
+class _RtAutomaton:
+    """
+    Aho-Corasick automaton over the names of a replace tree.
+
+    find() reports the longest name starting at every position of a text in
+    one left-to-right pass, which is what _rt_search answers for a single
+    position. build_ia_data compiles one for the include set; scripts that
+    declare their own #define get a fresh one (IncAnalyzer drops the shared
+    automaton from its ia_data when it adds a name).
+    """
+
+    __slots__ = ("goto", "fail", "out", "runs")
+
+    def __init__(self, rt):
+        goto = [{}]
+        fail = [0]
+        out = [()]
+        chars = set()
+        # States are numbered breadth first, so fail targets come first
+        queue = [(0, rt, 0)]
+        qi = 0
+        while qi < len(queue):
+            s, node, depth = queue[qi]
+            qi += 1
+            for ch, child in node["c"].items():
+                chars.add(ch)
+                t = len(goto)
+                goto[s][ch] = t
+                goto.append({})
+                f = 0
+                if s:
+                    f = fail[s]
+                    while f and ch not in goto[f]:
+                        f = fail[f]
+                    f = goto[f].get(ch, 0)
+                fail.append(f)
+                own = ((depth + 1, child["r"]),) if child.get("r") is not None else ()
+                out.append(own + out[f])
+                queue.append((t, child, depth + 1))
+        chars.discard("\0")
+        self.goto = goto
+        self.fail = fail
+        self.out = out
+        # Characters outside every name always lead back to the root state
+        self.runs = (
+            re.compile("[" + re.escape("".join(sorted(chars))) + "]+")
+            if chars
+            else None
+        )
+
+    def find(self, text, end):
+        """
+        Args:
+            text: Text to search
+            end: Stop before this position
+
+        Returns:
+            Dict of start position -> replace entry of the longest name there
+        """
+        best = {}
+        if self.runs is None:
+            return best
+        goto, fail, out = self.goto, self.fail, self.out
+        for m in self.runs.finditer(text, 0, end):
+            s = 0
+            for j in range(m.start(), m.end()):
+                ch = text[j]
+                while s and ch not in goto[s]:
+                    s = fail[s]
+                s = goto[s].get(ch, 0)
+                # A later end gives a longer name for the same start
+                for nl, rep in out[s]:
+                    best[j - nl + 1] = rep
+        return best
+
+
+def _rt_compile(rt):
+    return _RtAutomaton(rt) if isinstance(rt, dict) else None
+
+
+def _rt_skip_re(trees, lines):
+    # Matches a run of characters no name in the trees can start with
+    firsts = set()
+    for rt in trees:
+        if rt:
+            if rt.get("r") is not None:
+                return None
+            firsts.update(rt["c"])
+    firsts.discard("\0")
+    if lines:
+        firsts.discard("\n")
+    return re.compile("[^" + re.escape("".join(sorted(firsts))) + "\0]+")
+
+
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+# Characters that end a run of plain text in analize_file_1 / analize_file_2
+_CA1_SPECIAL = re.compile(r"['\";]|/[/*]")
+_CA2_SPECIAL = re.compile(r"['\"#]")
+_SQ_LIT = re.compile(r"'(?:\\[\\'n]|[^\\'\n])'")
+_DQ_BODY = re.compile(r'"[^"\\\n]*(?:\\[\\"n][^"\\\n]*)*')
+
+
+def _scan_quote(t, i):
+    """
+    Check the quote literal starting at t[i].
+
+    Returns:
+        (end, None) for a valid literal ending before t[end], or
+        (i, message) describing the first problem in it
+    """
+    n = len(t)
+    if t[i] == '"':
+        e = _DQ_BODY.match(t, i).end()
+        c = t[e] if e < n else ""
+        if c == '"':
+            return e + 1, None
+        if c == "\\":
+            c = t[e + 1] if e + 1 < n else ""
+            if c and c != "\n":
+                return i, "Invalid escape (\\). Use '\\\\' to write a backslash."
+        if not c:
+            return i, "Unclosed double quote."
+        return i, "Newline is not allowed inside double quotes."
+    m = _SQ_LIT.match(t, i)
+    if m:
+        return m.end(), None
+    c = t[i + 1] if i + 1 < n else ""
+    if c == "'":
+        return i, "Single quotes must enclose exactly one character."
+    j = i + 2
+    if c == "\\":
+        c = t[j] if j < n else ""
+        if c and c not in "\\'n\n":
+            return i, "Invalid escape (\\). Use '\\\\' to write a backslash."
+        j += 1
+    if c and c != "\n":
+        c = t[j] if j < n else ""
+        if c and c != "\n":
+            return i, "Single quotes are not closed or contain more than one character."
+    if not c:
+        return i, "Unclosed single quote."
+    return i, "Newline is not allowed inside single quotes."
 
 
 class CharacterAnalizer:
@@ -175,6 +351,8 @@ class CharacterAnalizer:
         self.error_str = ""
         self.m_line = 1
         self.iad = None
+        # Names of every #replace/#define/#macro expanded (see incdeps.py)
+        self.used_names = set()
 
     def error(self, line, s):
         self.error_line = line
@@ -187,9 +365,6 @@ class CharacterAnalizer:
     def get_error_str(self):
         return self.error_str
 
-    def _check_str(self, t, i, s):
-        return (i + len(s), 1) if t.startswith(s, i) else (i, 0)
-
     def _check_word(self, t, i):
         n = len(t)
         while i < n and t[i] in " \t":
@@ -210,273 +385,335 @@ class CharacterAnalizer:
         return i, "", 0
 
     def analize_file_1(self, in_text):
-        t = in_text + ("\0" * 256)
+        # Strip comments, check quote literals and lowercase ASCII outside of
+        # quotes. Plain text between the characters that start a quote or a
+        # comment is copied a run at a time.
+        t = in_text.split("\0", 1)[0]
+        n = len(t)
         out = []
         self.m_line = 1
-        bcl = 1
-        st = 0
         i = 0
-        while t[i] != "\0":
-            c = t[i]
-            moji = c
-            if c == "\n":
-                if st in (1, 2, 3):
-                    return self.error(
-                        self.m_line, "Newline is not allowed inside single quotes."
-                    )
-                if st in (4, 5):
-                    return self.error(
-                        self.m_line, "Newline is not allowed inside double quotes."
-                    )
-                if st == 6:
-                    st = 0
-                self.m_line += 1
-            elif st == 1:
-                if c == "\\":
-                    st = 2
-                elif c == "'":
-                    return self.error(
-                        self.m_line, "Single quotes must enclose exactly one character."
-                    )
-                else:
-                    st = 3
-            elif st == 2:
-                if c in "\\'n":
-                    st = 3
-                else:
-                    return self.error(
-                        self.m_line,
-                        "Invalid escape (\\). Use '\\\\' to write a backslash.",
-                    )
-            elif st == 3:
-                if c == "'":
-                    st = 0
-                else:
-                    return self.error(
-                        self.m_line,
-                        "Single quotes are not closed or contain more than one character.",
-                    )
-            elif st == 4:
-                if c == "\\":
-                    st = 5
-                elif c == '"':
-                    st = 0
-            elif st == 5:
-                if c in '\\"n':
-                    st = 4
-                else:
-                    return self.error(
-                        self.m_line,
-                        "Invalid escape (\\). Use '\\\\' to write a backslash.",
-                    )
-            elif st == 6:
-                i += 1
-                continue
-            elif st == 7:
-                if c == "*" and t[i + 1] == "/":
-                    st = 0
-                    i += 2
-                    continue
-                i += 1
-                continue
+        while 1:
+            m = _CA1_SPECIAL.search(t, i)
+            j = m.start() if m else n
+            if j > i:
+                seg = t[i:j]
+                out.append(seg.translate(_ASCII_LOWER))
+                self.m_line += seg.count("\n")
+            if m is None:
+                break
+            c = t[j]
+            if c == "'" or c == '"':
+                e, msg = _scan_quote(t, j)
+                if msg:
+                    return self.error(self.m_line, msg)
+                out.append(t[j:e])
+                i = e
+            elif c == "/" and t[j + 1] == "*":
+                # The search starts at the "*", so "/*/" is a whole comment
+                k = t.find("*/", j + 1)
+                if k < 0:
+                    return self.error(self.m_line, "Unclosed /* comment.")
+                nl = t.count("\n", j, k)
+                if nl:
+                    out.append("\n" * nl)
+                    self.m_line += nl
+                i = k + 2
             else:
-                if c == "'":
-                    st = 1
-                elif c == '"':
-                    st = 4
-                elif c == ";":
-                    st = 6
-                    i += 1
-                    continue
-                elif c == "/" and t[i + 1] == "/":
-                    st = 6
-                    i += 2
-                    continue
-                elif c == "/" and t[i + 1] == "*":
-                    bcl = self.m_line
-                    st = 7
-                    i += 1
-                    continue
-                elif "A" <= c <= "Z":
-                    moji = chr(ord(c) + 32)
-            out.append(moji)
-            i += 1
-        if st in (1, 2, 3):
-            return self.error(self.m_line, "Unclosed single quote.")
-        if st in (4, 5):
-            return self.error(self.m_line, "Unclosed double quote.")
-        if st == 7:
-            return self.error(bcl, "Unclosed /* comment.")
+                k = t.find("\n", j)
+                i = n if k < 0 else k
         return "".join(out)
 
     def analize_file_2(self, in_text):
-        t = in_text + ("\0" * 256)
+        t = in_text.split("\0", 1)[0]
+        n = len(t)
         out = []
         inc = []
         self.m_line = 1
-        st = 0
         ifs = [0] * 16
         d = 0
         incs = False
+        name_set = self.iad["name_set"]
+
+        def emit(seg):
+            # Newlines always reach the scene text (and the inc text inside
+            # #inc_start) so line numbers survive; other characters only in
+            # active #ifdef branches.
+            nl = seg.count("\n")
+            self.m_line += nl
+            if ifs[d] in (0, 1):
+                if incs:
+                    inc.append(seg)
+                    if nl:
+                        out.append("\n" * nl)
+                else:
+                    out.append(seg)
+            elif nl:
+                out.append("\n" * nl)
+                if incs:
+                    inc.append("\n" * nl)
+
         i = 0
-        while t[i] != "\0":
-            c = t[i]
-            if c == "\n":
-                if st in (1, 2, 3):
-                    return self.error(
-                        self.m_line, "Newline is not allowed inside single quotes."
-                    )
-                if st in (4, 5):
-                    return self.error(
-                        self.m_line, "Newline is not allowed inside double quotes."
-                    )
-                self.m_line += 1
-            elif st == 1:
-                if c == "\\":
-                    st = 2
-                elif c == "'":
+        while 1:
+            m = _CA2_SPECIAL.search(t, i)
+            j = m.start() if m else n
+            if j > i:
+                emit(t[i:j])
+            if m is None:
+                break
+            if t[j] != "#":
+                e, msg = _scan_quote(t, j)
+                if msg:
+                    return self.error(self.m_line, msg)
+                emit(t[j:e])
+                i = e
+            elif t.startswith("#ifdef", j):
+                i, w, ok = self._check_word(t, j + 6)
+                if not ok:
+                    return self.error(self.m_line, "Missing word after #ifdef.")
+                d += 1
+                if d >= 16:
+                    return self.error(self.m_line, "if depth overflow")
+                ifs[d] = 1 if w in name_set else 2
+            elif t.startswith("#elseifdef", j):
+                if ifs[d] <= 0:
                     return self.error(
-                        self.m_line, "Single quotes must enclose exactly one character."
+                        self.m_line, "#elseifdef does not have a matching #if."
                     )
+                i, w, ok = self._check_word(t, j + 10)
+                if not ok:
+                    return self.error(self.m_line, "Missing word after #elseifdef.")
+                if ifs[d] in (1, 3):
+                    ifs[d] = 3
                 else:
-                    st = 3
-            elif st == 2:
-                if c in "\\'n":
-                    st = 3
-                else:
+                    ifs[d] = 1 if w in name_set else 2
+            elif t.startswith("#else", j):
+                if ifs[d] <= 0:
                     return self.error(
-                        self.m_line,
-                        "Invalid escape (\\). Use '\\\\' to write a backslash.",
+                        self.m_line, "#else does not have a matching #if."
                     )
-            elif st == 3:
-                if c == "'":
-                    st = 0
-                else:
+                ifs[d] = 3 if ifs[d] in (1, 3) else 1
+                i = j + 5
+            elif t.startswith("#endif", j):
+                if ifs[d] <= 0:
                     return self.error(
-                        self.m_line,
-                        "Single quotes are not closed or contain more than one character.",
+                        self.m_line, "#endif does not have a matching #if."
                     )
-            elif st == 4:
-                if c == "\\":
-                    st = 5
-                elif c == '"':
-                    st = 0
-            elif st == 5:
-                if c in '\\"n':
-                    st = 4
-                else:
+                d -= 1
+                i = j + 6
+            elif t.startswith("#inc_start", j):
+                incs = True
+                i = j + 10
+            elif t.startswith("#inc_end", j):
+                if not incs:
                     return self.error(
-                        self.m_line,
-                        "Invalid escape (\\). Use '\\\\' to write a backslash.",
+                        self.m_line, "#inc_end does not have a matching #inc_start."
                     )
+                incs = False
+                i = j + 8
             else:
-                if c == "'":
-                    st = 1
-                elif c == '"':
-                    st = 4
-                else:
-                    j, ok = self._check_str(t, i, "#ifdef")
-                    if ok:
-                        i, w, ok2 = self._check_word(t, j)
-                        if ok2:
-                            d += 1
-                            if d >= 16:
-                                return self.error(self.m_line, "if depth overflow")
-                            ifs[d] = 1 if w in self.iad["name_set"] else 2
-                            continue
-                        return self.error(self.m_line, "Missing word after #ifdef.")
-                    j, ok = self._check_str(t, i, "#elseifdef")
-                    if ok:
-                        if ifs[d] > 0:
-                            i, w, ok2 = self._check_word(t, j)
-                            if ok2:
-                                if ifs[d] == 3:
-                                    continue
-                                if ifs[d] == 1:
-                                    ifs[d] = 3
-                                    continue
-                                ifs[d] = 1 if w in self.iad["name_set"] else 2
-                                continue
-                            return self.error(
-                                self.m_line, "Missing word after #elseifdef."
-                            )
-                        return self.error(
-                            self.m_line, "#elseifdef does not have a matching #if."
-                        )
-                    j, ok = self._check_str(t, i, "#else")
-                    if ok:
-                        if ifs[d] > 0:
-                            i = j
-                            if ifs[d] == 3:
-                                continue
-                            if ifs[d] == 1:
-                                ifs[d] = 3
-                                continue
-                            ifs[d] = 1
-                            continue
-                        return self.error(
-                            self.m_line, "#else does not have a matching #if."
-                        )
-                    j, ok = self._check_str(t, i, "#endif")
-                    if ok:
-                        if ifs[d] > 0:
-                            d -= 1
-                            i = j
-                            continue
-                        return self.error(
-                            self.m_line, "#endif does not have a matching #if."
-                        )
-                    j, ok = self._check_str(t, i, "#inc_start")
-                    if ok:
-                        incs = True
-                        i = j
-                        continue
-                    j, ok = self._check_str(t, i, "#inc_end")
-                    if ok:
-                        if incs:
-                            incs = False
-                            i = j
-                            continue
-                        return self.error(
-                            self.m_line, "#inc_end does not have a matching #inc_start."
-                        )
-            if c == "\n":
-                if incs:
-                    inc.append(c)
-                out.append(c)
-            elif ifs[d] in (0, 1):
-                (inc if incs else out).append(c)
-            i += 1
-        if st in (1, 2, 3):
-            return self.error(self.m_line, "Unclosed single quote.")
-        if st in (4, 5):
-            return self.error(self.m_line, "Unclosed double quote.")
+                emit("#")
+                i = j + 1
         if incs:
             return self.error(self.m_line, "Unclosed #inc_start.")
         if d > 0:
             return self.error(self.m_line, "Unclosed #ifdef.")
         return "".join(out), "".join(inc)
 
-    def _std_replace(self, text, pos, default_rt, added_rt):
-        r1 = _rt_search(default_rt, text, pos) if default_rt else None
-        r2 = _rt_search(added_rt, text, pos) if added_rt and added_rt.get("c") else None
-        if not r1 and not r2:
-            return text, pos + 1, 1
-        rep = (r1 if r1["name"] > r2["name"] else r2) if (r1 and r2) else (r1 or r2)
-        tp, nm, after = rep["type"], rep["name"], rep.get("after", "")
-        nl = len(nm)
-        if tp == "replace":
-            return text[:pos] + after + text[pos + nl :], pos + len(after), 1
-        if tp == "define":
-            return text[:pos] + after + text[pos + nl :], pos, 1
-        if tp == "macro":
-            st = pos
-            p = pos + nl
-            ok, p2, res = self._analize_macro(text, p, rep, default_rt, added_rt)
+    def _expand(self, text, default_rt, added_rt, guard=False, ac=None):
+        """
+        Apply #replace/#define/#macro names to text from left to right.
+
+        Scanned text goes to an output list and the unscanned rest is never
+        copied: only a #define expansion, which is scanned again, goes to a
+        pending buffer, topped up from the rest when a name could continue
+        past its end. Runs of characters no name starts with are copied in
+        one slice.
+
+        Args:
+            text: Text to expand (scanning stops at the first NUL)
+            default_rt: Replace tree searched at every position
+            added_rt: Second replace tree (macro arguments) or None
+            guard: Count newlines in m_line and stop expansions that never
+                consume the text (10,000 steps without getting shorter)
+            ac: _RtAutomaton of default_rt; finds the names in text up front
+                instead of searching the tree at each position (added_rt
+                must be None)
+
+        Returns:
+            Expanded text, or None on error
+        """
+        d_rt = default_rt or None
+        a_rt = added_rt if added_rt and added_rt.get("c") else None
+        skip = _rt_skip_re((d_rt, a_rt), guard)
+        out = []
+        src = text
+        n = len(src)
+        q = 0
+        head = ""
+        hp = 0
+        loop = 0
+        rest_min = n
+        if ac is not None:
+            end = src.find("\0")
+            if end < 0:
+                end = n
+            found = ac.find(src, end)
+            starts = sorted(found)
+            si = 0
+        while 1:
+            in_head = hp < len(head)
+            if in_head:
+                buf, i = head, hp
+            elif q < n:
+                buf, i = src, q
+            else:
+                break
+            c = buf[i]
+            if c == "\0":
+                break
+            if in_head or ac is None:
+                m = skip.match(buf, i) if skip else None
+                k = m.end() - i if m else 0
+            else:
+                while si < len(starts) and starts[si] < q:
+                    si += 1
+                k = (starts[si] if si < len(starts) else end) - q
+            if k:
+                if guard:
+                    # Same bookkeeping as k single-character steps
+                    rest = len(head) - hp + n - q
+                    over = min(k, rest - rest_min)
+                    if over > 0 and loop + over > 10000:
+                        k = 10001 - loop
+                        self.m_line += buf.count("\n", i, i + k)
+                        self.error(
+                            self.m_line,
+                            "Infinite loop detected during inc file replacement.",
+                        )
+                        return None
+                    if over < k:
+                        loop = 0
+                        rest_min = rest - k
+                    else:
+                        loop += k
+                    self.m_line += buf.count("\n", i, i + k)
+                out.append(buf[i : i + k])
+                if in_head:
+                    hp += k
+                else:
+                    q += k
+                continue
+            r1 = r2 = None
+            e1 = e2 = False
+            if not in_head and ac is not None:
+                r1 = found[q]
+            else:
+                if d_rt:
+                    r1, e1 = _rt_search(d_rt, buf, i)
+                if a_rt:
+                    r2, e2 = _rt_search(a_rt, buf, i)
+            if in_head and (e1 or e2) and q < n:
+                head = head[hp:] + src[q : q + 256]
+                hp = 0
+                q = min(n, q + 256)
+                continue
+            if not r1 and not r2:
+                out.append(c)
+                if in_head:
+                    hp += 1
+                else:
+                    q += 1
+            else:
+                rep = (
+                    (r1 if r1["name"] > r2["name"] else r2)
+                    if (r1 and r2)
+                    else (r1 or r2)
+                )
+                tp, nm, after = rep["type"], rep["name"], rep.get("after", "")
+                self.used_names.add(nm)
+                nl = len(nm)
+                if tp == "replace":
+                    out.append(after)
+                    if in_head:
+                        hp += nl
+                    else:
+                        q += nl
+                elif tp == "define":
+                    head = after + head[hp + nl :] if in_head else after
+                    hp = 0
+                    if not in_head:
+                        q += nl
+                elif tp == "macro":
+                    if in_head:
+                        res = self._expand_macro_in_head(
+                            head, hp, src, q, rep, default_rt, added_rt
+                        )
+                        if res is None:
+                            return None
+                        res, used = res
+                        hl = len(head) - hp
+                        if used <= hl:
+                            hp += used
+                        else:
+                            q += used - hl
+                            head = ""
+                            hp = 0
+                    else:
+                        ok, p2, res = self._analize_macro(
+                            src, q + nl, rep, default_rt, added_rt
+                        )
+                        if not ok:
+                            return None
+                        q = p2
+                    out.append(res)
+                else:
+                    out.append(c)
+                    if in_head:
+                        hp += 1
+                    else:
+                        q += 1
+            if guard:
+                rest = len(head) - hp + n - q
+                if rest >= rest_min:
+                    loop += 1
+                    if loop > 10000:
+                        self.error(
+                            self.m_line,
+                            "Infinite loop detected during inc file replacement.",
+                        )
+                        return None
+                else:
+                    rest_min = rest
+                    loop = 0
+        out.append(head[hp:])
+        out.append(src[q:])
+        return "".join(out)
+
+    def _expand_macro_in_head(self, head, hp, src, q, rep, default_rt, added_rt):
+        # A macro call found in pending #define text may take its arguments
+        # from the unscanned rest; parse it from a window that grows until
+        # the call fits.
+        nl = len(rep["name"])
+        n = len(src)
+        w = 256
+        while 1:
+            view = head[hp:] + src[q : q + w]
+            more = q + w < n
+            el, es = self.error_line, self.error_str
+            try:
+                ok, p2, res = self._analize_macro(view, nl, rep, default_rt, added_rt)
+            except IndexError:
+                if not more:
+                    raise
+                ok, p2 = 0, len(view)
+            if more and p2 >= len(view):
+                self.error_line, self.error_str = el, es
+                w *= 4
+                continue
             if not ok:
-                return text, pos, 0
-            return text[:st] + res + text[p2:], st + len(res), 1
-        return text, pos + 1, 1
+                return None
+            return res, p2
 
     def _analize_macro(self, text, p, macro, default_rt, added_rt):
         real = []
@@ -571,54 +808,26 @@ class CharacterAnalizer:
                 self.error(self.m_line, "Not enough macro arguments.")
                 return None
             rep = {"type": "replace", "name": a["name"], "after": after, "args": []}
-            t = rep["after"] + ("\0" * 256)
-            p = 0
-            while t[p] != "\0":
-                t, p, ok = self._std_replace(t, p, default_rt, added_rt)
-                if not ok:
-                    return None
-            rep["after"] = t[:-256]
+            rep["after"] = self._expand(rep["after"], default_rt, added_rt)
+            if rep["after"] is None:
+                return None
             reps.append(rep)
         reps.sort(key=lambda x: len(x["name"]), reverse=True)
         art = _rt()
         for r in reps:
             _rt_add(art, r["name"], r)
-        t = src + ("\0" * 256)
-        p = 0
-        while t[p] != "\0":
-            t, p, ok = self._std_replace(t, p, default_rt, art)
-            if not ok:
-                return None
-        return t[:-256]
+        return self._expand(src, default_rt, art)
 
     def analize_line(self, in_text, piad):
         self.iad = piad
-        t = in_text + "\0"
         self.m_line = 1
-        loop = 0
-        rest_min = len(t)
-        p = 0
-        while t[p] != "\0":
-            if t[p] == "\n":
-                self.m_line += 1
-                p += 1
-            else:
-                t, p, ok = self._std_replace(t, p, self.iad["replace_tree"], _rt())
-                if not ok:
-                    return None
-            rest = len(t) - p
-            if rest >= rest_min:
-                loop += 1
-                if loop > 10000:
-                    self.error(
-                        self.m_line,
-                        "Infinite loop detected during inc file replacement.",
-                    )
-                    return None
-            else:
-                rest_min = rest
-                loop = 0
-        return t[:-1]
+        return self._expand(
+            in_text,
+            self.iad["replace_tree"],
+            None,
+            guard=True,
+            ac=self.iad.get("replace_ac"),
+        )
 
     def analize_file(self, in_text, piad, pcad):
         in_text = in_text.replace("\r", "")
@@ -681,30 +890,18 @@ class CharacterAnalizer:
                 self.error(ia_def.el, ia_def.es)
                 return 0
         scn = "\n".join(lines)
-        t = scn + ("\0" * 256)
         self.m_line = 1
-        loop = 0
-        rest_min = len(t)
-        p = 0
-        while t[p] != "\0":
-            if t[p] == "\n":
-                self.m_line += 1
-                p += 1
-            else:
-                t, p, ok = self._std_replace(t, p, self.iad["replace_tree"], _rt())
-                if not ok:
-                    return 0
-            rest = len(t) - p
-            if rest >= rest_min:
-                loop += 1
-                if loop > 10000:
-                    return self.error(
-                        self.m_line,
-                        "Infinite loop detected during inc file replacement.",
-                    )
-            else:
-                rest_min = rest
-                loop = 0
+        if self.iad.get("replace_ac") is None:
+            self.iad["replace_ac"] = _rt_compile(self.iad["replace_tree"])
+        t = self._expand(
+            scn,
+            self.iad["replace_tree"],
+            None,
+            guard=True,
+            ac=self.iad["replace_ac"],
+        )
+        if t is None:
+            return 0
         pcad["scn_text"] = t.split("\0", 1)[0]
         pcad.setdefault("property_list", [])
         return 1
@@ -7,7 +7,7 @@ from .CA import (
     _iszen,
     _rt_add,
 )
-from .MA import FormTable, create_elm_code
+from .MA import FormTable, create_elm_code, system_form_table
 
 
 class IncAnalyzer:
@@ -579,6 +579,8 @@ class IncAnalyzer:
                 "args": [],
             }
             _rt_add(self.iad["replace_tree"], nm, rep)
+            # The shared automaton no longer covers every name
+            self.iad.pop("replace_ac", None)
             return rep, i, line, 1
         if tp == "macro":
             nm, i, line = self._name_until(i, line, set(" \t\n("))
@@ -602,6 +604,8 @@ class IncAnalyzer:
             self.iad["name_set"].add(nm)
             rep = {"type": "macro", "name": nm, "after": after, "args": args}
             _rt_add(self.iad["replace_tree"], nm, rep)
+            # The shared automaton no longer covers every name
+            self.iad.pop("replace_ac", None)
             return rep, i, line, 1
         if tp == "property":
             txt, i, line, name_line = self._prop_cmd_text(i, line)
@@ -671,8 +675,7 @@ class IncAnalyzer:
             )
             ft = self.iad.get("form_table")
             if not isinstance(ft, FormTable):
-                ft = FormTable()
-                ft.create_system_form_table()
+                ft = system_form_table().overlay()
                 self.iad["form_table"] = ft
             ft.add(
                 self.pf,
@@ -725,8 +728,7 @@ class IncAnalyzer:
             )
             ft = self.iad.get("form_table")
             if not isinstance(ft, FormTable):
-                ft = FormTable()
-                ft.create_system_form_table()
+                ft = system_form_table().overlay()
                 self.iad["form_table"] = ft
             al0 = []
             for ii, a in enumerate((arg_list or {}).get("arg_list", [])):
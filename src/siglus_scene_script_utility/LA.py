@@ -1,7 +1,102 @@
+from array import array
+
 from . import const as C
 from .CA import _iszen
 
 
+_LA_NONE = C.LA_T["NONE"]
+
+
+class AtomList:
+    """LA token stream stored as parallel array columns (id/line/type/opt/subopt).
+
+    Indexing or iterating yields the classic atom dict, built on demand;
+    analyzers on hot paths read single fields with line()/type()/opt().
+    Out-of-range indexes read as NONE atoms (id = index, line 0), which is
+    what SA's sentinel padding used to provide.
+    """
+
+    __slots__ = ("ids", "lines", "types", "opts", "subopts", "big")
+
+    def __init__(s):
+        s.ids = array("i")
+        s.lines = array("i")
+        s.types = array("i")
+        s.opts = array("q")
+        s.subopts = array("i")
+        # opt values that do not fit the column (huge integer literals)
+        s.big = {}
+
+    @classmethod
+    def from_dicts(cls, atoms):
+        out = cls()
+        for a in atoms or []:
+            out.append(a)
+        return out
+
+    def add(s, aid, line, typ, opt=0, subopt=0):
+        n = len(s.types)
+        s.ids.append(aid)
+        s.lines.append(line)
+        s.types.append(typ)
+        try:
+            s.opts.append(opt)
+        except OverflowError:
+            s.opts.append(0)
+            s.big[n] = opt
+        s.subopts.append(subopt)
+
+    def append(s, a):
+        s.add(
+            a.get("id", len(s.types)),
+            a.get("line", 0),
+            a.get("type", C.LA_T["NONE"]),
+            a.get("opt", 0),
+            a.get("subopt", 0),
+        )
+
+    def __len__(s):
+        return len(s.types)
+
+    def type(s, i):
+        return s.types[i] if 0 <= i < len(s.types) else _LA_NONE
+
+    def aid(s, i):
+        return s.ids[i] if 0 <= i < len(s.ids) else i
+
+    def line(s, i):
+        return s.lines[i] if 0 <= i < len(s.lines) else 0
+
+    def opt(s, i):
+        if 0 <= i < len(s.opts):
+            return s.big.get(i, s.opts[i]) if s.big else s.opts[i]
+        return 0
+
+    def get(s, i):
+        if 0 <= i < len(s.types):
+            return {
+                "id": s.ids[i],
+                "line": s.lines[i],
+                "type": s.types[i],
+                "opt": s.opt(i),
+                "subopt": s.subopts[i],
+            }
+        return {"id": i, "line": 0, "type": C.LA_T["NONE"], "opt": 0, "subopt": 0}
+
+    def __getitem__(s, i):
+        if isinstance(i, slice):
+            return [s.get(k) for k in range(*i.indices(len(s.types)))]
+        if i < 0:
+            i += len(s.types)
+        if not 0 <= i < len(s.types):
+            raise IndexError("atom index out of range")
+        return s.get(i)
+
+    def __iter__(s):
+        for i in range(len(s.types)):
+            yield s.get(i)
+
+
 def _tostr_moji(c):
     return c
 
@@ -10,7 +105,7 @@ def la_analize(pcad):
     s = pcad["scn_text"] + ("\0" * 256)
     cur_id = 0
     cur_line = 1
-    atom_list = []
+    atom_list = AtomList()
     str_list = []
     label_list = []
     unknown_list = []
@@ -44,28 +139,25 @@ def la_analize(pcad):
         i, ok = skip(i)
         if not ok:
             break
-        a = {
-            "id": cur_id,
-            "line": cur_line,
-            "type": C.LA_T["NONE"],
-            "opt": 0,
-            "subopt": 0,
-        }
+        a_line = cur_line
+        a_type = C.LA_T["NONE"]
+        a_opt = 0
+        a_subopt = 0
         cur_id += 1
         c = s[i]
         if c == "【":
-            a["type"] = C.LA_T["OPEN_SUMI"]
+            a_type = C.LA_T["OPEN_SUMI"]
             i += 1
         elif c == "】":
-            a["type"] = C.LA_T["CLOSE_SUMI"]
+            a_type = C.LA_T["CLOSE_SUMI"]
             i += 1
         elif _iszen(c):
             st = i
             while _iszen(s[i]) and s[i] not in "【】":
                 i += 1
             str_list.append(s[st:i])
-            a["type"] = C.LA_T["VAL_STR"]
-            a["opt"] = len(str_list) - 1
+            a_type = C.LA_T["VAL_STR"]
+            a_opt = len(str_list) - 1
         elif c in "_$@" or ("a" <= c <= "z"):
             st = i
             while ("a" <= s[i] <= "z") or ("0" <= s[i] <= "9") or s[i] in "_$@":
@@ -90,10 +182,10 @@ def la_analize(pcad):
                 "default": "DEFAULT",
             }.get(w)
             if kw:
-                a["type"] = C.LA_T[kw]
+                a_type = C.LA_T[kw]
             else:
-                a["type"] = C.LA_T["UNKNOWN"]
-                a["opt"] = len(unknown_list)
+                a_type = C.LA_T["UNKNOWN"]
+                a_opt = len(unknown_list)
                 unknown_list.append(w)
         elif "0" <= c <= "9":
             v = 0
@@ -113,12 +205,12 @@ def la_analize(pcad):
                 while "0" <= s[i] <= "9":
                     v = v * 10 + (ord(s[i]) - 48)
                     i += 1
-            a["type"] = C.LA_T["VAL_INT"]
-            a["opt"] = v
+            a_type = C.LA_T["VAL_INT"]
+            a_opt = v
         elif c == "'":
             ln = 2 if s[i + 1] == "\\" else 1
-            a["type"] = C.LA_T["VAL_INT"]
-            a["opt"] = ord(s[i + ln])
+            a_type = C.LA_T["VAL_INT"]
+            a_opt = ord(s[i + ln])
             i += 2 + ln
         elif c == '"':
             i += 1
@@ -135,8 +227,8 @@ def la_analize(pcad):
                     r.append(s[i])
                     i += 1
             str_list.append("".join(r))
-            a["type"] = C.LA_T["VAL_STR"]
-            a["opt"] = len(str_list) - 1
+            a_type = C.LA_T["VAL_STR"]
+            a_opt = len(str_list) - 1
             i += 1
         elif c == "#":
             i += 1
@@ -149,152 +241,150 @@ def la_analize(pcad):
                 and name[0] == "z"
                 and all("0" <= ch <= "9" for ch in name[1:])
             ):
-                a["type"] = C.LA_T["Z_LABEL"]
-                a["opt"] = int(name[1:])
+                a_type = C.LA_T["Z_LABEL"]
+                a_opt = int(name[1:])
                 idx = find_label(name)
                 if idx < 0:
-                    a["subopt"] = len(label_list)
+                    a_subopt = len(label_list)
                     label_list.append({"name": name, "line": cur_line})
                 else:
-                    a["subopt"] = idx
+                    a_subopt = idx
             else:
-                a["type"] = C.LA_T["LABEL"]
+                a_type = C.LA_T["LABEL"]
                 idx = find_label(name)
                 if idx < 0:
-                    a["opt"] = len(label_list)
+                    a_opt = len(label_list)
                     label_list.append({"name": name, "line": cur_line})
                 else:
-                    a["opt"] = idx
+                    a_opt = idx
         elif s.startswith(">>>=", i):
-            a["type"] = C.LA_T["SR3_ASSIGN"]
+            a_type = C.LA_T["SR3_ASSIGN"]
             i += 4
         elif s.startswith(">>>", i):
-            a["type"] = C.LA_T["SR3"]
+            a_type = C.LA_T["SR3"]
             i += 3
         elif s.startswith("<<=", i):
-            a["type"] = C.LA_T["SL_ASSIGN"]
+            a_type = C.LA_T["SL_ASSIGN"]
             i += 3
         elif s.startswith(">>=", i):
-            a["type"] = C.LA_T["SR_ASSIGN"]
+            a_type = C.LA_T["SR_ASSIGN"]
             i += 3
         elif s.startswith("+=", i):
-            a["type"] = C.LA_T["PLUS_ASSIGN"]
+            a_type = C.LA_T["PLUS_ASSIGN"]
             i += 2
         elif s.startswith("-=", i):
-            a["type"] = C.LA_T["MINUS_ASSIGN"]
+            a_type = C.LA_T["MINUS_ASSIGN"]
             i += 2
         elif s.startswith("*=", i):
-            a["type"] = C.LA_T["MULTIPLE_ASSIGN"]
+            a_type = C.LA_T["MULTIPLE_ASSIGN"]
             i += 2
         elif s.startswith("/=", i):
-            a["type"] = C.LA_T["DIVIDE_ASSIGN"]
+            a_type = C.LA_T["DIVIDE_ASSIGN"]
             i += 2
         elif s.startswith("%=", i):
-            a["type"] = C.LA_T["PERCENT_ASSIGN"]
+            a_type = C.LA_T["PERCENT_ASSIGN"]
             i += 2
         elif s.startswith("&=", i):
-            a["type"] = C.LA_T["AND_ASSIGN"]
+            a_type = C.LA_T["AND_ASSIGN"]
             i += 2
         elif s.startswith("|=", i):
-            a["type"] = C.LA_T["OR_ASSIGN"]
+            a_type = C.LA_T["OR_ASSIGN"]
             i += 2
         elif s.startswith("^=", i):
-            a["type"] = C.LA_T["HAT_ASSIGN"]
+            a_type = C.LA_T["HAT_ASSIGN"]
             i += 2
         elif s.startswith("<<", i):
-            a["type"] = C.LA_T["SL"]
+            a_type = C.LA_T["SL"]
             i += 2
         elif s.startswith(">>", i):
-            a["type"] = C.LA_T["SR"]
+            a_type = C.LA_T["SR"]
             i += 2
         elif s.startswith("==", i):
-            a["type"] = C.LA_T["EQUAL"]
+            a_type = C.LA_T["EQUAL"]
             i += 2
         elif s.startswith("!=", i):
-            a["type"] = C.LA_T["NOT_EQUAL"]
+            a_type = C.LA_T["NOT_EQUAL"]
             i += 2
         elif s.startswith(">=", i):
-            a["type"] = C.LA_T["GREATER_EQUAL"]
+            a_type = C.LA_T["GREATER_EQUAL"]
             i += 2
         elif s.startswith("<=", i):
-            a["type"] = C.LA_T["LESS_EQUAL"]
+            a_type = C.LA_T["LESS_EQUAL"]
             i += 2
         elif s.startswith("&&", i):
-            a["type"] = C.LA_T["LOGICAL_AND"]
+            a_type = C.LA_T["LOGICAL_AND"]
             i += 2
         elif s.startswith("||", i):
-            a["type"] = C.LA_T["LOGICAL_OR"]
+            a_type = C.LA_T["LOGICAL_OR"]
             i += 2
         elif c == "=":
-            a["type"] = C.LA_T["ASSIGN"]
+            a_type = C.LA_T["ASSIGN"]
             i += 1
         elif c == "+":
-            a["type"] = C.LA_T["PLUS"]
+            a_type = C.LA_T["PLUS"]
             i += 1
         elif c == "-":
-            a["type"] = C.LA_T["MINUS"]
+            a_type = C.LA_T["MINUS"]
             i += 1
         elif c == "*":
-            a["type"] = C.LA_T["MULTIPLE"]
+            a_type = C.LA_T["MULTIPLE"]
             i += 1
         elif c == "/":
-            a["type"] = C.LA_T["DIVIDE"]
+            a_type = C.LA_T["DIVIDE"]
             i += 1
         elif c == "%":
-            a["type"] = C.LA_T["PERCENT"]
+            a_type = C.LA_T["PERCENT"]
             i += 1
         elif c == "&":
-            a["type"] = C.LA_T["AND"]
+            a_type = C.LA_T["AND"]
             i += 1
         elif c == "|":
-            a["type"] = C.LA_T["OR"]
+            a_type = C.LA_T["OR"]
             i += 1
         elif c == "^":
-            a["type"] = C.LA_T["HAT"]
+            a_type = C.LA_T["HAT"]
             i += 1
         elif c == ">":
-            a["type"] = C.LA_T["GREATER"]
+            a_type = C.LA_T["GREATER"]
             i += 1
         elif c == "<":
-            a["type"] = C.LA_T["LESS"]
+            a_type = C.LA_T["LESS"]
             i += 1
         elif c == "~":
-            a["type"] = C.LA_T["TILDE"]
+            a_type = C.LA_T["TILDE"]
             i += 1
         elif c == ".":
-            a["type"] = C.LA_T["DOT"]
+            a_type = C.LA_T["DOT"]
             i += 1
         elif c == ",":
-            a["type"] = C.LA_T["COMMA"]
+            a_type = C.LA_T["COMMA"]
             i += 1
         elif c == ":":
-            a["type"] = C.LA_T["COLON"]
+            a_type = C.LA_T["COLON"]
             i += 1
         elif c == "(":
-            a["type"] = C.LA_T["OPEN_PAREN"]
+            a_type = C.LA_T["OPEN_PAREN"]
             i += 1
         elif c == ")":
-            a["type"] = C.LA_T["CLOSE_PAREN"]
+            a_type = C.LA_T["CLOSE_PAREN"]
             i += 1
         elif c == "[":
-            a["type"] = C.LA_T["OPEN_BRACKET"]
+            a_type = C.LA_T["OPEN_BRACKET"]
             i += 1
         elif c == "]":
-            a["type"] = C.LA_T["CLOSE_BRACKET"]
+            a_type = C.LA_T["CLOSE_BRACKET"]
             i += 1
         elif c == "{":
-            a["type"] = C.LA_T["OPEN_BRACE"]
+            a_type = C.LA_T["OPEN_BRACE"]
             i += 1
         elif c == "}":
-            a["type"] = C.LA_T["CLOSE_BRACE"]
+            a_type = C.LA_T["CLOSE_BRACE"]
             i += 1
         else:
             return err(cur_line, "Invalid character: '" + _tostr_moji(c) + "'")
-        if a["type"] != C.LA_T["NONE"]:
-            atom_list.append(a)
-    atom_list.append(
-        {"id": cur_id, "line": cur_line, "type": C.LA_T["EOF"], "opt": 0, "subopt": 0}
-    )
+        if a_type != C.LA_T["NONE"]:
+            atom_list.add(cur_id - 1, a_line, a_type, a_opt, a_subopt)
+    atom_list.add(cur_id, cur_line, C.LA_T["EOF"])
     cur_id += 1
     str_list.append("dummy")
     return {
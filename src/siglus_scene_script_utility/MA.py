@@ -1,4 +1,6 @@
-import copy
+import hashlib
+import os
+import pickle
 from . import const as C
 
 
@@ -6,30 +8,20 @@ def create_elm_code(o, g, c):
     return (int(o) << 24) | (int(g) << 16) | (int(c) & 0xFFFF)
 
 
+# Form code -> name; the first name listed for a code wins
+_FORM_NAME_BY_CODE = {int(v): k for k, v in reversed(list(C._FORM_CODE.items()))}
+
+
 def _form_name(f):
     if isinstance(f, str):
         return f
     try:
-        fv = int(f)
-        for k, v in C._FORM_CODE.items():
-            if int(v) == fv:
-                return k
+        return _FORM_NAME_BY_CODE.get(int(f), f)
     except Exception:
-        pass
-    return f
+        return f
 
 
-def _map_arg_form(f):
-    if isinstance(f, str):
-        return f
-    try:
-        fv = int(f)
-        for k, v in C._FORM_CODE.items():
-            if int(v) == fv:
-                return k
-    except Exception:
-        pass
-    return f
+_map_arg_form = _form_name
 
 
 def _parse_arg_spec(arg_spec):
@@ -96,6 +88,8 @@ class FormTable:
         s.f = {}
         s.call_base = None
         s._auto_prop_code = 0
+        # Buckets still shared with the table this one overlays
+        s._shared = set()
 
     def _load_system_forms(s):
         forms = (
@@ -181,12 +175,31 @@ class FormTable:
             s.f.setdefault(k, {})
         s._load_system_forms()
         s._load_system_elements()
-        s.call_base = copy.deepcopy(s.f.get(C.FM_CALL, {}))
+        s.call_base = dict(s.f.get(C.FM_CALL, {}))
+
+    def overlay(s):
+        """
+        Per-script table reading through to this one.
+
+        Buckets are shared until the overlay first adds to them, so the
+        shared table is never modified.
+        """
+        t = FormTable()
+        t.f = dict(s.f)
+        t.call_base = s.call_base
+        t._auto_prop_code = s._auto_prop_code
+        t._shared = set(t.f)
+        return t
 
     def reset_call(s):
-        s.f[C.FM_CALL] = copy.deepcopy(s.call_base if s.call_base is not None else {})
+        # Entries are never modified once added, so the bucket alone is copied
+        s.f[C.FM_CALL] = dict(s.call_base if s.call_base is not None else {})
+        s._shared.discard(C.FM_CALL)
 
     def add(s, fc, e):
+        if fc in s._shared:
+            s._shared.discard(fc)
+            s.f[fc] = dict(s.f[fc])
         bucket = s.f.setdefault(fc, {})
         nm = e.get("name")
         # Keep the *first* binding for duplicate call-scope properties.
@@ -212,6 +225,57 @@ class FormTable:
         return None, None
 
 
+_SYSTEM_FORM_TABLE = None
+
+
+def _system_form_table_path():
+    h = hashlib.sha1()
+    for mod in (C.__file__, __file__):
+        with open(mod, "rb") as f:
+            h.update(f.read())
+    d = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__pycache__")
+    return os.path.join(d, f"form_table-{h.hexdigest()[:16]}.pickle")
+
+
+def system_form_table():
+    """
+    Return the process-wide system FormTable (read-only; use .overlay()).
+
+    The built table is pickled next to the package, keyed by a hash of
+    const.py and this module, so later processes and pool workers load it
+    instead of parsing SYSTEM_ELEMENT_DEFS again.
+    """
+    global _SYSTEM_FORM_TABLE
+    if _SYSTEM_FORM_TABLE is not None:
+        return _SYSTEM_FORM_TABLE
+    path = None
+    try:
+        path = _system_form_table_path()
+        with open(path, "rb") as f:
+            ft = pickle.load(f)
+        if isinstance(ft, FormTable):
+            _SYSTEM_FORM_TABLE = ft
+            return ft
+    except Exception:
+        pass
+    ft = FormTable()
+    ft.create_system_form_table()
+    _SYSTEM_FORM_TABLE = ft
+    if path:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, "wb") as f:
+                pickle.dump(ft, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+    return ft
+
+
 class MA:
     def __init__(s, piad, plad, psad):
         s.piad = piad or {}
@@ -223,8 +287,7 @@ class MA:
         }
         ft = s.piad.get("form_table")
         if not isinstance(ft, FormTable):
-            ft = FormTable()
-            ft.create_system_form_table()
+            ft = system_form_table().overlay()
             s.piad["form_table"] = ft
         s.ft = ft
         if "command_cnt" not in s.piad:
@@ -1,6 +1,7 @@
 import json
 from . import const as C
 from .CA import get_form_code_by_name
+from .LA import AtomList
 
 
 def create_elm_code(o, g, c):
@@ -13,6 +14,33 @@ def N(ln, **k):
     return d
 
 
+# Atom types sa_operator_2 can consume
+_OP2_TYPES = frozenset(
+    C.LA_T[k]
+    for k in (
+        "LOGICAL_OR",
+        "LOGICAL_AND",
+        "OR",
+        "HAT",
+        "AND",
+        "EQUAL",
+        "NOT_EQUAL",
+        "GREATER",
+        "GREATER_EQUAL",
+        "LESS",
+        "LESS_EQUAL",
+        "SL",
+        "SR",
+        "SR3",
+        "PLUS",
+        "MINUS",
+        "MULTIPLE",
+        "DIVIDE",
+        "PERCENT",
+    )
+)
+
+
 def A(a):
     return {
         "id": a.get("id", 0),
@@ -28,6 +56,29 @@ class SA:
         s.piad = piad or {}
         s.plad = plad or {}
         s.atom_list = s.plad.get("atom_list", [])
+        if not isinstance(s.atom_list, AtomList):
+            s.atom_list = AtomList.from_dicts(s.atom_list)
+        s._t = s.atom_list.type
+        s._l = s.atom_list.line
+        # Statement parsers by leading atom type; each fails without side
+        # effects on any other first atom, so sa_sentence tries just one.
+        s._sentence_by_type = {}
+        for fn, nt, ky, types in (
+            (s.sa_label, C.NT_S_LABEL, "label", ("LABEL",)),
+            (s.sa_z_label, C.NT_S_Z_LABEL, "z_label", ("Z_LABEL",)),
+            (s.sa_def_cmd, C.NT_S_DEF_CMD, "def_cmd", ("COMMAND",)),
+            (s.sa_def_prop, C.NT_S_DEF_PROP, "def_prop", ("PROPERTY",)),
+            (s.sa_goto, C.NT_S_GOTO, "Goto", ("GOTO", "GOSUB", "GOSUBSTR")),
+            (s.sa_return, C.NT_S_RETURN, "Return", ("RETURN",)),
+            (s.sa_if, C.NT_S_IF, "If", ("IF",)),
+            (s.sa_for, C.NT_S_FOR, "For", ("FOR",)),
+            (s.sa_while, C.NT_S_WHILE, "While", ("WHILE",)),
+            (s.sa_continue, C.NT_S_CONTINUE, "Continue", ("CONTINUE",)),
+            (s.sa_break, C.NT_S_BREAK, "Break", ("BREAK",)),
+            (s.sa_switch, C.NT_S_SWITCH, "Switch", ("SWITCH",)),
+        ):
+            for t in types:
+                s._sentence_by_type[C.LA_T[t]] = (fn, nt, ky)
         s.label_list = [
             {"name": x.get("name", ""), "line": x.get("line", 0), "exist": False}
             for x in s.plad.get("label_list", [])
@@ -37,20 +88,13 @@ class SA:
         ]
         s.last = {
             "type": "TNMSERR_SA_NONE",
-            "atom": A(
-                s.atom_list[0]
-                if s.atom_list
+            "atom": (
+                s.atom_list.get(0)
+                if len(s.atom_list)
                 else {"id": 0, "line": 1, "type": C.LA_T["NONE"], "opt": 0, "subopt": 0}
             ),
         }
 
-    def _a(s, i):
-        return (
-            s.atom_list[i]
-            if 0 <= i < len(s.atom_list)
-            else {"id": i, "line": 0, "type": C.LA_T["NONE"], "opt": 0, "subopt": 0}
-        )
-
     def clear(s):
         s.last["type"] = "TNMSERR_SA_NONE"
 
@@ -58,24 +102,31 @@ class SA:
         if atom is None:
             s.last["type"] = typ
             return 0
-        atom = A(atom)
         if s.last.get("type") == "TNMSERR_SA_NONE" or s.last.get("atom", {}).get(
             "id", -1
-        ) < atom.get("id", -1):
-            s.last = {"type": typ, "atom": atom}
+        ) < atom.get("id", 0):
+            s.last = {"type": typ, "atom": A(atom)}
+        return 0
+
+    def error_at(s, typ, i):
+        # error() for atom_list[i], without building the atom unless kept
+        if s.last.get("type") == "TNMSERR_SA_NONE" or s.last.get("atom", {}).get(
+            "id", -1
+        ) < s.atom_list.aid(i):
+            s.last = {"type": typ, "atom": s.atom_list.get(i)}
         return 0
 
     def sa_atom(s, i, t):
-        a = s._a(i)
-        if a.get("type") != t:
+        if s._t(i) != t:
             return 0, i, None
-        return 1, i + 1, N(a.get("line", 0), atom=A(a))
+        a = s.atom_list.get(i)
+        return 1, i + 1, N(a["line"], atom=a)
 
     def sa_ss(s, i):
         p = i
         err = s.last
-        ss = N(s._a(p).get("line", 0), sentense_list=[])
-        while s._a(p).get("type") != C.LA_T["NONE"]:
+        ss = N(s._l(p), sentense_list=[])
+        while s._t(p) != C.LA_T["NONE"]:
             ok, p2, sen = s.sa_sentence(p)
             if not ok:
                 return 0, i, None
@@ -90,11 +141,11 @@ class SA:
         ok, p, ob = s.sa_atom(p, C.LA_T["OPEN_BRACE"])
         if not ok:
             return 0, i, None
-        b = N(s._a(i).get("line", 0), open_b=ob, close_b=None, sentense_list=[])
-        while s._a(p).get("type") not in (C.LA_T["NONE"], C.LA_T["CLOSE_BRACE"]):
+        b = N(s._l(i), open_b=ob, close_b=None, sentense_list=[])
+        while s._t(p) not in (C.LA_T["NONE"], C.LA_T["CLOSE_BRACE"]):
             ok, p2, sen = s.sa_sentence(p)
             if not ok:
-                return s.error("TNMSERR_SA_BLOCK_ILLEGAL_SENTENCE", s._a(p)), i, None
+                return s.error_at("TNMSERR_SA_BLOCK_ILLEGAL_SENTENCE", p), i, None
             b["sentense_list"].append(sen)
             p = p2
         ok, p, cb = s.sa_atom(p, C.LA_T["CLOSE_BRACE"])
@@ -108,7 +159,7 @@ class SA:
         p = i
         err = s.last
         sen = N(
-            s._a(p).get("line", 0),
+            s._l(p),
             block=None,
             label=None,
             z_label=None,
@@ -129,20 +180,9 @@ class SA:
             eof=None,
             is_include_sel=False,
         )
-        for fn, nt, ky in (
-            (s.sa_label, C.NT_S_LABEL, "label"),
-            (s.sa_z_label, C.NT_S_Z_LABEL, "z_label"),
-            (s.sa_def_cmd, C.NT_S_DEF_CMD, "def_cmd"),
-            (s.sa_def_prop, C.NT_S_DEF_PROP, "def_prop"),
-            (s.sa_goto, C.NT_S_GOTO, "Goto"),
-            (s.sa_return, C.NT_S_RETURN, "Return"),
-            (s.sa_if, C.NT_S_IF, "If"),
-            (s.sa_for, C.NT_S_FOR, "For"),
-            (s.sa_while, C.NT_S_WHILE, "While"),
-            (s.sa_continue, C.NT_S_CONTINUE, "Continue"),
-            (s.sa_break, C.NT_S_BREAK, "Break"),
-            (s.sa_switch, C.NT_S_SWITCH, "Switch"),
-        ):
+        lead = s._sentence_by_type.get(s._t(p))
+        if lead is not None:
+            fn, nt, ky = lead
             ok, p2, x = fn(p)
             if ok:
                 sen[ky] = x
@@ -174,7 +214,7 @@ class SA:
             sen["node_type"] = C.NT_S_EOF
             s.last = err
             return 1, p2, sen
-        return s.error("TNMSERR_SA_SENTENCE_ILLEGAL", s._a(p)), i, None
+        return s.error_at("TNMSERR_SA_SENTENCE_ILLEGAL", p), i, None
 
     def sa_label(s, i):
         p = i
@@ -189,7 +229,7 @@ class SA:
             s.label_list[idx]["line"] = lb["node_line"]
             s.label_list[idx]["exist"] = True
         s.last = err
-        return 1, p, N(s._a(i).get("line", 0), label=lb)
+        return 1, p, N(s._l(i), label=lb)
 
     def sa_z_label(s, i):
         p = i
@@ -208,7 +248,7 @@ class SA:
             s.label_list[li]["line"] = z["node_line"]
             s.label_list[li]["exist"] = True
         s.last = err
-        return 1, p, N(s._a(i).get("line", 0), z_label=z)
+        return 1, p, N(s._l(i), z_label=z)
 
     def sa_def_prop(s, i):
         p = i
@@ -218,9 +258,9 @@ class SA:
             return 0, i, None
         ok, p, nm = s.sa_atom(p, C.LA_T["UNKNOWN"])
         if not ok:
-            return s.error("TNMSERR_SA_DEF_PROP_ILLEGAL_NAME", s._a(p)), i, None
+            return s.error_at("TNMSERR_SA_DEF_PROP_ILLEGAL_NAME", p), i, None
         n = N(
-            s._a(i).get("line", 0),
+            s._l(i),
             Property=pr,
             form=None,
             name=nm,
@@ -248,9 +288,9 @@ class SA:
         err = s.last
         ok, p, nm = s.sa_atom(p, C.LA_T["UNKNOWN"])
         if not ok:
-            return s.error("TNMSERR_SA_DEF_CMD_ILLEGAL_NAME", s._a(p)), i, None
+            return s.error_at("TNMSERR_SA_DEF_CMD_ILLEGAL_NAME", p), i, None
         n = N(
-            s._a(i).get("line", 0),
+            s._l(i),
             command=kw,
             name=nm,
             open_p=None,
@@ -272,7 +312,7 @@ class SA:
                     ok, p, dp = s.sa_def_prop(p)
                     if not ok:
                         return (
-                            s.error("TNMSERR_SA_DEF_CMD_ILLEGAL_ARG", s._a(p)),
+                            s.error_at("TNMSERR_SA_DEF_CMD_ILLEGAL_ARG", p),
                             i,
                             None,
                         )
@@ -282,7 +322,7 @@ class SA:
                         break
                     ok, p, c = s.sa_atom(p, C.LA_T["COMMA"])
                     if not ok:
-                        return s.error("TNMSERR_SA_DEF_CMD_NO_COMMA", s._a(p)), i, None
+                        return s.error_at("TNMSERR_SA_DEF_CMD_NO_COMMA", p), i, None
                     n["comma_list"].append(c)
             n["close_p"] = cp
         ok, p, co = s.sa_atom(p, C.LA_T["COLON"])
@@ -290,7 +330,7 @@ class SA:
             n["colon"] = co
             ok, p, f = s.sa_form(p)
             if not ok:
-                return s.error("TNMSERR_SA_DEF_CMD_ILLEGAL_FORM", s._a(p)), i, None
+                return s.error_at("TNMSERR_SA_DEF_CMD_ILLEGAL_FORM", p), i, None
             n["form"] = f
         n["form_code"] = n["form"]["form_code"] if n["form"] else C.FM_INT
         ok, p, bl = s.sa_block(p)
@@ -418,7 +458,7 @@ class SA:
         if not gt:
             return 0, i, None
         n = N(
-            s._a(i).get("line", 0),
+            s._l(i),
             Goto=gt,
             arg_list=None,
             label=None,
@@ -451,7 +491,7 @@ class SA:
         ok, p, rt = s.sa_atom(p, C.LA_T["RETURN"])
         if not ok:
             return 0, i, None
-        n = N(s._a(i).get("line", 0), Return=rt, open_p=None, close_p=None, exp=None)
+        n = N(s._l(i), Return=rt, open_p=None, close_p=None, exp=None)
         n["node_type"] = C.NT_RETURN_WITHOUT_ARG
         ok, p, op = s.sa_atom(p, C.LA_T["OPEN_PAREN"])
         if ok:
@@ -519,7 +559,7 @@ class SA:
             if not ok:
                 return s.error("TNMSERR_SA_IF_NO_OPEN_BRACE", w["atom"]), i, None
             sub["open_b"] = ob
-            while s._a(p).get("type") not in (C.LA_T["NONE"], C.LA_T["CLOSE_BRACE"]):
+            while s._t(p) not in (C.LA_T["NONE"], C.LA_T["CLOSE_BRACE"]):
                 ok, p2, sen = s.sa_sentence(p)
                 if not ok:
                     return s.error("TNMSERR_SA_IF_ILLEGAL_BLOCK", w["atom"]), i, None
@@ -534,7 +574,7 @@ class SA:
                 break
         if not subs:
             return 0, i, None
-        n = N(s._a(i).get("line", 0), sub=subs)
+        n = N(s._l(i), sub=subs)
         s.last = err
         return 1, p, n
 
@@ -545,7 +585,7 @@ class SA:
         if not ok:
             return 0, i, None
         n = N(
-            s._a(i).get("line", 0),
+            s._l(i),
             For=w,
             open_p=None,
             close_p=None,
@@ -561,7 +601,7 @@ class SA:
         if not ok:
             return s.error("TNMSERR_SA_FOR_NO_OPEN_PAREN", w["atom"]), i, None
         n["open_p"] = op
-        while s._a(p).get("type") not in (C.LA_T["NONE"], C.LA_T["COMMA"]):
+        while s._t(p) not in (C.LA_T["NONE"], C.LA_T["COMMA"]):
             ok, p2, sen = s.sa_sentence(p)
             if not ok:
                 return s.error("TNMSERR_SA_FOR_ILLEGAL_INIT", w["atom"]), i, None
@@ -579,7 +619,7 @@ class SA:
         if not ok:
             return s.error("TNMSERR_SA_FOR_NO_COND_COMMA", w["atom"]), i, None
         n["comma"][1] = c1
-        while s._a(p).get("type") not in (C.LA_T["NONE"], C.LA_T["CLOSE_PAREN"]):
+        while s._t(p) not in (C.LA_T["NONE"], C.LA_T["CLOSE_PAREN"]):
             ok, p2, sen = s.sa_sentence(p)
             if not ok:
                 return s.error("TNMSERR_SA_FOR_ILLEGAL_LOOP", w["atom"]), i, None
@@ -593,7 +633,7 @@ class SA:
         if not ok:
             return s.error("TNMSERR_SA_FOR_NO_OPEN_BRACE", w["atom"]), i, None
         n["open_b"] = ob
-        while s._a(p).get("type") not in (C.LA_T["NONE"], C.LA_T["CLOSE_BRACE"]):
+        while s._t(p) not in (C.LA_T["NONE"], C.LA_T["CLOSE_BRACE"]):
             ok, p2, sen = s.sa_sentence(p)
             if not ok:
                 return s.error("TNMSERR_SA_FOR_ILLEGAL_BLOCK", w["atom"]), i, None
@@ -613,7 +653,7 @@ class SA:
         if not ok:
             return 0, i, None
         n = N(
-            s._a(i).get("line", 0),
+            s._l(i),
             While=w,
             open_p=None,
             close_p=None,
@@ -638,7 +678,7 @@ class SA:
         if not ok:
             return s.error("TNMSERR_SA_WHILE_NO_OPEN_BRACE", w["atom"]), i, None
         n["open_b"] = ob
-        while s._a(p).get("type") not in (C.LA_T["NONE"], C.LA_T["CLOSE_BRACE"]):
+        while s._t(p) not in (C.LA_T["NONE"], C.LA_T["CLOSE_BRACE"]):
             ok, p2, sen = s.sa_sentence(p)
             if not ok:
                 return s.error("TNMSERR_SA_WHILE_ILLEGAL_BLOCK", w["atom"]), i, None
@@ -658,7 +698,7 @@ class SA:
         if not ok:
             return 0, i, None
         s.last = err
-        return 1, p, N(s._a(i).get("line", 0), Continue=c)
+        return 1, p, N(s._l(i), Continue=c)
 
     def sa_break(s, i):
         p = i
@@ -667,7 +707,7 @@ class SA:
         if not ok:
             return 0, i, None
         s.last = err
-        return 1, p, N(s._a(i).get("line", 0), Break=b)
+        return 1, p, N(s._l(i), Break=b)
 
     def sa_switch(s, i):
         p = i
@@ -676,7 +716,7 @@ class SA:
         if not ok:
             return 0, i, None
         n = N(
-            s._a(i).get("line", 0),
+            s._l(i),
             Switch=w,
             open_p=None,
             close_p=None,
@@ -702,7 +742,7 @@ class SA:
         if not ok:
             return s.error("TNMSERR_SA_SWITCH_NO_OPEN_BRACE", w["atom"]), i, None
         n["open_b"] = ob
-        while s._a(p).get("type") not in (C.LA_T["NONE"], C.LA_T["CLOSE_BRACE"]):
+        while s._t(p) not in (C.LA_T["NONE"], C.LA_T["CLOSE_BRACE"]):
             ok, p, cs = s.sa_case(p)
             if ok:
                 n.setdefault("case", []).append(cs)
@@ -735,7 +775,7 @@ class SA:
         if not ok:
             return 0, i, None
         n = N(
-            s._a(i).get("line", 0),
+            s._l(i),
             Case=cs,
             open_p=None,
             value=None,
@@ -754,7 +794,7 @@ class SA:
         if not ok:
             return s.error("TNMSERR_SA_CASE_NO_CLOSE_PAREN", cs["atom"]), i, None
         n["close_p"] = cp
-        while s._a(p).get("type") not in (
+        while s._t(p) not in (
             C.LA_T["NONE"],
             C.LA_T["CASE"],
             C.LA_T["DEFAULT"],
@@ -774,8 +814,8 @@ class SA:
         ok, p, df = s.sa_atom(p, C.LA_T["DEFAULT"])
         if not ok:
             return 0, i, None
-        n = N(s._a(i).get("line", 0), Default=df, block=[])
-        while s._a(p).get("type") not in (
+        n = N(s._l(i), Default=df, block=[])
+        while s._t(p) not in (
             C.LA_T["NONE"],
             C.LA_T["CASE"],
             C.LA_T["DEFAULT"],
@@ -800,15 +840,15 @@ class SA:
             ok, p, x = s.sa_exp(p, 0)
             if not ok:
                 return (
-                    s.error("TNMSERR_SA_ASSIGN_ILLEGAL_RIGHT", s._a(p)),
+                    s.error_at("TNMSERR_SA_ASSIGN_ILLEGAL_RIGHT", p),
                     i,
                     None,
                     None,
                 )
-            n = N(s._a(i).get("line", 0), left=el, equal=op, right=x)
+            n = N(s._l(i), left=el, equal=op, right=x)
             s.last = err
             return 1, p, None, n
-        n = N(s._a(i).get("line", 0), command=el)
+        n = N(s._l(i), command=el)
         s.last = err
         return 1, p, n, None
 
@@ -818,10 +858,10 @@ class SA:
         ok, p, op = s.sa_atom(p, C.LA_T["OPEN_BRACKET"])
         if not ok:
             return 0, i, None
-        n = N(s._a(i).get("line", 0), open_b=op, close_b=None, exp=[], comma=[])
+        n = N(s._l(i), open_b=op, close_b=None, exp=[], comma=[])
         ok, p, x = s.sa_exp(p, 0)
         if not ok:
-            return s.error("TNMSERR_SA_EXP_ILLEGAL", s._a(p)), i, None
+            return s.error_at("TNMSERR_SA_EXP_ILLEGAL", p), i, None
         n["exp"].append(x)
         while 1:
             ok, p, cb = s.sa_atom(p, C.LA_T["CLOSE_BRACKET"])
@@ -830,11 +870,11 @@ class SA:
                 break
             ok, p, c = s.sa_atom(p, C.LA_T["COMMA"])
             if not ok:
-                return s.error("TNMSERR_SA_EXP_LIST_NO_CLOSE_BRACKET", s._a(p)), i, None
+                return s.error_at("TNMSERR_SA_EXP_LIST_NO_CLOSE_BRACKET", p), i, None
             n["comma"].append(c)
             ok, p, x = s.sa_exp(p, 0)
             if not ok:
-                return s.error("TNMSERR_SA_EXP_ILLEGAL", s._a(p)), i, None
+                return s.error_at("TNMSERR_SA_EXP_ILLEGAL", p), i, None
             n["exp"].append(x)
         s.last = err
         return 1, p, n
@@ -847,9 +887,9 @@ class SA:
         if ok:
             ok, p, x = s.sa_exp(p, C.SA_PRI_MAX)
             if not ok:
-                return s.error("TNMSERR_SA_EXP_ILLEGAL", s._a(p)), i, None
+                return s.error_at("TNMSERR_SA_EXP_ILLEGAL", p), i, None
             exp = N(
-                s._a(i).get("line", 0),
+                s._l(i),
                 smp_exp=None,
                 opr=op,
                 exp_1=x,
@@ -862,7 +902,7 @@ class SA:
             if not ok:
                 return 0, i, None
             exp = N(
-                s._a(i).get("line", 0),
+                s._l(i),
                 smp_exp=smp,
                 opr=None,
                 exp_1=None,
@@ -876,9 +916,9 @@ class SA:
                 break
             ok, p3, rhs = s.sa_exp(p2, npri)
             if not ok:
-                return s.error("TNMSERR_SA_EXP_ILLEGAL", s._a(p2)), i, None
+                return s.error_at("TNMSERR_SA_EXP_ILLEGAL", p2), i, None
             exp = N(
-                s._a(i).get("line", 0),
+                s._l(i),
                 smp_exp=None,
                 opr=op,
                 exp_1=exp,
@@ -894,7 +934,7 @@ class SA:
         p = i
         err = s.last
         n = N(
-            s._a(p).get("line", 0),
+            s._l(p),
             open=None,
             close=None,
             exp=None,
@@ -909,7 +949,7 @@ class SA:
             n["open"] = op
             ok, p, x = s.sa_exp(p, 0)
             if not ok:
-                return s.error("TNMSERR_SA_EXP_ILLEGAL", s._a(p)), i, None
+                return s.error_at("TNMSERR_SA_EXP_ILLEGAL", p), i, None
             n["exp"] = x
             ok, p, cp = s.sa_atom(p, C.LA_T["CLOSE_PAREN"])
             if not ok:
@@ -954,9 +994,9 @@ class SA:
         name = ul[f["atom"].get("opt", 0)] if f["atom"].get("opt", 0) < len(ul) else ""
         fc = get_form_code_by_name(name)
         if fc == -1:
-            return s.error("TNMSERR_SA_DEF_PROP_ILLEGAL_FORM", s._a(p)), i, None
+            return s.error_at("TNMSERR_SA_DEF_PROP_ILLEGAL_FORM", p), i, None
         n = N(
-            s._a(i).get("line", 0),
+            s._l(i),
             form=f,
             form_code=fc,
             open_b=None,
@@ -984,7 +1024,7 @@ class SA:
         if not ok:
             return 0, i, None
         s.last = err
-        return 1, p, N(s._a(i).get("line", 0), elm_list=el_list, element_type=0)
+        return 1, p, N(s._l(i), elm_list=el_list, element_type=0)
 
     def sa_elm_list(s, i):
         p = i
@@ -992,8 +1032,8 @@ class SA:
         ok, p, el = s.sa_element(p, 1)
         if not ok:
             return 0, i, None
-        n = N(s._a(i).get("line", 0), parent_form_code=0, element=[el], element_type=0)
-        while s._a(p).get("type") in (C.LA_T["OPEN_BRACKET"], C.LA_T["DOT"]):
+        n = N(s._l(i), parent_form_code=0, element=[el], element_type=0)
+        while s._t(p) in (C.LA_T["OPEN_BRACKET"], C.LA_T["DOT"]):
             ok, p2, el = s.sa_element(p, 0)
             if not ok:
                 return 0, i, None
@@ -1005,12 +1045,12 @@ class SA:
     def sa_element(s, i, top):
         p = i
         err = s.last
-        a = s._a(p)
+        ln = s._l(p)
         if not top:
             ok, p, ob = s.sa_atom(p, C.LA_T["OPEN_BRACKET"])
             if ok:
                 e = N(
-                    a.get("line", 0),
+                    ln,
                     name=None,
                     arg_list=None,
                     dot=None,
@@ -1025,11 +1065,11 @@ class SA:
                 e["node_type"] = C.NT_ELM_ARRAY
                 ok, p, x = s.sa_exp(p, 0)
                 if not ok:
-                    return s.error("TNMSERR_SA_ELEMENT_ILLEGAL_EXP", s._a(p)), i, None
+                    return s.error_at("TNMSERR_SA_ELEMENT_ILLEGAL_EXP", p), i, None
                 e["exp"] = x
                 ok, p, cb = s.sa_atom(p, C.LA_T["CLOSE_BRACKET"])
                 if not ok:
-                    return s.error("TNMSERR_SA_ELEMENT_NO_CLOSE", s._a(p)), i, None
+                    return s.error_at("TNMSERR_SA_ELEMENT_NO_CLOSE", p), i, None
                 e["close_b"] = cb
                 s.last = err
                 return 1, p, e
@@ -1037,14 +1077,14 @@ class SA:
             if ok:
                 ok, p2, ch = s.sa_element(p, 1)
                 if not ok:
-                    return s.error("TNMSERR_SA_ELEMENT_NO_CHILD", s._a(p)), i, None
+                    return s.error_at("TNMSERR_SA_ELEMENT_NO_CHILD", p), i, None
                 s.last = err
                 return 1, p2, ch
         ok, p, nm = s.sa_atom(p, C.LA_T["UNKNOWN"])
         if not ok:
             return 0, i, None
         e = N(
-            a.get("line", 0),
+            ln,
             name=nm,
             arg_list=None,
             dot=None,
@@ -1068,7 +1108,7 @@ class SA:
         p = i
         err = s.last
         al = N(
-            s._a(p).get("line", 0),
+            s._l(p),
             arg=[],
             comma=[],
             open_p=None,
@@ -1088,7 +1128,7 @@ class SA:
         while 1:
             ok, p, a = s.sa_arg(p)
             if not ok:
-                return s.error("TNMSERR_SA_EXP_ILLEGAL", s._a(p)), i, None
+                return s.error_at("TNMSERR_SA_EXP_ILLEGAL", p), i, None
             al["arg"].append(a)
             ok, p, cp = s.sa_atom(p, C.LA_T["CLOSE_PAREN"])
             if ok:
@@ -1096,7 +1136,7 @@ class SA:
                 break
             ok, p, c = s.sa_atom(p, C.LA_T["COMMA"])
             if not ok:
-                return s.error("TNMSERR_SA_ARG_LIST_NO_CLOSE_PAREN", s._a(p)), i, None
+                return s.error_at("TNMSERR_SA_ARG_LIST_NO_CLOSE_PAREN", p), i, None
             al["comma"].append(c)
         na = [x for x in al["arg"] if x.get("node_type") == C.NT_ARG_WITH_NAME]
         nn = [x for x in al["arg"] if x.get("node_type") != C.NT_ARG_WITH_NAME]
@@ -1114,13 +1154,13 @@ class SA:
             return 1, p, a
         ok, p, x = s.sa_exp(p, 0)
         if not ok:
-            return s.error("TNMSERR_SA_EXP_ILLEGAL", s._a(p)), i, None
+            return s.error_at("TNMSERR_SA_EXP_ILLEGAL", p), i, None
         s.last = err
         return (
             1,
             p,
             N(
-                s._a(i).get("line", 0),
+                s._l(i),
                 name=None,
                 equal=None,
                 exp=x,
@@ -1140,13 +1180,13 @@ class SA:
             return 0, i, None
         ok, p, x = s.sa_exp(p, 0)
         if not ok:
-            return s.error("TNMSERR_SA_EXP_ILLEGAL", s._a(p)), i, None
+            return s.error_at("TNMSERR_SA_EXP_ILLEGAL", p), i, None
         s.last = err
         return (
             1,
             p,
             N(
-                s._a(i).get("line", 0),
+                s._l(i),
                 name=nm,
                 equal=eq,
                 exp=x,
@@ -1163,12 +1203,12 @@ class SA:
             return 0, i, None
         ok, p, nm = s.sa_atom(p, C.LA_T["VAL_STR"])
         if not ok:
-            return s.error("TNMSERR_SA_NAME_ILLEGAL_NAME", s._a(p)), i, None
+            return s.error_at("TNMSERR_SA_NAME_ILLEGAL_NAME", p), i, None
         ok, p, cs = s.sa_atom(p, C.LA_T["CLOSE_SUMI"])
         if not ok:
-            return s.error("TNMSERR_SA_NAME_NO_CLOSE_SUMI", s._a(p)), i, None
+            return s.error_at("TNMSERR_SA_NAME_NO_CLOSE_SUMI", p), i, None
         s.last = err
-        return 1, p, N(s._a(i).get("line", 0), open_s=os, close_s=cs, name=nm)
+        return 1, p, N(s._l(i), open_s=os, close_s=cs, name=nm)
 
     def sa_literal(s, i):
         for t in (C.LA_T["VAL_INT"], C.LA_T["VAL_STR"], C.LA_T["LABEL"]):
@@ -1190,6 +1230,8 @@ class SA:
         return 0, i, None
 
     def sa_operator_2(s, i, lastp):
+        if s._t(i) not in _OP2_TYPES:
+            return 0, i, None, None
         p = i
 
         def ck(tp, op, np):
@@ -1284,18 +1326,7 @@ class SA:
         return 0, i, None
 
     def analize(s):
-        s.atom_list = s.plad.get("atom_list", [])
-        for _ in range(256):
-            s.atom_list.append(
-                {
-                    "id": len(s.atom_list),
-                    "line": 0,
-                    "type": C.LA_T["NONE"],
-                    "opt": 0,
-                    "subopt": 0,
-                }
-            )
-        s.plad["atom_list"] = s.atom_list
+        # AtomList reads past its end as NONE atoms, so no sentinel padding
         s.clear()
         ok, p, root = s.sa_ss(0)
         if not ok:
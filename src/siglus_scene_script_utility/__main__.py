@@ -30,7 +30,7 @@ def _usage(out=None):
     out.write("\n")
     out.write("Compile mode:\n")
     out.write(
-        f"  {p} -c [--debug] [--charset ENC] [--no-os] [--no-angou] [--parallel] [--max-workers N] [--lzss-level N] [--set-shuffle SEED] [--tmp <tmp_dir>] [--test-shuffle [seed0] <test_dir>] <input_dir> <output_pck|output_dir>\n"
+        f"  {p} -c [--debug] [--charset ENC] [--no-os] [--no-angou] [--parallel] [--max-workers N] [--lzss-level N] [--lzss-fast] [--lzss-optimal] [--set-shuffle SEED] [--cache DIR] [--cache-size MB] [--mem-budget MB] [--watch] [--trace OUT.json] [--tmp <tmp_dir>] [--test-shuffle [seed0] <test_dir>] <input_dir> <output_pck|output_dir>\n"
     )
     out.write(
         f"  {p} -c --test-shuffle [seed0] <input_dir> <output_pck|output_dir> <test_dir>\n"
@@ -42,10 +42,25 @@ def _usage(out=None):
     out.write("    --no-angou     Disable encryption/compression (header_size=0)\n")
     out.write("    --parallel     Enable parallel compilation\n")
     out.write("    --max-workers  Limit parallel workers (default: auto)\n")
-    out.write("    --lzss-level   LZSS compression level (2-17, default: 17)\n")
+    out.write(
+        "    --lzss-level   LZSS compression level (2-17, 18 = optimal, default: 17)\n"
+    )
+    out.write(
+        "    --lzss-fast    Fast LZSS encoder for iteration builds (not byte-identical)\n"
+    )
+    out.write("    --lzss-optimal Smallest LZSS output for release builds (slower)\n")
     out.write(
         "    --set-shuffle  Set initial shuffle seed (MSVCRand) for .dat string order\n"
     )
+    out.write("    --cache DIR    Reuse per-script stage outputs cached in DIR\n")
+    out.write("    --cache-size   Size budget of --cache in MB (default: 2048)\n")
+    out.write(
+        "    --mem-budget   MB of compiled scenes kept in memory (default: 1024)\n"
+    )
+    out.write(
+        "    --watch        Stay running; rebuild on changes (stdin: build, quit)\n"
+    )
+    out.write("    --trace FILE   Write per-file stage spans (Chrome trace JSON)\n")
     out.write("    --tmp          Use specific temp directory\n")
     out.write(
         "    --test-shuffle  Bruteforce initial shuffle seed (MSVCRand) for .dat string order\n"
@@ -0,0 +1,140 @@
+"""
+In-memory store for compiled scene artifacts (the .dat and .lzss blobs).
+
+BS used to write tmp/bs/<name>.dat, and the linker read it back, wrote
+tmp/bs/<name>.lzss and read that back too. The compiler now keeps both blobs
+in an ArtifactStore (ctx["artifacts"]) and hands them from BS to LZSS to
+the pack writer directly. Files under tmp/bs are only written:
+
+- when the store persists (--tmp, --debug, --test-shuffle): the tmp dir is
+  the incremental build cache or is kept for inspection
+- when holding a blob would exceed the memory budget (--mem-budget); it is
+  then written to disk instead of kept in memory
+
+get() falls back to tmp/bs, so scenes an incremental build did not recompile
+are read from disk as before. Listeners (add_listener) hear about every put,
+which is how LzssPipeline starts compressing a scene as soon as BS is done.
+Callers that build their own ctx without a store get a persisting one
+(artifact_store), i.e. the old on-disk behavior.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import tracing
+from .CA import rd, wr
+
+# Default memory budget (bytes) for blobs held in memory
+DEFAULT_BUDGET = 1024 * 1024 * 1024
+
+
+class ArtifactStore:
+    """
+    Scene blobs by (scene name, kind), kind being "dat" or "lzss".
+
+    Thread-safe: parallel LZSS workers put their results concurrently.
+    """
+
+    def __init__(
+        self,
+        bs_dir: str,
+        persist: bool = True,
+        budget: Optional[int] = DEFAULT_BUDGET,
+    ):
+        """
+        Args:
+            bs_dir: Directory for spilled / persisted blobs (tmp/bs)
+            persist: Also write every blob to bs_dir
+            budget: Bytes that may be held in memory (None = unlimited)
+        """
+        self.bs_dir = bs_dir
+        self.persist = bool(persist)
+        self.budget = budget
+        self._mem: Dict[Tuple[str, str], bytes] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str, str, bytes], None]] = []
+        self._fresh = set()
+
+    def path(self, nm: str, kind: str) -> str:
+        return os.path.join(self.bs_dir, nm + "." + kind)
+
+    def add_listener(self, fn: Callable[[str, str, bytes], None]) -> None:
+        """Call fn(nm, kind, data) after every put."""
+        self._listeners.append(fn)
+
+    def remove_listener(self, fn: Callable[[str, str, bytes], None]) -> None:
+        if fn in self._listeners:
+            self._listeners.remove(fn)
+
+    def fresh(self, nm: str) -> bool:
+        """True if the scene's .dat was put by this run (i.e. recompiled)."""
+        return nm in self._fresh
+
+    def mem_size(self) -> int:
+        """Bytes currently held in memory."""
+        return self._size
+
+    def put(self, nm: str, kind: str, data: bytes) -> None:
+        """
+        Store a blob. A new .dat drops the scene's in-memory .lzss.
+
+        Args:
+            nm: Scene name (without extension)
+            kind: "dat" or "lzss"
+            data: Blob
+        """
+        data = bytes(data)
+        with self._lock:
+            self._drop((nm, kind))
+            if kind == "dat":
+                self._drop((nm, "lzss"))
+                self._fresh.add(nm)
+            keep = self.budget is None or self._size + len(data) <= self.budget
+            if keep:
+                self._mem[(nm, kind)] = data
+                self._size += len(data)
+        if self.persist or not keep:
+            t = time.time()
+            wr(self.path(nm, kind), data, 1)
+            tracing.record("write", nm + "." + kind, t, bytes_out=len(data))
+        for fn in list(self._listeners):
+            fn(nm, kind, data)
+
+    def get(self, nm: str, kind: str) -> Optional[bytes]:
+        """Return a blob from memory or bs_dir, or None if there is none."""
+        with self._lock:
+            data = self._mem.get((nm, kind))
+        if data is not None:
+            return data
+        p = self.path(nm, kind)
+        if os.path.isfile(p):
+            return rd(p, 1)
+        return None
+
+    def size(self, nm: str, kind: str) -> int:
+        """Size of a blob in memory or bs_dir (0 if there is none)."""
+        with self._lock:
+            data = self._mem.get((nm, kind))
+        if data is not None:
+            return len(data)
+        try:
+            return os.path.getsize(self.path(nm, kind))
+        except OSError:
+            return 0
+
+    def _drop(self, key) -> None:
+        data = self._mem.pop(key, None)
+        if data is not None:
+            self._size -= len(data)
+
+
+def artifact_store(ctx: Dict) -> ArtifactStore:
+    """Return ctx["artifacts"], creating a persisting store on first use."""
+    st = ctx.get("artifacts")
+    if st is None:
+        st = ArtifactStore(os.path.join(ctx.get("tmp_path") or ".", "bs"))
+        ctx["artifacts"] = st
+    return st
@@ -12,12 +12,22 @@ from .BS import (
     compile_one,
     set_shuffle_seed,
     build_ia_data,
+    _str_key,
+    _xor_u16,
+    _evict_stage_cache,
 )
 from . import CA
+from . import incdeps
+from .artifacts import ArtifactStore
+from . import tracing
 from .CA import rd, wr, _parse_code
 from .GEI import write_gameexe_dat
 from .linker import link_pack
+from .parallel import LzssPipeline
+from .stage_cache import open_stage_cache
 from .native_ops import (
+    LZSS_LEVEL_FAST,
+    LZSS_LEVEL_OPTIMAL,
     lzss_pack,
     xor_cycle_inplace,
     md5_digest,
@@ -208,6 +218,47 @@ def source_angou_encrypt(data: bytes, name: str, ctx: dict) -> bytes:
     return bytes(out)
 
 
+def source_angou_encrypt_with_cache(
+    src_path: str, name: str, cache_path: str, ctx: dict
+):
+    """
+    source_angou_encrypt a source file, reusing earlier results.
+
+    cache_path (tmp/os/<name>) holds the blob of the last build in the same
+    tmp dir and is used while it is newer than the source. With --cache,
+    the stage cache supplies the blob of an identical source encrypted by
+    any earlier build.
+
+    Returns:
+        Tuple of (encrypted blob, True if it came from a cache)
+    """
+    if cache_path and os.path.isfile(cache_path):
+        try:
+            if os.path.getmtime(cache_path) >= os.path.getmtime(src_path):
+                return rd(cache_path, 1), True
+        except Exception:
+            pass
+    raw = rd(src_path, 1)
+    cache = open_stage_cache(ctx)
+    key = ""
+    if cache is not None:
+        key = cache.os_key(
+            raw, name, ctx.get("lzss_level", 17), ctx.get("source_angou")
+        )
+    enc = cache.get("os", key) if cache is not None else None
+    hit = enc is not None
+    if not hit:
+        enc = source_angou_encrypt(raw, name, ctx)
+        if cache is not None:
+            cache.put("os", key, enc)
+    if cache_path:
+        d = os.path.dirname(cache_path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        wr(cache_path, enc, 1)
+    return enc, hit
+
+
 def _is_int_token(t):
     if t is None:
         return False
@@ -278,14 +329,8 @@ def _read_scn_dat_str_pool(path):
         q = p + ln_u16 * 2
         if p < 0 or q > len(b):
             raise ValueError("bad str_list range")
-        k = (28807 * int(orig)) & 0xFFFFFFFF
-        ws = struct.unpack_from("<" + "H" * ln_u16, b, p)
-        bb = bytearray(ln_u16 * 2)
-        for i, w in enumerate(ws):
-            v = (int(w) ^ k) & 0xFFFF
-            bb[i * 2] = v & 0xFF
-            bb[i * 2 + 1] = (v >> 8) & 0xFF
-        out.append(bytes(bb).decode("utf-16le", "surrogatepass"))
+        bb = _xor_u16(b[p:q], _str_key(int(orig)))
+        out.append(bb.decode("utf-16le", "surrogatepass"))
     return out
 
 
@@ -407,7 +452,55 @@ def _print_summary(ctx):
         print(angou)
 
 
-def main(argv=None):
+def _inc_rebuild_set(ctx, old, ss):
+    """
+    Scripts to recompile after an .inc change, or None for a full rebuild.
+
+    Uses the include dependency graph saved by the previous build (see
+    incdeps.py).
+    """
+    old_sym = old.get("inc_sym")
+    old_deps = old.get("inc_deps")
+    if not isinstance(old_sym, dict) or not isinstance(old_deps, dict):
+        return None
+    iad = build_ia_data(ctx)
+    ctx["ia_data"] = iad
+    enc = "utf-8" if ctx.get("utf8") else "cp932"
+    if old.get("inc_shape") != incdeps.inc_shape(iad, enc):
+        return None
+    new_sym = ctx.get("inc_symbols") or {}
+    reps = incdeps.replace_entries(iad)
+    out = set()
+    for p in ss or []:
+        deps = old_deps.get(os.path.basename(p).lower())
+        if incdeps.affected(rd(p, 0, enc=enc), deps, old_sym, new_sym, reps):
+            out.add(p)
+    return out
+
+
+def _session_compile_pool(session, ctx, max_workers):
+    from .parallel import create_compile_pool
+
+    if not isinstance(ctx.get("ia_data"), dict):
+        ctx["ia_data"] = build_ia_data(ctx)
+    pool = session.get("compile_pool")
+    if pool is not None and session.get("compile_pool_ia") != ctx.get("ia_hash"):
+        pool.shutdown()
+        pool = None
+    if pool is None:
+        pool = create_compile_pool(ctx, max_workers)
+        session["compile_pool"] = pool
+        session["compile_pool_ia"] = ctx.get("ia_hash")
+    return pool
+
+
+def main(argv=None, session=None):
+    """
+    Compiler entry point (-c).
+
+    session: Optional dict kept by watch mode between builds (warm ia_data,
+    compile worker pool); see watch.py.
+    """
     import argparse
 
     # --test-shuffle: brute-force shuffle seed (15-bit MSVC rand())
@@ -483,7 +576,23 @@ def main(argv=None):
         "--lzss-level",
         type=int,
         default=17,
-        help="LZSS compression level (2-17, default: 17).",
+        help="LZSS compression level (2-17, 18 = --lzss-optimal, default: 17).",
+    )
+    ap.add_argument(
+        "--lzss-fast",
+        action="store_true",
+        help=(
+            "Use the fast hash-chain LZSS encoder (for iteration builds; "
+            "output is not byte-identical to the original encoder's)."
+        ),
+    )
+    ap.add_argument(
+        "--lzss-optimal",
+        action="store_true",
+        help=(
+            "Use the optimal-parse LZSS encoder for the smallest Scene.pck "
+            "(slower; output is not byte-identical to the original encoder's)."
+        ),
     )
     ap.add_argument(
         "--set-shuffle",
@@ -494,7 +603,44 @@ def main(argv=None):
             "Accepts decimal or 0x... (default: 1)."
         ),
     )
+    ap.add_argument(
+        "--cache",
+        dest="cache_dir",
+        default="",
+        help=(
+            "Reuse compile stage outputs and LZSS / source angou blobs from "
+            "this directory (content-addressed). Entries are pickles, so "
+            "loading a planted entry runs arbitrary code: never use a "
+            "directory other users can write to."
+        ),
+    )
+    ap.add_argument(
+        "--cache-size",
+        type=int,
+        default=None,
+        help="Size budget of --cache in MB; least recently used entries are evicted.",
+    )
+    ap.add_argument(
+        "--mem-budget",
+        type=int,
+        default=1024,
+        help=(
+            "MB of compiled scene data kept in memory between compile and link; "
+            "the rest is spilled to the tmp dir (default: 1024)."
+        ),
+    )
     ap.add_argument("--gei", action="store_true", help="Only generate Gameexe.dat.")
+    ap.add_argument(
+        "--trace",
+        dest="trace_path",
+        default="",
+        help="Write per-file, per-stage spans as Chrome trace-event JSON.",
+    )
+    ap.add_argument(
+        "--watch",
+        action="store_true",
+        help="Stay running and rebuild when input files change (see watch.py).",
+    )
     try:
         a = ap.parse_args(argv)
     except ValueError as exc:
@@ -540,6 +686,22 @@ def main(argv=None):
         if (not test_dir) or (not os.path.isdir(test_dir)):
             sys.stderr.write("test_dir not found\n")
             return 1
+    if a.watch:
+        if test_shuffle or a.gei or session is not None:
+            sys.stderr.write(
+                f"{ap.prog}: error: --watch cannot be used with --gei/--test-shuffle\n"
+            )
+            return 2
+        from .watch import watch_loop
+
+        # Drop --watch and any abbreviation of it argparse accepted
+        argv2 = [x for x in argv if not (len(x) > 2 and "--watch".startswith(x))]
+        tmp = (
+            os.path.abspath(a.tmp_dir) if a.tmp_dir else os.path.join(out, "tmp_watch")
+        )
+        if not a.tmp_dir:
+            argv2 += ["--tmp", tmp]
+        return watch_loop(argv2, inp, skip_dirs=(out, tmp))
     os.makedirs(out, exist_ok=True)
     tmp = ""
     tmp_auto = False
@@ -572,7 +734,13 @@ def main(argv=None):
         "ini_list": ini,
         "utf8": bool(use_utf8),
         "charset": enc,
-        "lzss_level": a.lzss_level,
+        "lzss_level": (
+            LZSS_LEVEL_FAST
+            if a.lzss_fast
+            else LZSS_LEVEL_OPTIMAL
+            if a.lzss_optimal
+            else a.lzss_level
+        ),
         "test_check": bool(a.debug),
         "lzss_mode": (not a.no_angou),
         "exe_angou_mode": (not a.no_angou),
@@ -586,8 +754,19 @@ def main(argv=None):
         "defined_names": set(),
         "stop_after": "link",
         "debug": bool(a.debug),
+        "trace": bool(a.trace_path),
+        "stage_cache": os.path.abspath(a.cache_dir) if a.cache_dir else "",
+        "stage_cache_max": (int(a.cache_size) * 1024 * 1024 if a.cache_size else None),
     }
+    # Scene blobs stay in memory; tmp/bs is written only if it outlives the
+    # run (--tmp incremental cache, --debug) or --test-shuffle reads it back.
+    ctx["artifacts"] = ArtifactStore(
+        os.path.join(tmp, "bs"),
+        persist=bool(a.tmp_dir or a.debug or test_shuffle),
+        budget=max(0, int(a.mem_budget)) * 1024 * 1024,
+    )
     _init_stats(ctx)
+    tracing.enable(bool(a.trace_path))
 
     angou_content = None
     angou_path = os.path.join(inp, "暗号.dat")
@@ -604,10 +783,12 @@ def main(argv=None):
         angou_content = None
     _record_angou(ctx, angou_content)
     ok = False
+    pipeline = None
     try:
         t = time.time()
         ge_path = write_gameexe_dat(ctx)
         _record_stage_time(ctx, "GEI", time.time() - t)
+        tracing.record("GEI", "Gameexe.dat", t)
         _record_output(ctx, ge_path, "Gameexe.dat")
         if not a.gei:
             angou_hdr = os.path.join(tmp, "EXE_ANGOU.h")
@@ -637,6 +818,9 @@ def main(argv=None):
                 for p in ss or []:
                     if os.path.isfile(p):
                         cur_ss[os.path.basename(p).lower()] = _md5_file(p)
+                ia_key = json.dumps([cur_inc, enc, sorted(ctx["defined_names"])])
+                if session is not None and session.get("ia_key") == ia_key:
+                    ctx.update(session.get("ia") or {})
                 old = None
                 if os.path.isfile(md5_path):
                     try:
@@ -644,15 +828,35 @@ def main(argv=None):
                     except Exception:
                         old = None
                 full_compile = False
+                inc_rebuild = set()
+                if isinstance(old, dict) and isinstance(old.get("times"), dict):
+                    # Per-file compile times of the last build: --parallel
+                    # starts the slowest scripts first
+                    ctx["compile_time_hint"] = old["times"]
                 if not isinstance(old, dict):
                     full_compile = True
                 else:
                     old_inc = old.get("inc") or {}
                     for k in set(cur_inc.keys()) | set((old_inc or {}).keys()):
                         if str(cur_inc.get(k, "")) != str(old_inc.get(k, "")):
-                            full_compile = True
+                            inc_rebuild = _inc_rebuild_set(ctx, old, ss)
+                            if inc_rebuild is None:
+                                full_compile = True
                             break
                 bs_dir = os.path.join(tmp, "bs")
+                if isinstance(old, dict) and old.get("lzss_level", 17) != ctx.get(
+                    "lzss_level"
+                ):
+                    # Blobs compressed at another level (e.g. by a --lzss-fast
+                    # build) are compressed again from the .dat, never reused
+                    if os.path.isdir(bs_dir):
+                        for fn in os.listdir(bs_dir):
+                            if str(fn).lower().endswith(".lzss"):
+                                try:
+                                    os.remove(os.path.join(bs_dir, fn))
+                                except Exception:
+                                    pass
+                    shutil.rmtree(os.path.join(tmp, "os"), ignore_errors=True)
                 if full_compile:
                     if (not a.no_angou) and os.path.isdir(bs_dir):
                         for fn in os.listdir(bs_dir):
@@ -677,6 +881,8 @@ def main(argv=None):
                             need = True
                         elif str(cur_ss.get(b, "")) != str(old_ss.get(b, "")):
                             need = True
+                        elif p in inc_rebuild:
+                            need = True
                         if need:
                             comp.add(p)
                     compile_list = sorted(
@@ -694,6 +900,11 @@ def main(argv=None):
             if test_shuffle:
                 # Always test against all scripts (ignore incremental build cache)
                 compile_list = ss
+            if not a.no_angou:
+                # Compress each scene (and encrypt the sources) while the
+                # remaining scripts compile; link_pack joins the results
+                pipeline = LzssPipeline(ctx, a.max_workers)
+                ctx["lzss_pipeline"] = pipeline
             if compile_list:
                 if test_shuffle:
                     bs_dir = os.path.join(tmp, "bs")
@@ -811,6 +1022,10 @@ def main(argv=None):
                             "test-shuffle: seed matched first script but mismatch found in later scripts"
                         )
                 else:
+                    if session is not None and a.parallel and len(compile_list) > 1:
+                        ctx["compile_pool"] = _session_compile_pool(
+                            session, ctx, a.max_workers
+                        )
                     compile_all(
                         ctx,
                         compile_list,
@@ -819,12 +1034,43 @@ def main(argv=None):
                         parallel=a.parallel,
                     )
             pp = link_pack(ctx)
+            # LZSS / OS blobs were added to the stage cache while linking
+            _evict_stage_cache(ctx)
             _record_output(ctx, pp, ctx.get("scene_pck"))
+            if (
+                session is not None
+                and md5_path
+                and isinstance(ctx.get("ia_data"), dict)
+            ):
+                session["ia_key"] = ia_key
+                session["ia"] = {
+                    k: ctx[k] for k in ("ia_data", "ia_hash", "inc_symbols") if k in ctx
+                }
             if md5_path:
+                md5_data = {
+                    "inc": cur_inc,
+                    "ss": cur_ss,
+                    "lzss_level": ctx.get("lzss_level"),
+                }
+                inc_deps = {}
+                if isinstance(old, dict) and not full_compile:
+                    md5_data["inc_sym"] = old.get("inc_sym")
+                    md5_data["inc_shape"] = old.get("inc_shape")
+                    inc_deps.update(old.get("inc_deps") or {})
+                if isinstance(ctx.get("ia_data"), dict):
+                    md5_data["inc_sym"] = ctx.get("inc_symbols")
+                    md5_data["inc_shape"] = incdeps.inc_shape(
+                        ctx["ia_data"], "utf-8" if ctx.get("utf8") else "cp932"
+                    )
+                inc_deps.update(ctx.get("inc_deps") or {})
+                md5_data["inc_deps"] = {k: inc_deps.get(k) for k in cur_ss}
+                times = dict(ctx.get("compile_time_hint") or {})
+                times.update(ctx.get("compile_times") or {})
+                md5_data["times"] = {k: times[k] for k in cur_ss if k in times}
                 wr(
                     md5_path,
                     json.dumps(
-                        {"inc": cur_inc, "ss": cur_ss},
+                        md5_data,
                         ensure_ascii=False,
                         sort_keys=True,
                     ),
@@ -839,7 +1085,15 @@ def main(argv=None):
         sys.stderr.write(msg + "\n")
         ok = False
     finally:
+        if pipeline is not None:
+            pipeline.close()
         _print_summary(ctx)
+        if a.trace_path:
+            try:
+                tracing.write_trace(a.trace_path)
+            except Exception as e:
+                sys.stderr.write(f"trace: {e}\n")
+            tracing.enable(False)
         if ok and (not a.debug) and tmp and tmp_auto:
             shutil.rmtree(tmp, ignore_errors=True)
     return 0 if ok else 1
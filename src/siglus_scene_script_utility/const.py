@@ -2200,13 +2200,6 @@ ELM_OWNER_USER_PROP = 127
 ELM_OWNER_USER_CMD = 126
 ELM_OWNER_CALL_PROP = 125
 ELM_ARRAY = -1
-ELM_GLOBAL_SEL = None
-ELM_GLOBAL_SEL_CANCEL = None
-ELM_GLOBAL_SELMSG = None
-ELM_GLOBAL_SELMSG_CANCEL = None
-ELM_GLOBAL_SEL_IMAGE = None
-ELM_GLOBAL_CUR_CALL = 83
-ELM_GLOBAL_MSG_BLOCK = None
 SEL_GLOBAL_CODE_NAMES = (
     "ELM_GLOBAL_SEL",
     "ELM_GLOBAL_SEL_CANCEL",
@@ -2223,6 +2216,7 @@ def is_global_sel_command(parent_form, element_code):
         ec = int(element_code)
     except Exception:
         return False
+    _load_elm_codes()
     return any(
         isinstance((v := globals().get(n)), int) and ec == v
         for n in SEL_GLOBAL_CODE_NAMES
@@ -2248,18 +2242,49 @@ def _sanitize_ident(s):
     return t
 
 
-try:
-    _defs = SYSTEM_ELEMENT_DEFS or []
-    for it in _defs:
-        if not isinstance(it, (list, tuple)) or len(it) < 7:
-            continue
-        tp, parent, form, name, owner, group, code, *rest = it
-        if not isinstance(parent, str) or not isinstance(name, str):
-            continue
-        k = "ELM_%s_%s" % (_sanitize_ident(parent), _sanitize_ident(name))
-        globals()[k] = create_elm_code(owner, group, code)
-except Exception:
-    pass
+_ELM_LOADED = False
+
+
+def _load_elm_codes():
+    # ELM_<PARENT>_<NAME> codes for every SYSTEM_ELEMENT_DEFS entry. Building
+    # them costs most of this module's import time and only the compiler
+    # needs them, so they are defined on first use (see __getattr__).
+    global _ELM_LOADED
+    if _ELM_LOADED:
+        return
+    _ELM_LOADED = True
+    g = globals()
+    g.update(
+        ELM_GLOBAL_SEL=None,
+        ELM_GLOBAL_SEL_CANCEL=None,
+        ELM_GLOBAL_SELMSG=None,
+        ELM_GLOBAL_SELMSG_CANCEL=None,
+        ELM_GLOBAL_SEL_IMAGE=None,
+        ELM_GLOBAL_CUR_CALL=83,
+        ELM_GLOBAL_MSG_BLOCK=None,
+    )
+    try:
+        _defs = SYSTEM_ELEMENT_DEFS or []
+        for it in _defs:
+            if not isinstance(it, (list, tuple)) or len(it) < 7:
+                continue
+            tp, parent, form, name, owner, group, code, *rest = it
+            if not isinstance(parent, str) or not isinstance(name, str):
+                continue
+            k = "ELM_%s_%s" % (_sanitize_ident(parent), _sanitize_ident(name))
+            g[k] = create_elm_code(owner, group, code)
+    except Exception:
+        pass
+
+
+def __getattr__(name):
+    if name.startswith("ELM_") and not _ELM_LOADED:
+        _load_elm_codes()
+        if name in globals():
+            return globals()[name]
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
 OP_AMARI = 5
 OP_AND = 49
 OP_DIVIDE = 4
@@ -1,14 +1,19 @@
 import sys
 import os
+import mmap
 import struct
 import time
 import glob
 import csv
 from . import const as C
 from .CA import rd, wr, _parse_code
-from . import compiler
-from . import GEI
-from .native_ops import lzss_pack, lzss_unpack, tile_copy
+from .native_ops import (
+    lzss_pack,
+    lzss_unpack,
+    md5_digest,
+    tile_copy,
+    xor_cycle_inplace,
+)
 
 
 # --- DBS export support -------------------------------------------------
@@ -343,21 +348,21 @@ def _xor_cycle(data: bytes, code: bytes, start: int = 0) -> bytes:
     if not code:
         return data
     b = bytearray(data)
-    n = len(code)
-    st = int(start) % n if n else 0
-    for i in range(len(b)):
-        b[i] ^= code[(st + i) % n]
+    xor_cycle_inplace(b, code, int(start) % len(code))
     return bytes(b)
 
 
-def _looks_like_lzss(blob: bytes) -> bool:
-    if not blob or len(blob) < 8:
+def _looks_like_lzss(blob: bytes, size: int = -1) -> bool:
+    # size: length of the whole blob when only its head is passed
+    if size < 0:
+        size = len(blob) if blob else 0
+    if not blob or len(blob) < 8 or size < 8:
         return False
     try:
         pack_sz, org_sz = struct.unpack_from("<II", blob, 0)
     except Exception:
         return False
-    if pack_sz != len(blob):
+    if pack_sz != size:
         return False
     if org_sz <= 0:
         return False
@@ -425,7 +430,7 @@ def _read_utf16le_strings(dat: bytes, idx_pairs, blob_ofs: int, blob_bytes: int)
             out.append("")
             continue
         try:
-            s = blob[bo : bo + bl].decode("utf-16le", "surrogatepass")
+            s = bytes(blob[bo : bo + bl]).decode("utf-16le", "surrogatepass")
         except Exception:
             s = ""
         out.append(s)
@@ -447,6 +452,100 @@ def _read_blobs(dat: bytes, idx_pairs, blob_ofs: int, blob_bytes: int):
     return out
 
 
+class PckReader:
+    """
+    Read-only Scene.pck backed by mmap.
+
+    dat is a memoryview of the mapping, and the section readers above slice
+    it without copying, so scene blobs stay views into the file until they
+    are decoded. The OS pages the pack in as it is read instead of the whole
+    file being loaded up front. Use it as a context manager.
+    """
+
+    def __init__(self, path: str):
+        self._f = open(path, "rb")
+        self._mm = None
+        self.dat = memoryview(b"")
+        try:
+            try:
+                self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # An empty file cannot be mapped
+                pass
+            if self._mm is not None:
+                self.dat = memoryview(self._mm)
+            self.hdr = _parse_pack_header(self.dat)
+            self.scn_data_idx = _read_i32_pairs(
+                self.dat,
+                self.hdr.get("scn_data_index_list_ofs", 0),
+                self.hdr.get("scn_data_index_cnt", 0),
+            )
+            self.scn_data_size = max([a + b for a, b in self.scn_data_idx], default=0)
+        except BaseException:
+            # __exit__ never runs when __init__ raises
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        self.dat.release()
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                # A caller still holds a view; the mapping goes with it
+                pass
+        self._f.close()
+
+    def scene_names(self):
+        idx = _read_i32_pairs(
+            self.dat,
+            self.hdr.get("scn_name_index_list_ofs", 0),
+            self.hdr.get("scn_name_index_cnt", 0),
+        )
+        size = max([a + b for a, b in idx], default=0) * 2
+        return _read_utf16le_strings(
+            self.dat, idx, self.hdr.get("scn_name_list_ofs", 0), size
+        )
+
+    def scenes(self):
+        """Return [(name, blob view)] in pack order."""
+        names = self.scene_names()
+        blobs = _read_blobs(
+            self.dat,
+            self.scn_data_idx,
+            self.hdr.get("scn_data_list_ofs", 0),
+            self.scn_data_size,
+        )
+        return list(zip(names, blobs))
+
+
+def _scene_dat(blob, exe_el: bytes, easy_code: bytes) -> bytes:
+    # One copy of the blob: both angou layers are undone in place, and only
+    # the 8-byte head is decoded to tell whether easy angou was applied.
+    b = bytearray(blob)
+    if exe_el:
+        xor_cycle_inplace(b, exe_el, 0)
+    if easy_code:
+        head = bytearray(b[:8])
+        xor_cycle_inplace(head, easy_code, 0)
+        if _looks_like_lzss(head, len(b)):
+            xor_cycle_inplace(b, easy_code, 0)
+        elif not _looks_like_lzss(b):
+            return bytes(b)
+    elif not _looks_like_lzss(b):
+        return bytes(b)
+    try:
+        return lzss_unpack(bytes(b))
+    except Exception:
+        return b""
+
+
 def _md5_dword(md5_code: bytes, ofs: int) -> int:
     if ofs is None:
         return 0
@@ -522,13 +621,13 @@ def source_angou_decrypt(enc: bytes, ctx: dict):
     dp2_mv = memoryview(dp2)
     sp1 = lzb_mv[0:mapt]
     sp2 = lzb_mv[bh : bh + mapt]
-    compiler.tile_copy(sp1, dp1_mv, mapw, maph, mask, mw, mh, repx, repy, 0, lim)
-    compiler.tile_copy(sp1, dp2_mv, mapw, maph, mask, mw, mh, repx, repy, 1, lim)
-    compiler.tile_copy(sp2, dp2_mv, mapw, maph, mask, mw, mh, repx, repy, 0, lim)
-    compiler.tile_copy(sp2, dp1_mv, mapw, maph, mask, mw, mh, repx, repy, 1, lim)
+    tile_copy(sp1, dp1_mv, mapw, maph, mask, mw, mh, repx, repy, 0, lim)
+    tile_copy(sp1, dp2_mv, mapw, maph, mask, mw, mh, repx, repy, 1, lim)
+    tile_copy(sp2, dp2_mv, mapw, maph, mask, mw, mh, repx, repy, 0, lim)
+    tile_copy(sp2, dp1_mv, mapw, maph, mask, mw, mh, repx, repy, 1, lim)
     lz = bytes(lzb[:lzsz])
     try:
-        if compiler.md5_digest(lz) != md5_code[:16]:
+        if md5_digest(lz) != md5_code[:16]:
             raise RuntimeError("source_angou: md5 mismatch")
     except Exception:
         pass
@@ -576,38 +675,26 @@ def _compute_exe_el(os_dir: str):
     mb = s.encode("cp932", "ignore")
     if len(mb) < 8:
         return b""
-    return compiler.exe_angou_element(mb)
+    from .compiler import exe_angou_element
+
+    return exe_angou_element(mb)
 
 
 def extract_pck(input_pck: str, output_dir: str, dat_txt: bool = False) -> int:
     input_pck = os.path.abspath(input_pck)
     output_dir = os.path.abspath(output_dir)
+    with PckReader(input_pck) as pck:
+        return _extract_pck(pck, output_dir, dat_txt)
+
+
+def _extract_pck(pck: PckReader, output_dir: str, dat_txt: bool) -> int:
     ok_cnt = 0
-    dat = rd(input_pck, 1)
-    hdr = _parse_pack_header(dat)
+    dat = pck.dat
+    hdr = pck.hdr
     if not hdr:
         sys.stderr.write("Invalid pck: header too small\n")
         return 1
-    scn_name_idx = _read_i32_pairs(
-        dat, hdr.get("scn_name_index_list_ofs", 0), hdr.get("scn_name_index_cnt", 0)
-    )
-    scn_name_blob_len = max([a + b for a, b in scn_name_idx], default=0) * 2
-    scn_names = _read_utf16le_strings(
-        dat, scn_name_idx, hdr.get("scn_name_list_ofs", 0), scn_name_blob_len
-    )
-    scn_data_idx = _read_i32_pairs(
-        dat, hdr.get("scn_data_index_list_ofs", 0), hdr.get("scn_data_index_cnt", 0)
-    )
-    scn_data = _read_blobs(
-        dat,
-        scn_data_idx,
-        hdr.get("scn_data_list_ofs", 0),
-        max([a + b for a, b in scn_data_idx], default=0),
-    )
-    if len(scn_names) != len(scn_data):
-        n = min(len(scn_names), len(scn_data))
-        scn_names = scn_names[:n]
-        scn_data = scn_data[:n]
+    scenes = pck.scenes()
     out_dir = os.path.join(
         output_dir, "output_" + time.strftime("%Y%m%d_%H%M%S", time.localtime())
     )
@@ -619,10 +706,7 @@ def extract_pck(input_pck: str, output_dir: str, dat_txt: bool = False) -> int:
     orig_hsz = int(hdr.get("original_source_header_size", 0) or 0)
     if orig_hsz > 0:
         try:
-            blob_end = hdr.get("scn_data_list_ofs", 0) + max(
-                [a + b for a, b in scn_data_idx], default=0
-            )
-            pos = int(blob_end)
+            pos = int(hdr.get("scn_data_list_ofs", 0) + pck.scn_data_size)
             size_list_enc = dat[pos : pos + orig_hsz]
             size_bytes, _ = source_angou_decrypt(size_list_enc, ctx)
             if size_bytes and (len(size_bytes) % 4 == 0):
@@ -658,25 +742,10 @@ def extract_pck(input_pck: str, output_dir: str, dat_txt: bool = False) -> int:
     A = None
     if dat_txt:
         from . import analyze as A
-    for nm, blob in zip(scn_names, scn_data):
+    for nm, blob in scenes:
         if not nm:
             continue
-        b = blob
-        if exe_el:
-            b = _xor_cycle(b, exe_el, 0)
-        lz = b""
-        cand = _xor_cycle(b, easy_code, 0) if easy_code else b""
-        if cand and _looks_like_lzss(cand):
-            lz = cand
-        elif _looks_like_lzss(b):
-            lz = b
-        if lz:
-            try:
-                out_dat = lzss_unpack(lz)
-            except Exception:
-                out_dat = b""
-        else:
-            out_dat = b
+        out_dat = _scene_dat(blob, exe_el, easy_code)
         rel = _safe_relpath(nm + ".dat") or (nm + ".dat")
         out_name = os.path.basename(rel) or rel
         out_path = _unique_outpath(bs_dir, out_name)
@@ -745,6 +814,8 @@ def main(argv=None):
     if len(args) != 2:
         return 2
     if gei:
+        from . import GEI
+
         exe_el = _compute_exe_el(os.path.dirname(os.path.abspath(args[0])))
         try:
             out_path = GEI.restore_gameexe_ini(args[0], args[1], exe_el=exe_el)
@@ -0,0 +1,156 @@
+"""
+Include dependency tracking for incremental compiles.
+
+An incremental compile (--tmp) used to rebuild every script whenever any .inc
+file changed. Instead, each inc-level symbol (#replace/#define/#macro,
+#property, #command) gets a digest of its definition, and every script
+records which of those symbols it references:
+
+- replace-tree names expanded by CA (CharacterAnalizer.used_names), the
+  script's own #inc_start replacements included
+- property/command identifiers seen by LA (lad['unknown_list'])
+
+Both are persisted in the tmp dir's _md5.json. After an .inc edit only
+scripts that reference a changed or removed symbol, or that could pick up a
+newly added one (their text names it, or they expand any replacement), are
+recompiled. Changes that renumber scene-level
+declarations (inc property/command counts, -D names, charset) still force a
+full rebuild.
+"""
+
+import hashlib
+from typing import Dict, Iterable, List, Optional, Set
+
+
+def _digest(*parts) -> str:
+    h = hashlib.sha1()
+    for p in parts:
+        h.update(repr(p).encode("utf-8", "surrogatepass"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def replace_entries(iad: Dict) -> Dict[str, Dict]:
+    """Return name -> #replace/#define/#macro entry of an ia_data replace tree."""
+    out = {}
+    _walk_replace_tree(iad.get("replace_tree"), out)
+    return out
+
+
+def _walk_replace_tree(rt, out: Dict) -> None:
+    stack = [rt]
+    while stack:
+        n = stack.pop()
+        if not isinstance(n, dict):
+            continue
+        rep = n.get("r")
+        if isinstance(rep, dict) and rep.get("name"):
+            out[rep["name"]] = rep
+        stack.extend((n.get("c") or {}).values())
+
+
+def inc_symbols(iad: Dict) -> Dict[str, str]:
+    """
+    Digest every inc-level symbol of an include analyzer result.
+
+    Args:
+        iad: ia_data from build_ia_data
+
+    Returns:
+        Dict of symbol name -> definition digest
+    """
+    out = {}
+    for name, rep in replace_entries(iad).items():
+        args = [(a.get("name", ""), a.get("def", "")) for a in rep.get("args") or []]
+        out[name] = _digest(rep.get("type"), rep.get("after", ""), args)
+    for p in iad.get("property_list") or []:
+        out[p["name"]] = _digest("property", p.get("id"), p.get("form"), p.get("size"))
+    for c in iad.get("command_list") or []:
+        out[c["name"]] = _digest(
+            "command", c.get("id"), c.get("form"), c.get("arg_list")
+        )
+    return out
+
+
+def inc_shape(iad: Dict, enc: str) -> str:
+    """Digest of everything that shifts scene-level declarations of all scripts."""
+    names = _symbol_names(iad)
+    extra = sorted(str(n) for n in iad.get("name_set") or [] if n not in names)
+    return _digest(
+        enc,
+        int(iad.get("inc_property_cnt", 0) or 0),
+        int(iad.get("inc_command_cnt", 0) or 0),
+        extra,
+    )
+
+
+def _symbol_names(iad: Dict) -> Set[str]:
+    names = set(replace_entries(iad))
+    names.update(p["name"] for p in iad.get("property_list") or [])
+    names.update(c["name"] for c in iad.get("command_list") or [])
+    return names
+
+
+def script_deps(
+    used_names: Iterable[str], lad: Optional[Dict], symbols: Dict[str, str]
+) -> List[str]:
+    """
+    Return the inc symbols a compiled script references.
+
+    Replacement names the script expanded are all kept, including its own
+    (#inc_start ... #inc_end) ones that are not inc symbols: their expansion
+    can form a name an .inc adds later (see affected).
+
+    Args:
+        used_names: Replace-tree names expanded while analyzing the script
+        lad: LA output of the script
+        symbols: Result of inc_symbols (only its keys are used)
+
+    Returns:
+        Sorted list of names
+    """
+    names = set(used_names or ())
+    names.update(n for n in (lad or {}).get("unknown_list") or () if n in symbols)
+    return sorted(names)
+
+
+def affected(
+    src_text: str,
+    deps: Optional[Iterable[str]],
+    old_symbols: Dict[str, str],
+    new_symbols: Dict[str, str],
+    reps: Dict[str, Dict],
+) -> bool:
+    """
+    Decide whether an .inc change requires recompiling one script.
+
+    Args:
+        src_text: Current source text of the script
+        deps: Symbols recorded for the script (None = unknown)
+        old_symbols: inc_symbols of the previous build
+        new_symbols: inc_symbols of the current include set
+        reps: replace_entries of the current ia_data
+
+    Returns:
+        True if the script must be recompiled
+    """
+    if deps is None:
+        return True
+    deps = set(deps)
+    for n in deps:
+        if old_symbols.get(n) != new_symbols.get(n):
+            return True
+    added = [n for n in new_symbols if n not in old_symbols]
+    if not added:
+        return False
+    # Expanded text is scanned again: a #define body joined with the source
+    # after it, macro arguments (or their defaults) inside a macro body. A new
+    # name can appear there without being spelled anywhere, so any script
+    # that expands a replacement is rebuilt. Deps that were not inc symbols
+    # are the script's own replacements.
+    if any(n in reps or n not in old_symbols for n in deps):
+        return True
+    # Otherwise the new name has to be in the script text itself. CA folds
+    # case, so compare lowercased text.
+    text = src_text.lower()
+    return any(n.lower() in text for n in added)
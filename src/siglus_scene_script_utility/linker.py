@@ -2,9 +2,14 @@ import os
 import struct
 import time
 import glob
+import json
 from . import const as C
+from . import tracing
+from .artifacts import artifact_store
 from .CA import rd, wr, _rt
+from .stage_cache import hash_bytes, tool_version
 from .IA import IncAnalyzer
+from .native_ops import xor_cycle_inplace
 
 
 def _enc_w(s):
@@ -121,15 +126,6 @@ def _parse_cmd_labels(dat):
     return out
 
 
-def _xor_cycle_inplace(buf, code, start=0):
-    if not code:
-        return
-    n = len(code)
-    st = int(start) % n
-    for i in range(len(buf)):
-        buf[i] ^= code[(st + i) % n]
-
-
 def _read_first_line(path, enc):
     try:
         txt = rd(path, 0, enc=enc)
@@ -170,7 +166,8 @@ def _get_scene_names(ctx):
 
 def _load_scene_data(ctx, scn_names, lzss_mode, max_workers=None, parallel=True):
     """
-    Load scene data files and optionally compress them with LZSS.
+    Load compiled scenes from the artifact store and optionally compress
+    them with LZSS.
 
     Args:
         ctx: Context dictionary containing paths and settings
@@ -182,8 +179,13 @@ def _load_scene_data(ctx, scn_names, lzss_mode, max_workers=None, parallel=True)
     Returns:
         Tuple of (enc_names, dat_list, lzss_list)
     """
-    tmp = ctx.get("tmp_path") or ""
-    bs_dir = os.path.join(tmp, "bs")
+    store = artifact_store(ctx)
+
+    pipeline = ctx.get("lzss_pipeline")
+    if pipeline is not None and lzss_mode:
+        result = pipeline.scenes(scn_names)
+        _set_stage_time(ctx, "LZSS", pipeline.lzss_time)
+        return result
 
     # Try parallel loading if enabled
     if parallel and lzss_mode and len(scn_names) > 1:
@@ -192,7 +194,7 @@ def _load_scene_data(ctx, scn_names, lzss_mode, max_workers=None, parallel=True)
 
             start = time.time()
             result = parallel_lzss_compress(
-                ctx, scn_names, bs_dir, lzss_mode, max_workers
+                ctx, scn_names, store, lzss_mode, max_workers
             )
             _set_stage_time(ctx, "LZSS", time.time() - start)
             return result
@@ -201,33 +203,28 @@ def _load_scene_data(ctx, scn_names, lzss_mode, max_workers=None, parallel=True)
             pass
 
     # Serial loading
-    from . import compiler as _m
+    from .parallel import lzss_compress_scenes
 
     enc_names = []
     dat_list = []
     lzss_list = []
-    easy_code = ctx.get("easy_angou_code") or b""
 
     for nm in scn_names:
-        dat_path = os.path.join(bs_dir, nm + ".dat")
-        if not os.path.isfile(dat_path):
-            raise FileNotFoundError(f"scene dat not found: {dat_path}")
+        dat = store.get(nm, "dat")
+        if dat is None:
+            raise FileNotFoundError(f"scene dat not found: {store.path(nm, 'dat')}")
         enc_names.append(nm)
         if lzss_mode:
-            lz_path = os.path.join(bs_dir, nm + ".lzss")
-            # Shared helper keeps serial/parallel cache behavior aligned
-            lzss_level = ctx.get("lzss_level", 17)
             t = time.time()
-            dat, lz, built_new = _m.load_dat_and_lzss(
-                dat_path, lz_path, easy_code, lzss_level
-            )
-            # Keep behavior identical: record timing only for newly-built cache
-            if built_new:
+            lz = store.get(nm, "lzss")
+            if lz is None:
+                (lz,) = lzss_compress_scenes(ctx, [dat], 1)
+                store.put(nm, "lzss", lz)
+                # Record timing only for newly built blobs
                 _record_stage_time(ctx, "LZSS", time.time() - t)
+            tracing.record("LZSS", nm + ".ss", t, bytes_in=len(dat), bytes_out=len(lz))
             _log_stage("LZSS", nm + ".ss")
             lzss_list.append(lz)
-        else:
-            dat = rd(dat_path, 1)
         dat_list.append(dat)
     return enc_names, dat_list, lzss_list
 
@@ -244,18 +241,6 @@ def _build_index_list_for_strings(strs):
     return idx, bytes(blob)
 
 
-def _build_index_list_for_blobs(blobs):
-    idx = []
-    ofs = 0
-    blob = bytearray()
-    for b in blobs:
-        b = b or b""
-        idx.append((ofs, len(b)))
-        blob.extend(b)
-        ofs += len(b)
-    return idx, bytes(blob)
-
-
 def _pack_i32_pairs(pairs):
     out = bytearray()
     for a, b in pairs:
@@ -291,31 +276,39 @@ def _pack_inc_cmds(cmds):
     return bytes(out)
 
 
-def _build_pack_bytes(
+def _pack_layout(
     inc_prop_list,
     inc_cmd_name_list,
     inc_prop_name_list,
     inc_cmd_list,
     scn_name_list,
-    scn_data_list,
-    scn_data_exe_angou_mod,
+    scn_data_sizes,
     original_source_header_size,
-    original_source_chunks,
 ):
+    """
+    Lay out a Scene.pck from the scene data sizes alone.
+
+    Returns:
+        (header fields, bytes of every section between the header and the
+        scene data); scene blobs and original source chunks follow in order
+    """
     hdr = {k: 0 for k in C._PACK_HDR_FIELDS}
     hdr["header_size"] = C._PACK_HDR_SIZE
-    hdr["scn_data_exe_angou_mod"] = int(scn_data_exe_angou_mod)
     hdr["original_source_header_size"] = int(original_source_header_size)
     inc_prop_blob = _pack_inc_props(inc_prop_list)
     inc_prop_idx, inc_prop_name_blob = _build_index_list_for_strings(inc_prop_name_list)
     inc_cmd_blob = _pack_inc_cmds(inc_cmd_list)
     inc_cmd_idx, inc_cmd_name_blob = _build_index_list_for_strings(inc_cmd_name_list)
     scn_name_idx, scn_name_blob = _build_index_list_for_strings(scn_name_list)
-    scn_data_idx, scn_data_blob = _build_index_list_for_blobs(scn_data_list)
-    b = bytearray(b"\0" * C._PACK_HDR_SIZE)
+    scn_data_idx = []
+    ofs = 0
+    for n in scn_data_sizes:
+        scn_data_idx.append((ofs, n))
+        ofs += n
+    b = bytearray()
 
     def _push(sec):
-        ofs = len(b)
+        ofs = C._PACK_HDR_SIZE + len(b)
         b.extend(sec)
         return ofs
 
@@ -337,17 +330,121 @@ def _build_pack_bytes(
     hdr["scn_name_cnt"] = len(scn_name_list)
     hdr["scn_data_index_list_ofs"] = _push(_pack_i32_pairs(scn_data_idx))
     hdr["scn_data_index_cnt"] = len(scn_data_idx)
-    hdr["scn_data_list_ofs"] = _push(scn_data_blob)
-    hdr["scn_data_cnt"] = len(scn_data_list)
+    hdr["scn_data_list_ofs"] = C._PACK_HDR_SIZE + len(b)
+    hdr["scn_data_cnt"] = len(scn_data_sizes)
+    return hdr, bytes(b)
+
+
+def _write_pack(outs, hdr, head, scn_data_list, original_source_chunks):
+    """
+    Stream a Scene.pck laid out by _pack_layout to one or more files.
+
+    Every output gets the same sections; one pass over the scene blobs
+    writes them all, XORing a copy of one blob at a time for the outputs
+    that need it.
+
+    Args:
+        outs: List of (file, exe angou element or None); outputs with an
+            element get scn_data_exe_angou_mod = 1 and XORed scene blobs
+        hdr: Header fields from _pack_layout
+        head: Section bytes from _pack_layout
+        scn_data_list: Scene blobs
+        original_source_chunks: Encrypted original source chunks
+
+    Returns:
+        Size of each written pack
+    """
+    fmt = "<" + "i" * len(C._PACK_HDR_FIELDS)
+    for f, code in outs:
+        h = dict(hdr, scn_data_exe_angou_mod=int(code is not None))
+        f.write(struct.pack(fmt, *[int(h[k]) for k in C._PACK_HDR_FIELDS]))
+        f.write(head)
+    size = C._PACK_HDR_SIZE + len(head)
+    for blob in scn_data_list:
+        blob = blob or b""
+        for f, code in outs:
+            if code is None:
+                f.write(blob)
+            else:
+                b = bytearray(blob)
+                xor_cycle_inplace(b, code, 0)
+                f.write(b)
+        size += len(blob)
     for ch in original_source_chunks or []:
-        _push(ch)
-    struct.pack_into(
-        "<" + "i" * len(C._PACK_HDR_FIELDS),
-        b,
-        0,
-        *[int(hdr[k]) for k in C._PACK_HDR_FIELDS],
-    )
-    return bytes(b)
+        for f, _ in outs:
+            f.write(ch)
+        size += len(ch)
+    return size
+
+
+def _patch_pack(f, code, hdr, head, segs):
+    """
+    Turn the previous Scene.pck into the one laid out by _pack_layout.
+
+    Blobs the previous pack already holds at their new offset are left
+    alone. Reused blobs that moved are copied inside the file one at a time
+    before anything else is written, in memmove order: back to front for
+    those that move later, front to back for those that move earlier. Blobs
+    keep their relative order, so a copy never overwrites a blob that still
+    has to be read, and memory stays bounded by the largest blob.
+
+    Args:
+        f: Previous pack, opened "r+b"
+        code: Exe angou element or None (see _write_pack)
+        hdr: Header fields from _pack_layout
+        head: Section bytes from _pack_layout
+        segs: (offset, size, blob, old offset, is scene) for every scene
+            blob and original source chunk in file order; the blob is None
+            if it is only in the previous pack, the old offset None if the
+            previous pack does not hold it
+
+    Returns:
+        Tuple of (size of the pack, bytes written)
+    """
+    fmt = "<" + "i" * len(C._PACK_HDR_FIELDS)
+    h = dict(hdr, scn_data_exe_angou_mod=int(code is not None))
+    prefix = struct.pack(fmt, *[int(h[k]) for k in C._PACK_HDR_FIELDS]) + head
+    f.seek(0)
+    same_prefix = f.read(len(prefix)) == prefix
+    copies = [(ofs, size, old) for ofs, size, blob, old, _ in segs if blob is None]
+    copies = [c for c in copies if c[2] != c[0]]
+    written = 0
+    if any(a[2] + a[1] > b[2] for a, b in zip(copies, copies[1:])):
+        # Out of order (never produced by link_pack): read them all first
+        held = []
+        for ofs, size, old in copies:
+            f.seek(old)
+            held.append((ofs, f.read(size)))
+    else:
+        held = []
+        later = [c for c in copies if c[0] > c[2]]
+        earlier = [c for c in copies if c[0] < c[2]]
+        for ofs, size, old in list(reversed(later)) + earlier:
+            f.seek(old)
+            b = f.read(size)
+            f.seek(ofs)
+            f.write(b)
+            written += len(b)
+    if not same_prefix:
+        f.seek(0)
+        f.write(prefix)
+        written += len(prefix)
+    for ofs, b in held:
+        f.seek(ofs)
+        f.write(b)
+        written += len(b)
+    for ofs, size, blob, old, scene in segs:
+        if blob is None or old == ofs:
+            continue
+        if scene and code is not None:
+            blob = bytearray(blob)
+            xor_cycle_inplace(blob, code, 0)
+        f.seek(ofs)
+        f.write(blob)
+        written += len(blob)
+    size = segs[-1][0] + segs[-1][1] if segs else len(prefix)
+    f.truncate(size)
+    return size, written
 
 
 def _build_original_source_chunks(ctx, lzss_mode, max_workers=None, parallel=True):
@@ -369,7 +466,8 @@ def _build_original_source_chunks(ctx, lzss_mode, max_workers=None, parallel=Tru
         return (0, [])
     skip = ctx.get("original_source_mode") is False
     scn_path = ctx.get("scn_path") or ""
-    tmp_path = ctx.get("tmp_path") or ""
+    # The encrypted-source cache only pays off in a tmp dir that is kept
+    tmp_path = (ctx.get("tmp_path") or "") if artifact_store(ctx).persist else ""
     if tmp_path:
         os.makedirs(os.path.join(tmp_path, "os"), exist_ok=True)
     if not scn_path:
@@ -418,6 +516,7 @@ def _build_original_source_chunks(ctx, lzss_mode, max_workers=None, parallel=Tru
         sizes.append(len(enc_blob) & 0xFFFFFFFF)
         (not skip) and chunks.append(enc_blob)
         _record_stage_time(ctx, "OS", time.time() - start)
+        tracing.record("OS", rel, start, bytes_out=len(enc_blob))
     if not sizes:
         return (0, [])
     size_list_bytes = struct.pack("<" + "I" * len(sizes), *sizes)
@@ -425,6 +524,46 @@ def _build_original_source_chunks(ctx, lzss_mode, max_workers=None, parallel=Tru
     return (len(size_list_enc), [] if skip else [size_list_enc] + chunks)
 
 
+# Record of the last link in a kept tmp dir, used to patch its Scene.pck
+_LINK_MANIFEST = "_link.json"
+
+
+def _link_config(ctx, lzss_mode, code):
+    """Inputs of a Scene.pck other than the scene and source bytes."""
+    return {
+        "version": tool_version(),
+        "scn_path": os.path.abspath(ctx.get("scn_path") or ""),
+        "lzss_mode": bool(lzss_mode),
+        "lzss_level": ctx.get("lzss_level", 17),
+        "easy_code": hash_bytes(ctx.get("easy_angou_code") or b""),
+        "exe_code": hash_bytes(code) if code is not None else None,
+    }
+
+
+def _read_link_manifest(path, config, targets):
+    """
+    Return the manifest of the last link, or None unless it was made with
+    the same config and every target pack is still the file it wrote.
+    """
+    if not path or not os.path.isfile(path):
+        return None
+    try:
+        man = json.loads(rd(path, 0, enc="utf-8"))
+    except Exception:
+        return None
+    if not isinstance(man, dict) or man.get("config") != config:
+        return None
+    packs = man.get("packs") or {}
+    for p, _ in targets:
+        try:
+            st = os.stat(p)
+        except OSError:
+            return None
+        if packs.get(os.path.abspath(p)) != [st.st_size, st.st_mtime_ns]:
+            return None
+    return man
+
+
 def link_pack(ctx):
     tmp_path = ctx.get("tmp_path") or ""
     out_path = ctx.get("out_path") or ""
@@ -454,74 +593,133 @@ def link_pack(ctx):
     inc_props = list(iad.get("property_list") or [])
     inc_cmds = list(iad.get("command_list") or [])
     inc_command_cnt = int(iad.get("inc_command_cnt", len(inc_cmds)))
-    scn_names_in = _get_scene_names(ctx)
-    scn_names, dat_list, lzss_list = _load_scene_data(ctx, scn_names_in, lzss_mode)
+    exe_on, exe_el = _resolve_exe_angou(ctx)
+    p = os.path.join(out_path, scene_pck)
+    targets = [(p, exe_el if exe_on else None)]
+    if exe_on and out_path_noangou:
+        p_no = os.path.join(out_path_noangou, scene_pck)
+        if os.path.abspath(p_no) != os.path.abspath(p):
+            targets.insert(0, (p_no, None))
+    store = artifact_store(ctx)
+    man_path = os.path.join(tmp_path, _LINK_MANIFEST) if store.persist else ""
+    config = _link_config(ctx, lzss_mode, exe_el if exe_on else None)
+    old = _read_link_manifest(man_path, config, targets)
+    old_scenes = (old or {}).get("scenes") or {}
+    scn_names = _get_scene_names(ctx)
+    # Scenes BS did not recompile are taken from the previous pack as is
+    reuse = {nm for nm in scn_names if nm in old_scenes and not store.fresh(nm)}
+    names, dat_list, lzss_list = _load_scene_data(
+        ctx, [nm for nm in scn_names if nm not in reuse], lzss_mode
+    )
+    blobs = dict(zip(names, lzss_list if lzss_mode else dat_list))
+    labels = {nm: _parse_cmd_labels(dat) for nm, dat in zip(names, dat_list)}
+    for nm in reuse:
+        labels[nm] = [tuple(x) for x in old_scenes[nm][3]]
     scn_name_list = [nm.lower() for nm in scn_names]
     inc_prop_name_list = [str(p.get("name", "")) for p in inc_props]
     inc_cmd_name_list = [str(c.get("name", "")) for c in inc_cmds]
     inc_cmd_list = [(0, 0) for _ in range(len(inc_cmds))]
-    for c in inc_cmds:
-        c["is_defined"] = False
+    # Tracked here rather than on the entries, which belong to ia_data
+    defined = [False] * len(inc_cmds)
     if inc_command_cnt > 0:
         any_labels = False
-        for scn_no, dat in enumerate(dat_list):
-            labels = _parse_cmd_labels(dat)
-            if labels:
+        for scn_no, nm in enumerate(scn_names):
+            if labels[nm]:
                 any_labels = True
-            for cmd_id, off in labels:
+            for cmd_id, off in labels[nm]:
                 if cmd_id < inc_command_cnt and 0 <= cmd_id < len(inc_cmds):
-                    if inc_cmds[cmd_id].get("is_defined"):
+                    if defined[cmd_id]:
                         raise RuntimeError(
                             f"command {inc_cmds[cmd_id].get('name', '')} defined more than once"
                         )
                     inc_cmd_list[cmd_id] = (scn_no, off)
-                    inc_cmds[cmd_id]["is_defined"] = True
+                    defined[cmd_id] = True
         if any_labels:
             for i in range(min(inc_command_cnt, len(inc_cmds))):
-                if not inc_cmds[i].get("is_defined"):
+                if not defined[i]:
                     raise RuntimeError(
                         f"command {inc_cmds[i].get('name', '')} is not defined"
                     )
-    noangou_scene_data = lzss_list if lzss_mode else dat_list
-    exe_on, exe_el = _resolve_exe_angou(ctx)
-    original_hsz, original_chunks = _build_original_source_chunks(ctx, lzss_mode)
-    pack_no = _build_pack_bytes(
+    pipeline = ctx.get("lzss_pipeline")
+    if pipeline is not None and lzss_mode:
+        original_hsz, original_chunks = pipeline.source_chunks()
+    else:
+        original_hsz, original_chunks = _build_original_source_chunks(ctx, lzss_mode)
+    original_chunks = list(original_chunks or [])
+    sizes = [
+        len(blobs[nm] or b"") if nm in blobs else old_scenes[nm][1] for nm in scn_names
+    ]
+    t = time.time()
+    hdr, head = _pack_layout(
         inc_props,
         inc_cmd_name_list,
         inc_prop_name_list,
         inc_cmd_list,
         scn_name_list,
-        noangou_scene_data,
-        0,
+        sizes,
         original_hsz,
-        original_chunks,
     )
-    if exe_on and out_path_noangou:
-        p = os.path.join(out_path_noangou, scene_pck)
-        _ensure_dir_for_file(p)
-        wr(p, pack_no, 1)
-    if not exe_on:
-        p = os.path.join(out_path, scene_pck)
-        _ensure_dir_for_file(p)
-        wr(p, pack_no, 1)
-        return p
-    ang = []
-    for blob in noangou_scene_data:
-        b = bytearray(blob)
-        _xor_cycle_inplace(b, exe_el, 0)
-        ang.append(bytes(b))
-    pack_a = _build_pack_bytes(
-        inc_props,
-        inc_cmd_name_list,
-        inc_prop_name_list,
-        inc_cmd_list,
-        scn_name_list,
-        ang,
-        1,
-        original_hsz,
-        original_chunks,
-    )
-    p = os.path.join(out_path, scene_pck)
-    _ensure_dir_for_file(p)
-    wr(p, pack_a, 1)
+    # Where every scene blob and the original source region go, and where
+    # the previous pack holds the same bytes
+    segs = []
+    man_scenes = {}
+    man_os = []
+    ofs = hdr["scn_data_list_ofs"]
+    for nm, size in zip(scn_names, sizes):
+        blob = blobs.get(nm)
+        if blob is None:
+            sha = old_scenes[nm][0]
+        else:
+            blob = blob or b""
+            sha = hash_bytes(blob) if man_path else ""
+        prev = old_scenes.get(nm)
+        old_ofs = prev[2] if prev and prev[0] == sha else None
+        segs.append((ofs, size, blob, old_ofs, True))
+        man_scenes[nm] = [sha, size, ofs, [list(x) for x in labels[nm]]]
+        ofs += size
+    # Source chunks are matched by content, so unchanged ones stay in place
+    old_os = {sha: o for sha, o in (old or {}).get("os") or []}
+    for ch in original_chunks:
+        sha = hash_bytes(ch) if man_path else ""
+        segs.append((ofs, len(ch), ch, old_os.get(sha), False))
+        man_os.append([sha, ofs])
+        ofs += len(ch)
+    tracing.record("link", scene_pck, t)
+    t = time.time()
+    if old is not None:
+        for path, code in targets:
+            with open(path, "r+b") as f:
+                size, written = _patch_pack(f, code, hdr, head, segs)
+            tracing.record("write", path, t, bytes_out=written)
+    else:
+        outs = []
+        try:
+            for path, code in targets:
+                _ensure_dir_for_file(path)
+                outs.append((open(path, "wb"), code))
+            size = _write_pack(
+                outs, hdr, head, [blobs[nm] for nm in scn_names], original_chunks
+            )
+        finally:
+            for f, _ in outs:
+                f.close()
+        for path, _ in targets:
+            tracing.record("write", path, t, bytes_out=size)
+    if man_path:
+        packs = {}
+        for path, _ in targets:
+            st = os.stat(path)
+            packs[os.path.abspath(path)] = [st.st_size, st.st_mtime_ns]
+        man = {
+            "config": config,
+            "packs": packs,
+            "scenes": man_scenes,
+            "os": man_os,
+        }
+        wr(
+            man_path,
+            json.dumps(man, ensure_ascii=False, sort_keys=True),
+            0,
+            enc="utf-8",
+        )
     return p
@@ -30,6 +30,7 @@ try:
 
     _native_lzss_pack = native_accel.lzss_pack
     _native_lzss_pack_level = native_accel.lzss_pack_level
+    _native_lzss_pack_many = getattr(native_accel, "lzss_pack_many", None)
     _native_lzss_unpack = native_accel.lzss_unpack
     _native_xor_cycle_inplace = native_accel.xor_cycle_inplace
     _native_md5_digest = native_accel.md5_digest
@@ -38,12 +39,19 @@ try:
     _native_find_shuffle_seed_first = getattr(
         native_accel, "find_shuffle_seed_first", None
     )
+    # Builds older than the fast / optimal encoders treat levels 0 and 18
+    # as tree-encoder levels, so only pass them when the extension says so
+    _native_lzss_fast = hasattr(native_accel, "LZSS_LEVEL_FAST")
+    _native_lzss_optimal = hasattr(native_accel, "LZSS_LEVEL_OPTIMAL")
     _USE_NATIVE = True
 except (ImportError, AttributeError):
     _USE_NATIVE = False
     _native_lzss_pack_level = None
+    _native_lzss_pack_many = None
     _native_msvcrand_shuffle_inplace = None
     _native_find_shuffle_seed_first = None
+    _native_lzss_fast = False
+    _native_lzss_optimal = False
 
 
 # True only if the Rust backend provides the seed scanner
@@ -52,11 +60,28 @@ HAS_NATIVE_FIND_SHUFFLE_SEED = bool(
 )
 
 
+# Level value selecting the fast hash-chain encoder (--lzss-fast)
+LZSS_LEVEL_FAST = 0
+# Level value selecting the optimal-parse encoder (--lzss-optimal)
+LZSS_LEVEL_OPTIMAL = 18
+
+
 def is_native_available() -> bool:
     """Check if native Rust bindings are available."""
     return _USE_NATIVE
 
 
+def _native_lzss_level(level: int) -> bool:
+    """True if the Rust encoder can compress at this level."""
+    if not _USE_NATIVE:
+        return False
+    if level == LZSS_LEVEL_FAST:
+        return _native_lzss_fast
+    if level >= LZSS_LEVEL_OPTIMAL:
+        return _native_lzss_optimal
+    return True
+
+
 # ============================================================================
 # Pure Python implementations (fallback)
 # ============================================================================
@@ -263,6 +288,144 @@ def _py_lzss_pack(src: bytes, level: int = 17) -> bytes:
     return bytes(pack_buf[:pack_buf_size])
 
 
+def _lzss_hash_chain(src: bytes):
+    """
+    Hash chains over 2-byte keys, limited to the 12-bit window.
+
+    Returns:
+        (find, insert): find(pos, depth) gives the longest (len, dist) among
+        the last depth inserted positions with pos's key, (0, 0) if none
+    """
+    n = len(src)
+    head = {}
+    prev = [-1] * 4096
+
+    def find(pos, depth):
+        mx = min(17, n - pos)
+        if mx < 2:
+            return 0, 0
+        best, dist = 1, 0
+        cand = head.get(src[pos] | (src[pos + 1] << 8), -1)
+        tried = 0
+        while cand >= 0 and tried < depth and pos - cand <= 4095:
+            if src[cand + best] == src[pos + best]:
+                k = 0
+                while k < mx and src[cand + k] == src[pos + k]:
+                    k += 1
+                if k > best:
+                    best, dist = k, pos - cand
+                    if k == mx:
+                        break
+            cand = prev[cand & 4095]
+            tried += 1
+        return (best, dist) if dist else (0, 0)
+
+    def insert(pos):
+        if pos + 1 < n:
+            h = src[pos] | (src[pos + 1] << 8)
+            prev[pos & 4095] = head.get(h, -1)
+            head[h] = pos
+
+    return find, insert
+
+
+def _lzss_write(src: bytes, items) -> bytes:
+    """Write (len, dist) items (len < 2 = literal) as an LZSS stream."""
+    out = bytearray(8)
+    flag_pos = 0
+    bit = 8
+    pos = 0
+    for ln, dist in items:
+        if bit == 8:
+            flag_pos = len(out)
+            out.append(0)
+            bit = 0
+        if ln > 1:
+            out += ((dist << 4) | (ln - 2)).to_bytes(2, "little")
+            pos += ln
+        else:
+            out[flag_pos] |= 1 << bit
+            out.append(src[pos])
+            pos += 1
+        bit += 1
+    struct.pack_into("<II", out, 0, len(out), len(src))
+    return bytes(out)
+
+
+def _py_lzss_pack_fast(src: bytes) -> bytes:
+    """
+    Pure Python fast LZSS compression (hash chains, one-step lazy matching).
+
+    Same algorithm as the Rust pack_fast: the output unpacks with
+    lzss_unpack but is not byte-identical to _py_lzss_pack.
+    """
+    if not src:
+        return b""
+    src = bytes(src)
+    n = len(src)
+    find, insert = _lzss_hash_chain(src)
+    items = []
+    pos = 0
+    nxt = None
+    while pos < n:
+        if nxt is None:
+            ln, dist = find(pos, 32)
+        else:
+            (ln, dist), nxt = nxt, None
+        insert(pos)
+        if 1 < ln < 17 and pos + 1 < n:
+            # A longer match one byte later wins over this one
+            m = find(pos + 1, 32)
+            if m[0] > ln:
+                ln = 0
+                nxt = m
+        if ln > 1:
+            items.append((ln, dist))
+            for p in range(pos + 1, pos + ln):
+                insert(p)
+            pos += ln
+        else:
+            items.append((0, 0))
+            pos += 1
+    return _lzss_write(src, items)
+
+
+def _py_lzss_pack_optimal(src: bytes) -> bytes:
+    """
+    Pure Python smallest LZSS compression (optimal parse).
+
+    Same algorithm as the Rust pack_optimal: longest match at every position
+    (whole window searched), then a shortest path over the stream size.
+    """
+    if not src:
+        return b""
+    src = bytes(src)
+    n = len(src)
+    find, insert = _lzss_hash_chain(src)
+    longest = []
+    for pos in range(n):
+        longest.append(find(pos, n))
+        insert(pos)
+    # cost[i]: bits for src[i:] (9 per literal, 17 per match, flag bit included)
+    cost = [0] * (n + 1)
+    step = [1] * n
+    for i in range(n - 1, -1, -1):
+        best = cost[i + 1] + 9
+        for ln in range(2, longest[i][0] + 1):
+            c = cost[i + ln] + 17
+            if c < best:
+                best = c
+                step[i] = ln
+        cost[i] = best
+    items = []
+    pos = 0
+    while pos < n:
+        ln = step[pos]
+        items.append((ln, longest[pos][1]) if ln > 1 else (0, 0))
+        pos += ln
+    return _lzss_write(src, items)
+
+
 def _py_lzss_unpack(src: bytes) -> bytes:
     """Pure Python LZSS decompression."""
     if not src or len(src) < 8:
@@ -401,21 +564,58 @@ def lzss_pack(src: bytes, level: int = 17) -> bytes:
     Args:
         src: Source data to compress
         level: Compression level (2-17). Higher = better compression but slower.
-               Default is 17 (best compression).
+               Default is 17 (best compression of the original encoder).
+               LZSS_LEVEL_FAST selects the hash-chain encoder and
+               LZSS_LEVEL_OPTIMAL (18) the optimal-parse encoder; their
+               output unpacks the same but is not byte-identical to the
+               original encoder's.
 
     Returns:
         Compressed data
     """
-    if _USE_NATIVE:
+    if _native_lzss_level(level):
         if level == 17:
             return _native_lzss_pack(src)
         elif _native_lzss_pack_level is not None:
             return _native_lzss_pack_level(src, level)
         else:
             return _native_lzss_pack(src)  # Fallback if level function not available
+    if level == LZSS_LEVEL_FAST:
+        return _py_lzss_pack_fast(src)
+    if level >= LZSS_LEVEL_OPTIMAL:
+        return _py_lzss_pack_optimal(src)
     return _py_lzss_pack(src, level)
 
 
+def lzss_pack_many(srcs, level: int = 17, code=None, threads=None) -> list:
+    """
+    LZSS compression of many buffers in one call. Uses Rust when available.
+
+    The Rust version compresses on its own threads with the GIL released,
+    largest buffer first; the fallback compresses one buffer at a time.
+
+    Args:
+        srcs: Buffers to compress
+        level: Compression level, as in lzss_pack
+        code: If set, each output is XORed with this cyclic key (easy angou)
+        threads: Worker threads (None = CPU count)
+
+    Returns:
+        Compressed buffers, in input order
+    """
+    if _native_lzss_pack_many is not None and _native_lzss_level(level):
+        return _native_lzss_pack_many(
+            [bytes(s) for s in srcs], level, bytes(code) if code else None, threads
+        )
+    out = []
+    for s in srcs:
+        b = bytearray(lzss_pack(s, level))
+        if code:
+            xor_cycle_inplace(b, code, 0)
+        out.append(bytes(b))
+    return out
+
+
 def lzss_unpack(src: bytes) -> bytes:
     """LZSS decompression. Uses Rust when available."""
     if _USE_NATIVE:
@@ -10,13 +10,19 @@ Design notes:
 - ThreadPoolExecutor is used for Rust-accelerated operations (GIL is released)
 - ProcessPoolExecutor could be used for pure Python CPU-bound tasks, but
   ThreadPoolExecutor with Rust extensions is more efficient (no pickle overhead)
+- Compile workers receive the include analyzer data once, through the pool
+  initializer, rather than with every submitted task
 - Results are collected in order to maintain deterministic output
 """
 
 import os
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Optional, Tuple, Dict
 
+from . import tracing
+
 
 def get_max_workers(max_workers: Optional[int] = None) -> int:
     """
@@ -35,94 +41,262 @@ def get_max_workers(max_workers: Optional[int] = None) -> int:
     return min(cpu_count, 32)
 
 
+def order_by_cost(items: List, cost) -> List:
+    """
+    Return items with the largest estimated cost first.
+
+    A long job submitted last sets the makespan on its own; starting it
+    first lets the short ones fill the other workers. Ties keep their
+    original order. Callers still collect results in the original order.
+
+    Args:
+        items: Work items
+        cost: Function item -> estimated cost
+
+    Returns:
+        Reordered list
+    """
+    return sorted(items, key=lambda it: -cost(it))
+
+
+def compile_cost(ctx: Dict, ss_files: List[str]) -> Dict[str, float]:
+    """
+    Estimate the compile time of every .ss file.
+
+    Uses the per-file times of the previous build (ctx["compile_time_hint"],
+    kept in the tmp dir's _md5.json). Files without one are estimated from
+    their source size, scaled by the files that have both.
+
+    Args:
+        ctx: Compilation context
+        ss_files: List of .ss file paths
+
+    Returns:
+        Dict of path -> estimated cost
+    """
+    hint = ctx.get("compile_time_hint") or {}
+    sizes = {}
+    for p in ss_files:
+        try:
+            sizes[p] = os.path.getsize(p)
+        except OSError:
+            sizes[p] = 0
+    known = {}
+    for p in ss_files:
+        t = hint.get(os.path.basename(p).lower())
+        if isinstance(t, (int, float)):
+            known[p] = float(t)
+    known_b = sum(sizes[p] for p in known)
+    rate = sum(known.values()) / known_b if known_b else 1.0
+    return {p: known.get(p, sizes[p] * rate) for p in ss_files}
+
+
 # =============================================================================
 # Parallel compilation of .ss files
 # =============================================================================
 
 
+# Per-process compile context (include analyzer data, charset, stage cache
+# settings). Set once per worker by the pool initializer (inherited
+# copy-on-write under fork, pickled once per worker under spawn) instead of
+# being shipped with every submitted task.
+_WORKER_CTX: Dict = {}
+
+# ctx entries a compile worker needs
+_WORKER_CTX_KEYS = (
+    "utf8",
+    "ia_data",
+    "ia_hash",
+    "inc_symbols",
+    "stage_cache",
+    "stage_cache_max",
+    "trace",
+)
+
+
+def _init_compile_worker(ctx: Dict) -> None:
+    """
+    Pool initializer for compile workers.
+
+    Args:
+        ctx: Subset of the compilation context (must be picklable)
+    """
+    global _WORKER_CTX
+    _WORKER_CTX = dict(ctx)
+    if ctx.get("trace"):
+        tracing.enable()
+
+
+def create_compile_pool(ctx: Dict, max_workers: Optional[int] = None):
+    """
+    Create a process pool whose workers hold ctx['ia_data'].
+
+    The pool can be reused for several parallel_compile calls (pass it as
+    ctx['compile_pool']) as long as ctx['ia_data'] does not change.
+
+    Args:
+        ctx: Compilation context containing ia_data and other settings
+        max_workers: Maximum number of parallel workers (None for auto)
+
+    Returns:
+        ProcessPoolExecutor
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    wctx = {k: ctx.get(k) for k in _WORKER_CTX_KEYS}
+    return ProcessPoolExecutor(
+        max_workers=get_max_workers(max_workers),
+        initializer=_init_compile_worker,
+        initargs=(wctx,),
+    )
+
+
 # Top-level function for ProcessPoolExecutor (must be picklable)
 def _compile_one_process(
-    ss_path: str, tmp_path: str, stop_after: str, ia_data: Dict, enc: str
-) -> Tuple[str, Optional[str]]:
+    ss_path: str,
+    tmp_path: str,
+    stop_after: str,
+    seed: Optional[int] = None,
+) -> Tuple[
+    str,
+    Optional[str],
+    Optional[List[str]],
+    Optional[List[Dict]],
+    Optional[bytes],
+    float,
+]:
     """
     Worker function for compiling a single .ss file in a separate process.
 
+    Include analyzer data and encoding come from _init_compile_worker. The
+    compiled scene goes back to the parent, which puts it in its
+    ArtifactStore (see artifacts.py).
+
     Args:
         ss_path: Path to the .ss file
         tmp_path: Temporary output directory
         stop_after: Stage to stop after ('la', 'sa', 'ma', 'bs')
-        ia_data: Include analyzer data (must be picklable)
-        enc: Character encoding ('utf-8' or 'cp932')
+        seed: MSVCRand state to start the string shuffle from (None = keep)
 
     Returns:
-        Tuple of (filename, error_message or None)
+        Tuple of (filename, error_message or None, inc symbols used or None,
+        trace events or None, scene .dat bytes or None, seconds taken)
     """
     fname = os.path.basename(ss_path)
-    nm = os.path.splitext(fname)[0]
+    t = time.time()
 
     try:
         # Import locally to ensure fresh module state per process
-        from .CA import rd, wr, CharacterAnalizer
-        from .LA import la_analize
-        from .SA import SA
-        from .MA import MA
-        from .BS import BS, _copy_ia_data
-
-        # Read source file
-        scn = rd(ss_path, 0, enc=enc)
-
-        # Copy ia_data (defensive copy)
-        iad = _copy_ia_data(ia_data)
-        pcad = {}
-
-        # Character Analysis
-        ca = CharacterAnalizer()
-        if not ca.analize_file(scn, iad, pcad):
-            return (fname, f"CA error at {fname}:{ca.get_error_line()}")
-
-        # Lexical Analysis
-        lad, err = la_analize(pcad)
-        if err:
-            return (fname, f"LA error at {fname}:{err.get('line', 0)}")
-
-        if stop_after == "la":
-            return (fname, None)
-
-        # Semantic Analysis
-        sa = SA(iad, lad)
-        ok, sad = sa.analize()
-        if not ok:
-            line = (sa.last.get("atom") or {}).get("line", 0)
-            return (fname, f"{sa.last.get('type') or 'SA_ERROR'} at {fname}:{line}")
-
-        if stop_after == "sa":
-            return (fname, None)
-
-        # Macro Analysis
-        ma = MA(iad, lad, sad)
-        ok, mad = ma.analize()
-        if not ok:
-            line = (ma.last.get("atom") or {}).get("line", 0)
-            code = ma.last.get("type") or "MA_ERROR"
-            return (fname, f"{code} at {fname}:{line}")
-
-        if stop_after == "ma":
-            return (fname, None)
-
-        # Binary Save
-        bs = BS()
-        bsd = {}
-        if not bs.compile(iad, lad, mad, bsd, False):
-            return (fname, f"{bs.get_error_code()} at {fname}:{bs.get_error_line()}")
-
-        # Write output
-        out_path = os.path.join(tmp_path, "bs", nm + ".dat")
-        wr(out_path, bsd["out_scn"], 1)
-
-        return (fname, None)
+        from .BS import compile_one_pipeline, set_shuffle_seed
+
+        if seed is not None:
+            set_shuffle_seed(seed)
+        res = compile_one_pipeline(
+            _WORKER_CTX, ss_path, stop_after, tmp_path=tmp_path, log=False
+        )
+        if res is None:
+            return (fname, None, None, tracing.take_events(), None, time.time() - t)
+        return (
+            fname,
+            None,
+            res.get("deps"),
+            tracing.take_events(),
+            bytes(res["out_scn"]),
+            time.time() - t,
+        )
 
     except Exception as e:
-        return (fname, str(e))
+        return (fname, str(e), None, tracing.take_events(), None, time.time() - t)
+
+
+def _str_count_process(
+    ss_path: str,
+) -> Tuple[str, int, Optional[str], Optional[List[Dict]]]:
+    """
+    Worker function for the shuffle planning pass (CA + LA only).
+
+    Include analyzer data and encoding come from _init_compile_worker.
+
+    Args:
+        ss_path: Path to the .ss file
+
+    Returns:
+        Tuple of (filename, len(str_list), error_message or None,
+        trace events or None)
+    """
+    fname = os.path.basename(ss_path)
+
+    try:
+        from .BS import count_strings
+
+        cnt = count_strings(_WORKER_CTX, ss_path)
+        return (fname, cnt, None, tracing.take_events())
+
+    except Exception as e:
+        return (fname, 0, str(e), tracing.take_events())
+
+
+def plan_shuffle_seeds_parallel(
+    ctx: Dict,
+    ss_files: List[str],
+    max_workers: Optional[int] = None,
+    executor=None,
+    cost: Optional[Dict[str, float]] = None,
+) -> Tuple[List[int], int]:
+    """
+    Compute the MSVCRand start state of every script for a parallel build.
+
+    Runs a cheap CA/LA pass in parallel to count each script's strings, then
+    walks the PRNG through the shuffles in ss_files order, starting from the
+    current shuffle state (see BS.plan_shuffle_seeds).
+
+    Args:
+        ctx: Compilation context containing ia_data and other settings
+        ss_files: List of .ss file paths, in serial compile order
+        max_workers: Maximum number of parallel workers (None for auto)
+        executor: Pool from create_compile_pool to reuse (None = own pool)
+        cost: Estimated cost per path (from compile_cost); costly files are
+            submitted first
+
+    Returns:
+        Tuple of (start state per file, final state)
+
+    Raises:
+        RuntimeError: If any file fails CA/LA
+    """
+    from .BS import plan_shuffle_seeds
+
+    print(f"[PARALLEL] Planning shuffle seeds for {len(ss_files)} files...")
+
+    own_pool = executor is None
+    if own_pool:
+        executor = create_compile_pool(ctx, max_workers)
+
+    counts = {}
+    errors = []
+    try:
+        order = order_by_cost(ss_files, cost.get) if cost else ss_files
+        futures = {
+            executor.submit(_str_count_process, ss_path): ss_path for ss_path in order
+        }
+        for future in as_completed(futures):
+            ss_path = futures[future]
+            fname, cnt, error, events = future.result()
+            tracing.add_events(events)
+            if error:
+                errors.append((fname, error))
+            else:
+                counts[ss_path] = cnt
+    finally:
+        if own_pool:
+            executor.shutdown()
+
+    if errors:
+        for fname, err in errors:
+            print(f"  ERROR in {fname}: {err}")
+        raise RuntimeError(str(errors[0][1]))
+
+    return plan_shuffle_seeds([counts[p] for p in ss_files])
 
 
 def parallel_compile(
@@ -135,9 +309,12 @@ def parallel_compile(
     Compile multiple .ss files in parallel using ProcessPoolExecutor.
 
     Uses ProcessPoolExecutor to bypass GIL for CPU-bound pure Python compilation.
+    The include analyzer data is handed to each worker once, by the pool
+    initializer; the planning and compile passes share the same pool.
 
     Args:
-        ctx: Compilation context containing ia_data and other settings
+        ctx: Compilation context containing ia_data and other settings.
+             ctx['compile_pool'] (from create_compile_pool) is reused if set.
         ss_files: List of .ss file paths to compile
         stop_after: Optional stage to stop after ('la', 'sa', 'ma', 'bs')
         max_workers: Maximum number of parallel workers (None for auto)
@@ -145,47 +322,68 @@ def parallel_compile(
     Raises:
         RuntimeError: If any file fails to compile
     """
-    from concurrent.futures import ProcessPoolExecutor
-
     if not ss_files:
         return
 
+    from .BS import record_compile_time, record_inc_deps
+    from .artifacts import artifact_store
+
     workers = get_max_workers(max_workers)
     tmp_path = ctx.get("tmp_path") or "."
-    ia_data = ctx.get("ia_data")
-    utf8 = ctx.get("utf8", False)
-    enc = "utf-8" if utf8 else "cp932"
     stop = stop_after or ctx.get("stop_after", "bs")
-
-    # Ensure output directory exists
-    os.makedirs(os.path.join(tmp_path, "bs"), exist_ok=True)
+    store = artifact_store(ctx)
 
     # Execute in parallel using ProcessPoolExecutor
     errors = []
     completed = 0
     total = len(ss_files)
 
-    print(f"[PARALLEL] Compiling {total} files with {workers} processes...")
+    executor = ctx.get("compile_pool")
+    own_pool = executor is None
+    if own_pool:
+        executor = create_compile_pool(ctx, workers)
 
-    with ProcessPoolExecutor(max_workers=workers) as executor:
-        # Submit all tasks
+    try:
+        # Only BS consumes the shuffle PRNG; plan the per-file start states so
+        # the output matches a serial build bit-for-bit.
+        cost = compile_cost(ctx, ss_files)
+        seeds = [None] * total
+        final_seed = None
+        if stop == "bs":
+            seeds, final_seed = plan_shuffle_seeds_parallel(
+                ctx, ss_files, max_workers, executor, cost
+            )
+
+        print(f"[PARALLEL] Compiling {total} files with {workers} processes...")
+
+        # Submit all tasks, largest first; results are keyed by file
         futures = {
             executor.submit(
-                _compile_one_process, ss_path, tmp_path, stop, ia_data, enc
+                _compile_one_process, ss_path, tmp_path, stop, seed
             ): ss_path
-            for ss_path in ss_files
+            for ss_path, seed in order_by_cost(
+                list(zip(ss_files, seeds)), lambda it: cost[it[0]]
+            )
         }
 
         for future in as_completed(futures):
             _ = futures[future]
-            fname, error = future.result()
+            fname, error, deps, events, out, elapsed = future.result()
+            tracing.add_events(events)
+            record_compile_time(ctx, fname, elapsed)
             completed += 1
 
             if error:
                 errors.append((fname, error))
                 print(f"  [{completed}/{total}] FAIL: {fname}")
             else:
+                if out is not None:
+                    store.put(os.path.splitext(fname)[0], "dat", out)
+                record_inc_deps(ctx, fname, deps)
                 print(f"  [{completed}/{total}] OK: {fname}")
+    finally:
+        if own_pool:
+            executor.shutdown()
 
     if errors:
         # Report all errors
@@ -194,6 +392,12 @@ def parallel_compile(
         # Raise the first error
         raise RuntimeError(str(errors[0][1]))
 
+    if final_seed is not None:
+        # Continue the chain as if the files had been compiled in this process
+        from .BS import set_shuffle_seed
+
+        set_shuffle_seed(final_seed)
+
     print(f"[PARALLEL] Compilation complete: {total} files")
 
 
@@ -202,43 +406,72 @@ def parallel_compile(
 # =============================================================================
 
 
+def lzss_compress_scenes(
+    ctx: Dict, dats: List[bytes], max_workers: Optional[int] = None
+) -> List[bytes]:
+    """
+    LZSS-compress and easy-angou-encrypt compiled scenes.
+
+    With --cache, a scene whose (.dat bytes, LZSS level, easy code) an
+    earlier build already compressed comes from the stage cache; the rest
+    are compressed in one lzss_pack_many call and added to it.
+
+    Args:
+        ctx: Context containing easy_angou_code, lzss_level and stage_cache
+        dats: Compiled .dat blobs
+        max_workers: Maximum LZSS threads (None for auto)
+
+    Returns:
+        .lzss blobs, in the order of dats
+    """
+    from .native_ops import lzss_pack_many
+    from .stage_cache import open_stage_cache
+
+    easy_code = ctx.get("easy_angou_code") or b""
+    if not easy_code:
+        raise RuntimeError("missing .lzss and ctx.easy_angou_code is not set")
+    level = ctx.get("lzss_level", 17)
+    cache = open_stage_cache(ctx)
+    keys = [cache.lzss_key(d, level, easy_code) for d in dats] if cache else []
+    out = [cache.get("lzss", k) for k in keys] if cache else [None] * len(dats)
+    todo = [i for i, lz in enumerate(out) if lz is None]
+    if todo:
+        new = lzss_pack_many(
+            [dats[i] for i in todo], level, easy_code, get_max_workers(max_workers)
+        )
+        for i, lz in zip(todo, new):
+            out[i] = lz
+            if cache:
+                cache.put("lzss", keys[i], lz)
+    return out
+
+
 def _lzss_compress_task(
-    args: Tuple[str, str, str, bytes, int],
+    args: Tuple[str, object, Dict],
 ) -> Tuple[str, bytes, bytes, Optional[Exception]]:
     """
     Worker function for LZSS compression of a single scene file.
 
     Args:
-        args: Tuple of (scene_name, dat_path, lz_path, easy_code, lzss_level)
+        args: Tuple of (scene_name, ArtifactStore, ctx)
 
     Returns:
         Tuple of (scene_name, dat_bytes, lzss_bytes, exception or None)
     """
-    nm, dat_path, lz_path, easy_code, lzss_level = args
+    nm, store, ctx = args
 
     try:
-        from .CA import rd, wr
-        from . import compiler as _m
-        from .native_ops import xor_cycle_inplace
-
-        # Read .dat file
-        if not os.path.isfile(dat_path):
-            raise FileNotFoundError(f"scene dat not found: {dat_path}")
-        dat = rd(dat_path, 1)
-
-        # Check for cached .lzss file
-        if os.path.isfile(lz_path):
-            lz = rd(lz_path, 1)
-        else:
-            # Compress and encrypt
-            if not easy_code:
-                raise RuntimeError("missing .lzss and ctx.easy_angou_code is not set")
-            lz = _m.lzss_pack(dat, level=lzss_level)
-            b = bytearray(lz)
-            xor_cycle_inplace(b, easy_code, 0)
-            lz = bytes(b)
-            # Write cache
-            wr(lz_path, lz, 1)
+        t = time.time()
+        dat = store.get(nm, "dat")
+        if dat is None:
+            raise FileNotFoundError(f"scene dat not found: {store.path(nm, 'dat')}")
+
+        # Reuse the .lzss of an unchanged scene
+        lz = store.get(nm, "lzss")
+        if lz is None:
+            (lz,) = lzss_compress_scenes(ctx, [dat], 1)
+            store.put(nm, "lzss", lz)
+        tracing.record("LZSS", nm + ".ss", t, bytes_in=len(dat), bytes_out=len(lz))
 
         return (nm, dat, lz, None)
 
@@ -249,91 +482,184 @@ def _lzss_compress_task(
 def parallel_lzss_compress(
     ctx: Dict,
     scn_names: List[str],
-    bs_dir: str,
+    store,
     lzss_mode: bool,
     max_workers: Optional[int] = None,
 ) -> Tuple[List[str], List[bytes], List[bytes]]:
     """
-    Load and compress scene data in parallel.
+    Load scene data and compress the scenes without a .lzss in one
+    lzss_compress_scenes call (the easy angou XOR is applied in the same
+    pass).
 
     Args:
         ctx: Context containing easy_angou_code
         scn_names: List of scene names (without extension)
-        bs_dir: Directory containing .dat files
+        store: ArtifactStore holding the compiled scenes
         lzss_mode: Whether to perform LZSS compression
         max_workers: Maximum parallel workers (None for auto)
 
     Returns:
         Tuple of (enc_names, dat_list, lzss_list)
     """
-    from .CA import rd
-
-    easy_code = ctx.get("easy_angou_code") or b""
-
     if not lzss_mode:
-        # No compression, just load files serially
+        # No compression, just load the scenes serially
         enc_names = []
         dat_list = []
         for nm in scn_names:
-            dat_path = os.path.join(bs_dir, nm + ".dat")
-            if not os.path.isfile(dat_path):
-                raise FileNotFoundError(f"scene dat not found: {dat_path}")
-            dat = rd(dat_path, 1)
+            dat = store.get(nm, "dat")
+            if dat is None:
+                raise FileNotFoundError(f"scene dat not found: {store.path(nm, 'dat')}")
             dat_list.append(dat)
             enc_names.append(nm)
         return (enc_names, dat_list, [])
 
-    lzss_level = ctx.get("lzss_level", 17)
-
-    # Prepare tasks for parallel execution
-    tasks = [
-        (
-            nm,
-            os.path.join(bs_dir, nm + ".dat"),
-            os.path.join(bs_dir, nm + ".lzss"),
-            easy_code,
-            lzss_level,
+    dat_list = []
+    lzss_list = []
+    todo = []
+    for i, nm in enumerate(scn_names):
+        dat = store.get(nm, "dat")
+        if dat is None:
+            raise FileNotFoundError(f"scene dat not found: {store.path(nm, 'dat')}")
+        # Reuse the .lzss of an unchanged scene
+        lz = store.get(nm, "lzss")
+        if lz is None:
+            todo.append(i)
+        dat_list.append(dat)
+        lzss_list.append(lz)
+
+    if todo:
+        workers = get_max_workers(max_workers)
+        print(
+            f"[PARALLEL] LZSS compressing {len(todo)} scenes with {workers} threads..."
         )
-        for nm in scn_names
-    ]
+        t = time.time()
+        out = lzss_compress_scenes(ctx, [dat_list[i] for i in todo], workers)
+        for i, lz in zip(todo, out):
+            nm = scn_names[i]
+            store.put(nm, "lzss", lz)
+            lzss_list[i] = lz
+            tracing.record(
+                "LZSS", nm + ".ss", t, bytes_in=len(dat_list[i]), bytes_out=len(lz)
+            )
 
-    workers = get_max_workers(max_workers)
+    for nm in scn_names:
+        print(f"  LZSS: {nm}.ss")
+    print("[PARALLEL] LZSS compression complete")
+    return (list(scn_names), dat_list, lzss_list)
 
-    # Use dict to preserve order
-    results = {}
-    errors = []
 
-    print(f"[PARALLEL] LZSS compressing {len(tasks)} scenes with {workers} workers...")
+class LzssPipeline:
+    """
+    Compress scenes while the rest of the project is still compiling.
 
-    with ThreadPoolExecutor(max_workers=workers) as executor:
-        futures = {
-            executor.submit(_lzss_compress_task, task): task[0] for task in tasks
-        }
+    The pipeline listens on the ArtifactStore and queues every scene for
+    LZSS as soon as BS puts its .dat there. The original source encryption
+    (OS stage) starts with the first scene. link_pack then joins both
+    instead of starting them after compile_all; scenes are joined in
+    scn_name_list order, so the output does not depend on completion order.
 
-        for future in as_completed(futures):
-            nm, dat, lz, error = future.result()
-            if error:
-                errors.append((nm, error))
-            else:
-                results[nm] = (dat, lz)
-                print(f"  LZSS: {nm}.ss")
+    No thread is started before the first scene arrives: by then the
+    --parallel compile pool has forked its workers, and forking while
+    other threads run can leave a child blocked on a lock they held.
 
-    if errors:
-        raise RuntimeError(str(errors[0][1]))
+    The exe angou XOR is left to the pack writer, which XORs one blob at a
+    time while streaming (a pre-XORed copy of every scene would double the
+    memory held until link).
+    """
 
-    # Collect results in original order
-    enc_names = []
-    dat_list = []
-    lzss_list = []
-    for nm in scn_names:
-        if nm in results:
-            dat, lz = results[nm]
-            enc_names.append(nm)
+    def __init__(self, ctx: Dict, max_workers: Optional[int] = None):
+        """
+        Args:
+            ctx: Compilation context (lzss_mode must be on)
+            max_workers: Maximum LZSS threads (None for auto)
+        """
+        from .artifacts import artifact_store
+
+        self.ctx = ctx
+        self.store = artifact_store(ctx)
+        # Sum of per-scene LZSS durations (the stage time, see link_pack)
+        self.lzss_time = 0.0
+        self._lock = threading.Lock()
+        self._futures: Dict = {}
+        self._pool = ThreadPoolExecutor(max_workers=get_max_workers(max_workers))
+        self._os_future = None
+        self.store.add_listener(self._on_put)
+
+    def _start_os(self) -> None:
+        from .linker import _build_original_source_chunks
+
+        if self._os_future is None:
+            self._os_future = self._pool.submit(
+                _build_original_source_chunks, self.ctx, True
+            )
+
+    def _on_put(self, nm: str, kind: str, data: bytes) -> None:
+        if kind == "dat":
+            self._start_os()
+            self._futures[nm] = self._pool.submit(self._compress, nm, data)
+
+    def _add_time(self, t: float) -> None:
+        with self._lock:
+            self.lzss_time += time.time() - t
+
+    def _compress(self, nm: str, dat: bytes) -> Tuple[bytes, bytes, bool]:
+        t = time.time()
+        (lz,) = lzss_compress_scenes(self.ctx, [dat], 1)
+        tracing.record("LZSS", nm + ".ss", t, bytes_in=len(dat), bytes_out=len(lz))
+        self._add_time(t)
+        return (dat, lz, True)
+
+    def _load(self, nm: str) -> Tuple[bytes, bytes, bool]:
+        # Scene not compiled this run: reuse its .lzss from tmp/bs if present
+        t = time.time()
+        _, dat, lz, error = _lzss_compress_task((nm, self.store, self.ctx))
+        self._add_time(t)
+        if error:
+            raise error
+        return (dat, lz, False)
+
+    def scenes(
+        self, scn_names: List[str]
+    ) -> Tuple[List[str], List[bytes], List[bytes]]:
+        """
+        Wait for every scene's LZSS blob.
+
+        Args:
+            scn_names: List of scene names (without extension)
+
+        Returns:
+            Tuple of (enc_names, dat_list, lzss_list)
+        """
+        rest = [nm for nm in scn_names if nm not in self._futures]
+        for nm in order_by_cost(rest, lambda nm: self.store.size(nm, "dat")):
+            self._futures[nm] = self._pool.submit(self._load, nm)
+        dat_list = []
+        lzss_list = []
+        for nm in scn_names:
+            dat, lz, new = self._futures[nm].result()
+            if new:
+                # Keep the blob unless the scene was recompiled meanwhile
+                cur = self.store.get(nm, "dat")
+                if cur is dat or cur == dat:
+                    self.store.put(nm, "lzss", lz)
+            print(f"  LZSS: {nm}.ss")
             dat_list.append(dat)
             lzss_list.append(lz)
+        return (list(scn_names), dat_list, lzss_list)
 
-    print("[PARALLEL] LZSS compression complete")
-    return (enc_names, dat_list, lzss_list)
+    def source_chunks(self) -> Tuple[int, List[bytes]]:
+        """Wait for the OS stage; same result as _build_original_source_chunks."""
+        self._start_os()
+        return self._os_future.result()
+
+    def close(self) -> None:
+        self.store.remove_listener(self._on_put)
+        # Executor.shutdown(cancel_futures=...) needs Python 3.9
+        for f in self._futures.values():
+            f.cancel()
+        if self._os_future is not None:
+            self._os_future.cancel()
+        self._pool.shutdown(wait=True)
 
 
 # =============================================================================
@@ -342,52 +668,31 @@ def parallel_lzss_compress(
 
 
 def _source_encrypt_task(
-    args: Tuple[str, str, str, Dict, bool, int],
+    args: Tuple[str, str, str, Dict, bool],
 ) -> Tuple[str, int, bytes, Optional[Exception]]:
     """
     Worker function for encrypting a single source file.
 
     Args:
-        args: Tuple of (rel_path, src_path, cache_path, source_angou, skip_chunk, lzss_level)
+        args: Tuple of (rel_path, src_path, cache_path, ctx, skip_chunk)
 
     Returns:
         Tuple of (rel_path, size, encrypted_blob, exception or None)
     """
-    rel, src_path, cache_path, source_angou, skip, lzss_level = args
+    rel, src_path, cache_path, ctx, skip = args
 
     try:
-        from .CA import rd, wr
         from . import compiler as _m
 
         if not os.path.isfile(src_path):
             return (rel, 0, b"", None)  # Skip missing files
 
-        # Build minimal ctx for source_angou_encrypt
-        ctx = {"source_angou": source_angou, "lzss_level": lzss_level}
-
-        # Check cache
-        use_cache = False
-        if cache_path and os.path.isfile(cache_path):
-            try:
-                if os.path.getmtime(cache_path) >= os.path.getmtime(src_path):
-                    use_cache = True
-            except Exception:
-                use_cache = False
-
-        if use_cache:
-            enc_blob = rd(cache_path, 1)
-        else:
-            raw = rd(src_path, 1)
-            enc_blob = _m.source_angou_encrypt(raw, rel, ctx)
-            if cache_path:
-                # Ensure cache directory exists
-                cache_dir = os.path.dirname(cache_path)
-                if cache_dir:
-                    os.makedirs(cache_dir, exist_ok=True)
-                wr(cache_path, enc_blob, 1)
+        t = time.time()
+        enc_blob, _ = _m.source_angou_encrypt_with_cache(src_path, rel, cache_path, ctx)
 
         size = len(enc_blob) & 0xFFFFFFFF
         chunk = enc_blob if not skip else b""
+        tracing.record("OS", rel, t, bytes_out=size)
 
         return (rel, size, chunk, None)
 
@@ -427,13 +732,12 @@ def parallel_source_encrypt(
 
     # Prepare tasks
     tasks = []
-    lzss_level = ctx.get("lzss_level", 17)
     for rel in rel_list:
         src_path = os.path.join(scn_path, rel.replace("\\", os.sep))
         cache_path = (
             os.path.join(tmp_path, "os", rel.replace("\\", os.sep)) if tmp_path else ""
         )
-        tasks.append((rel, src_path, cache_path, source_angou, skip, lzss_level))
+        tasks.append((rel, src_path, cache_path, ctx, skip))
 
     workers = get_max_workers(max_workers)
 
@@ -13,7 +13,7 @@ use std::time::{Duration, Instant};
 /// LZSS compression with default level (17)
 #[pyfunction]
 fn lzss_pack(py: Python<'_>, data: &[u8]) -> PyResult<Py<PyBytes>> {
-    let result = lzss::pack(data);
+    let result = py.detach(|| lzss::pack(data));
     Ok(PyBytes::new(py, &result).into())
 }
 
@@ -22,12 +22,41 @@ fn lzss_pack(py: Python<'_>, data: &[u8]) -> PyResult<Py<PyBytes>> {
 /// Level ranges from 2 to 17:
 /// - 2: Fastest compression, worst ratio
 /// - 17: Slowest compression, best ratio (default)
+///
+/// Level 0 selects the hash-chain encoder (`--lzss-fast`) and level 18 the
+/// optimal-parse encoder (`--lzss-optimal`); their output is not
+/// byte-identical to the original encoder's.
 #[pyfunction]
 fn lzss_pack_level(py: Python<'_>, data: &[u8], level: usize) -> PyResult<Py<PyBytes>> {
-    let result = lzss::pack_with_level(data, level);
+    let result = py.detach(|| lzss::pack_level(data, level));
     Ok(PyBytes::new(py, &result).into())
 }
 
+/// LZSS compression of many buffers in one call
+///
+/// Runs its own worker threads with the GIL released and returns the
+/// outputs in input order. If `code` is given, each output is XORed with it
+/// (easy angou) in the same pass.
+///
+/// `threads` defaults to the number of CPUs.
+#[pyfunction]
+#[pyo3(signature = (bufs, level=17, code=None, threads=None))]
+fn lzss_pack_many(
+    py: Python<'_>,
+    bufs: Vec<Bound<'_, PyBytes>>,
+    level: usize,
+    code: Option<&[u8]>,
+    threads: Option<usize>,
+) -> PyResult<Vec<Py<PyBytes>>> {
+    let srcs: Vec<&[u8]> = bufs.iter().map(|b| b.as_bytes()).collect();
+    let cpu = std::thread::available_parallelism()
+        .map(|n| n.get())
+        .unwrap_or(4);
+    let w = threads.unwrap_or(cpu);
+    let outs = py.detach(|| lzss::pack_many(&srcs, level, code, w));
+    Ok(outs.iter().map(|o| PyBytes::new(py, o).into()).collect())
+}
+
 /// LZSS decompression
 #[pyfunction]
 fn lzss_unpack(py: Python<'_>, data: &[u8]) -> PyResult<Py<PyBytes>> {
@@ -409,11 +438,16 @@ fn find_shuffle_seed_first(
 fn native_accel(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(lzss_pack, m)?)?;
     m.add_function(wrap_pyfunction!(lzss_pack_level, m)?)?;
+    m.add_function(wrap_pyfunction!(lzss_pack_many, m)?)?;
     m.add_function(wrap_pyfunction!(lzss_unpack, m)?)?;
     m.add_function(wrap_pyfunction!(xor_cycle_inplace, m)?)?;
     m.add_function(wrap_pyfunction!(md5_digest, m)?)?;
     m.add_function(wrap_pyfunction!(tile_copy, m)?)?;
     m.add_function(wrap_pyfunction!(msvcrand_shuffle_inplace, m)?)?;
     m.add_function(wrap_pyfunction!(find_shuffle_seed_first, m)?)?;
+    // Levels lzss_pack_level / lzss_pack_many accept beyond 2-17; Python
+    // checks for these names before passing them to the extension
+    m.add("LZSS_LEVEL_FAST", lzss::LEVEL_FAST)?;
+    m.add("LZSS_LEVEL_OPTIMAL", lzss::LEVEL_OPTIMAL)?;
     Ok(())
 }
@@ -3,12 +3,25 @@
 //! This is a port of the Python LZSS implementation with significant
 //! performance improvements using Rust's efficient memory management.
 
+use std::sync::atomic::{AtomicUsize, Ordering};
+
 const INDEX_BITS: usize = 12;
 const LENGTH_BITS: usize = 16 - INDEX_BITS;
 const BREAK_EVEN: usize = 1;
 const LOOK_AHEAD: usize = (1 << LENGTH_BITS) + BREAK_EVEN;
 const WINDOW_SIZE: usize = 1 << INDEX_BITS;
 
+/// Level value selecting the hash-chain encoder (`pack_fast`)
+pub const LEVEL_FAST: usize = 0;
+/// Level value selecting the optimal-parse encoder (`pack_optimal`)
+pub const LEVEL_OPTIMAL: usize = 18;
+
+/// Longest distance a token can hold (12-bit offset)
+const MAX_DIST: usize = WINDOW_SIZE - 1;
+/// Candidates tried per position by `pack_fast`
+const FAST_CHAIN: usize = 32;
+const NO_POS: u32 = u32::MAX;
+
 /// Binary tree node for LZSS compression
 struct LzssTree {
     #[allow(dead_code)]
@@ -292,6 +305,282 @@ pub fn pack(src: &[u8]) -> Vec<u8> {
     pack_with_level(src, LOOK_AHEAD)
 }
 
+/// Token stream writer: a flag byte (bit set = literal) before every group
+/// of 8 items, as read by `unpack`
+struct PackWriter {
+    buf: Vec<u8>,
+    flag_pos: usize,
+    bit: u8,
+}
+
+impl PackWriter {
+    fn new(cap: usize) -> Self {
+        let mut buf = Vec::with_capacity(cap + cap / 8 + 16);
+        buf.extend_from_slice(&[0u8; 8]);
+        Self {
+            buf,
+            flag_pos: 0,
+            bit: 8,
+        }
+    }
+
+    #[inline]
+    fn item(&mut self) -> u8 {
+        if self.bit == 8 {
+            self.flag_pos = self.buf.len();
+            self.buf.push(0);
+            self.bit = 0;
+        }
+        let b = 1u8 << self.bit;
+        self.bit += 1;
+        b
+    }
+
+    #[inline]
+    fn literal(&mut self, c: u8) {
+        let b = self.item();
+        self.buf[self.flag_pos] |= b;
+        self.buf.push(c);
+    }
+
+    #[inline]
+    fn copy(&mut self, dist: usize, len: usize) {
+        self.item();
+        let tok = (dist << LENGTH_BITS) | (len - BREAK_EVEN - 1);
+        self.buf.push(tok as u8);
+        self.buf.push((tok >> 8) as u8);
+    }
+
+    fn finish(mut self, org_size: usize) -> Vec<u8> {
+        let pack_buf_size = self.buf.len() as u32;
+        self.buf[0..4].copy_from_slice(&pack_buf_size.to_le_bytes());
+        self.buf[4..8].copy_from_slice(&(org_size as u32).to_le_bytes());
+        self.buf
+    }
+}
+
+/// Hash chains over 2-byte keys, limited to the 12-bit window
+struct HashChain<'a> {
+    src: &'a [u8],
+    head: Vec<u32>,
+    prev: Vec<u32>,
+}
+
+impl<'a> HashChain<'a> {
+    fn new(src: &'a [u8]) -> Self {
+        Self {
+            src,
+            head: vec![NO_POS; 1 << 16],
+            prev: vec![NO_POS; WINDOW_SIZE],
+        }
+    }
+
+    #[inline]
+    fn key(&self, pos: usize) -> usize {
+        self.src[pos] as usize | (self.src[pos + 1] as usize) << 8
+    }
+
+    #[inline]
+    fn insert(&mut self, pos: usize) {
+        if pos + 1 < self.src.len() {
+            let h = self.key(pos);
+            self.prev[pos & MAX_DIST] = self.head[h];
+            self.head[h] = pos as u32;
+        }
+    }
+
+    /// Longest match (len, dist) for pos among the last `depth` inserted
+    /// positions with the same key
+    #[inline]
+    fn find(&self, pos: usize, depth: usize) -> (usize, usize) {
+        let src = self.src;
+        let max = LOOK_AHEAD.min(src.len() - pos);
+        if max <= BREAK_EVEN {
+            return (0, 0);
+        }
+        let (mut best, mut dist) = (BREAK_EVEN, 0);
+        let mut cand = self.head[self.key(pos)];
+        let mut tried = 0;
+        while cand != NO_POS && tried < depth {
+            let c = cand as usize;
+            if pos - c > MAX_DIST {
+                break;
+            }
+            if src[c + best] == src[pos + best] {
+                let mut n = 0;
+                while n < max && src[c + n] == src[pos + n] {
+                    n += 1;
+                }
+                if n > best {
+                    best = n;
+                    dist = pos - c;
+                    if n == max {
+                        break;
+                    }
+                }
+            }
+            cand = self.prev[c & MAX_DIST];
+            tried += 1;
+        }
+        if dist == 0 { (0, 0) } else { (best, dist) }
+    }
+}
+
+/// Fast LZSS compression (hash chains with one-step lazy matching)
+///
+/// Produces a stream `unpack` (and the engine) reads, several times faster
+/// than the tree encoder, but not byte-identical to it. Meant for iteration
+/// builds (`--lzss-fast`).
+pub fn pack_fast(src: &[u8]) -> Vec<u8> {
+    if src.is_empty() {
+        return Vec::new();
+    }
+    let n = src.len();
+    let mut out = PackWriter::new(n);
+    let mut hc = HashChain::new(src);
+    let mut pos = 0;
+    let mut next: Option<(usize, usize)> = None;
+    while pos < n {
+        let (len, dist) = next.take().unwrap_or_else(|| hc.find(pos, FAST_CHAIN));
+        hc.insert(pos);
+        if len > BREAK_EVEN && len < LOOK_AHEAD && pos + 1 < n {
+            // A longer match one byte later wins over this one
+            let m = hc.find(pos + 1, FAST_CHAIN);
+            if m.0 > len {
+                out.literal(src[pos]);
+                pos += 1;
+                next = Some(m);
+                continue;
+            }
+        }
+        if len > BREAK_EVEN {
+            out.copy(dist, len);
+            for p in pos + 1..pos + len {
+                hc.insert(p);
+            }
+            pos += len;
+        } else {
+            out.literal(src[pos]);
+            pos += 1;
+        }
+    }
+    out.finish(n)
+}
+
+/// Smallest LZSS compression (optimal parse)
+///
+/// Finds the longest match at every position by searching the whole
+/// window, then picks literals and match lengths by a shortest path over
+/// the stream size (9 bits per literal, 17 per match, flag bit included).
+/// Slower than level 17; meant for release builds (`--lzss-optimal`).
+pub fn pack_optimal(src: &[u8]) -> Vec<u8> {
+    if src.is_empty() {
+        return Vec::new();
+    }
+    let n = src.len();
+    let mut hc = HashChain::new(src);
+    let mut longest = vec![(0u8, 0u16); n];
+    for (pos, m) in longest.iter_mut().enumerate() {
+        let (len, dist) = hc.find(pos, usize::MAX);
+        *m = (len as u8, dist as u16);
+        hc.insert(pos);
+    }
+
+    // cost[i]: bits needed for src[i..]; step[i]: 1 = literal, else match length
+    let mut cost = vec![0u64; n + 1];
+    let mut step = vec![1u8; n];
+    for i in (0..n).rev() {
+        let mut best = cost[i + 1] + 9;
+        for len in BREAK_EVEN + 1..=longest[i].0 as usize {
+            let c = cost[i + len] + 17;
+            if c < best {
+                best = c;
+                step[i] = len as u8;
+            }
+        }
+        cost[i] = best;
+    }
+
+    let mut out = PackWriter::new(n);
+    let mut pos = 0;
+    while pos < n {
+        let len = step[pos] as usize;
+        if len > BREAK_EVEN {
+            out.copy(longest[pos].1 as usize, len);
+        } else {
+            out.literal(src[pos]);
+        }
+        pos += len;
+    }
+    out.finish(n)
+}
+
+/// LZSS compression by level: `LEVEL_FAST`, 2-17 or `LEVEL_OPTIMAL`
+#[inline]
+pub fn pack_level(src: &[u8], level: usize) -> Vec<u8> {
+    if level == LEVEL_FAST {
+        pack_fast(src)
+    } else if level >= LEVEL_OPTIMAL {
+        pack_optimal(src)
+    } else {
+        pack_with_level(src, level)
+    }
+}
+
+/// LZSS compression of many buffers on `threads` worker threads
+///
+/// Workers take the next buffer from a shared index, largest first, so a
+/// big buffer does not end up last on one thread while the others idle.
+/// Outputs are returned in input order.
+///
+/// # Arguments
+/// * `srcs` - Buffers to compress
+/// * `level` - Compression level, as in `pack_level`
+/// * `code` - If set, each output is XORed with this cyclic key (from
+///   offset 0) before it is returned
+/// * `threads` - Number of worker threads
+pub fn pack_many(
+    srcs: &[&[u8]],
+    level: usize,
+    code: Option<&[u8]>,
+    threads: usize,
+) -> Vec<Vec<u8>> {
+    let mut order: Vec<usize> = (0..srcs.len()).collect();
+    order.sort_by(|&a, &b| srcs[b].len().cmp(&srcs[a].len()));
+    let next = AtomicUsize::new(0);
+    let w = threads.clamp(1, srcs.len().max(1));
+
+    let mut out: Vec<Vec<u8>> = vec![Vec::new(); srcs.len()];
+    std::thread::scope(|s| {
+        let handles: Vec<_> = (0..w)
+            .map(|_| {
+                s.spawn(|| {
+                    let mut done = Vec::new();
+                    loop {
+                        let k = next.fetch_add(1, Ordering::Relaxed);
+                        if k >= order.len() {
+                            break;
+                        }
+                        let i = order[k];
+                        let mut lz = pack_level(srcs[i], level);
+                        if let Some(code) = code {
+                            crate::xor::cycle_inplace(&mut lz, code, 0);
+                        }
+                        done.push((i, lz));
+                    }
+                    done
+                })
+            })
+            .collect();
+        for h in handles {
+            for (i, lz) in h.join().unwrap() {
+                out[i] = lz;
+            }
+        }
+    });
+    out
+}
+
 /// LZSS decompression
 pub fn unpack(src: &[u8]) -> Vec<u8> {
     if src.len() < 8 {
@@ -386,4 +675,84 @@ mod tests {
         // Expected behavior: lower level (shorter match) -> larger size
         assert!(packed_2.len() >= packed_17.len());
     }
+
+    #[test]
+    fn test_pack_many() {
+        let mut big = Vec::with_capacity(5000);
+        for i in 0..5000u32 {
+            big.push((i * 7 % 251) as u8);
+        }
+        let srcs: Vec<&[u8]> = vec![b"abcabcabcabc", &[], &big, b"Hello, World! Hello!"];
+        let code = [0x11u8, 0x22, 0x33];
+        for threads in [1, 3, 16] {
+            let outs = pack_many(&srcs, 17, None, threads);
+            assert_eq!(outs.len(), srcs.len());
+            for (src, lz) in srcs.iter().zip(&outs) {
+                assert_eq!(lz, &pack(src));
+            }
+            let enc = pack_many(&srcs, 17, Some(&code), threads);
+            for (lz, e) in outs.iter().zip(&enc) {
+                let mut d = e.clone();
+                crate::xor::cycle_inplace(&mut d, &code, 0);
+                assert_eq!(&d, lz);
+            }
+        }
+        assert!(pack_many(&[], 17, None, 4).is_empty());
+    }
+
+    #[test]
+    fn test_pack_fast_roundtrip() {
+        let mut noise = Vec::with_capacity(20000);
+        let mut x: u32 = 1;
+        for _ in 0..20000 {
+            x = x.wrapping_mul(214013).wrapping_add(2531011);
+            noise.push((x >> 16) as u8 & 0x0F);
+        }
+        let mut far = vec![7u8; 3];
+        far.extend((0..5000u32).map(|i| (i % 253) as u8));
+        far.extend_from_slice(&far.clone()[..100]);
+        let cases: Vec<Vec<u8>> = vec![
+            b"a".to_vec(),
+            b"ab".to_vec(),
+            b"aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa".to_vec(),
+            b"Hello, World! Hello, World! Hello!".repeat(50),
+            noise,
+            far,
+        ];
+        for data in &cases {
+            let packed = pack_fast(data);
+            assert_eq!(&unpack(&packed), data);
+            assert_eq!(
+                u32::from_le_bytes([packed[0], packed[1], packed[2], packed[3]]) as usize,
+                packed.len()
+            );
+        }
+        assert!(pack_fast(&[]).is_empty());
+        assert_eq!(pack_level(b"abcabc", LEVEL_FAST), pack_fast(b"abcabc"));
+    }
+
+    #[test]
+    fn test_pack_optimal() {
+        let mut noise = Vec::with_capacity(20000);
+        let mut x: u32 = 7;
+        for _ in 0..20000 {
+            x = x.wrapping_mul(214013).wrapping_add(2531011);
+            noise.push((x >> 16) as u8 & 0x07);
+        }
+        let cases: Vec<Vec<u8>> = vec![
+            b"a".to_vec(),
+            b"abababababababababababababababab".to_vec(),
+            vec![0u8; 10000],
+            b"Hello, World! Hello, World! Hello!".repeat(50),
+            noise,
+        ];
+        for data in &cases {
+            let packed = pack_optimal(data);
+            assert_eq!(&unpack(&packed), data);
+            assert!(packed.len() <= pack(data).len());
+            assert!(packed.len() <= pack_fast(data).len());
+        }
+        assert!(pack_optimal(&[]).is_empty());
+        assert_eq!(pack_level(b"abcabc", 18), pack_optimal(b"abcabc"));
+    }
 }
@@ -0,0 +1,227 @@
+"""
+Content-addressed on-disk cache for compile stage outputs.
+
+compile_one_pipeline consults this cache so that a rebuild restarts from the
+deepest stage whose inputs are unchanged:
+
+- bs:   compiled .dat bytes, keyed by (front key, shuffle seed)
+- ma:   state needed to run BS alone (ia_data subset, LA and MA output),
+        keyed by the front key
+- la:   LA output, keyed by the CA output text (so LA is skipped whenever CA
+        produces the same text, e.g. after an unrelated .inc change)
+- meta: per-script facts such as the string count, keyed by the front key
+
+The link stage stores its LZSS work in the same cache, keyed by content
+rather than by scene name, so it is skipped whenever a build produces bytes
+an earlier build (any tmp dir or branch) already compressed:
+
+- lzss: LZSS + easy angou blob of a scene, keyed by (.dat bytes, LZSS
+        level, easy angou code)
+- os:   source angou blob of an original source file, keyed by (source
+        bytes, file name, LZSS level, source angou codes)
+
+The front key is a hash of (source bytes, include-set hash, charset, tool
+version). The tool version hashes the package's own sources, so any change to
+a stage or encoder invalidates every entry without a manual bump.
+
+Entries are pickles written atomically, so one cache directory can be shared
+by parallel workers, several tmp dirs and CI runs. The directory is kept under
+a size budget by evicting the least recently used entries (hits refresh the
+file mtime).
+
+Loading an entry unpickles it, and unpickling runs arbitrary code: the cache
+directory must only be writable by users trusted to run code as this one.
+Never point it at a shared or world-writable location.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Any, Optional
+
+# Bump when the layout of the cache directory or of an entry changes.
+CACHE_FORMAT = 2
+
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+STAGES = ("meta", "la", "ma", "bs", "lzss", "os")
+
+
+_TOOL_VERSION = None
+
+
+def tool_version() -> str:
+    """
+    Return the package version, CACHE_FORMAT and a hash of the package's .py
+    files and Rust sources (computed once per process).
+    """
+    global _TOOL_VERSION
+    if _TOOL_VERSION is None:
+        from . import __version__
+
+        pkg = os.path.dirname(os.path.abspath(__file__))
+        files = []
+        for sub, ext in (("", ".py"), (os.path.join("rust", "src"), ".rs")):
+            d = os.path.join(pkg, sub)
+            if os.path.isdir(d):
+                files += [
+                    os.path.join(sub, f)
+                    for f in sorted(os.listdir(d))
+                    if f.endswith(ext)
+                ]
+        h = hashlib.sha1()
+        for rel in files:
+            h.update(rel.replace(os.sep, "/").encode("utf-8"))
+            h.update(b"\0")
+            with open(os.path.join(pkg, rel), "rb") as f:
+                h.update(f.read())
+        _TOOL_VERSION = f"{__version__}/{CACHE_FORMAT}/{h.hexdigest()[:16]}"
+    return _TOOL_VERSION
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha1(data or b"").hexdigest()
+
+
+def hash_text(text: str) -> str:
+    return hash_bytes((text or "").encode("utf-8", "surrogatepass"))
+
+
+def make_key(*parts) -> str:
+    h = hashlib.sha1()
+    for p in parts:
+        h.update(str(p).encode("utf-8", "surrogatepass"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class StageCache:
+    """Size-bounded LRU cache of pickled stage outputs under one directory."""
+
+    def __init__(self, root: str, max_bytes: Optional[int] = None):
+        self.root = os.path.abspath(root)
+        self.max_bytes = int(max_bytes) if max_bytes else DEFAULT_MAX_BYTES
+        self.version = tool_version()
+
+    def front_key(self, src: bytes, ia_hash: str, charset: str) -> str:
+        return make_key("front", self.version, charset, ia_hash, hash_bytes(src))
+
+    def la_key(self, scn_text: str) -> str:
+        return make_key("la", self.version, hash_text(scn_text))
+
+    def lzss_key(self, dat: bytes, level: int, easy_code: bytes) -> str:
+        return make_key(
+            "lzss", self.version, hash_bytes(dat), level, hash_bytes(easy_code)
+        )
+
+    def os_key(self, src: bytes, name: str, level: int, source_angou) -> str:
+        codes = hash_text(repr(sorted((source_angou or {}).items())))
+        return make_key("os", self.version, hash_bytes(src), name, level, codes)
+
+    def _path(self, stage: str, key: str) -> str:
+        return os.path.join(self.root, stage, key[:2], key)
+
+    def get(self, stage: str, key: str) -> Optional[Any]:
+        if not key:
+            return None
+        p = self._path(stage, key)
+        try:
+            with open(p, "rb") as f:
+                obj = pickle.load(f)
+        except Exception:
+            return None
+        try:
+            os.utime(p, None)
+        except Exception:
+            pass
+        return obj
+
+    def put(self, stage: str, key: str, obj: Any) -> None:
+        if not key:
+            return
+        p = self._path(stage, key)
+        d = os.path.dirname(p)
+        try:
+            os.makedirs(d, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=d, prefix=".tmp_")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, p)
+            except Exception:
+                try:
+                    os.remove(tmp)
+                except Exception:
+                    pass
+                raise
+        except Exception:
+            # A cache that cannot be written must never break the build.
+            pass
+
+    def size(self) -> int:
+        total = 0
+        for _, _, st in self._entries():
+            total += st.st_size
+        return total
+
+    def _entries(self):
+        for stage in STAGES:
+            sd = os.path.join(self.root, stage)
+            if not os.path.isdir(sd):
+                continue
+            for base, _, files in os.walk(sd):
+                for fn in files:
+                    p = os.path.join(base, fn)
+                    try:
+                        st = os.stat(p)
+                    except OSError:
+                        continue
+                    yield p, fn, st
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """
+        Delete least recently used entries until the cache fits the budget.
+
+        Args:
+            max_bytes: Size budget (None = the cache's own max_bytes)
+
+        Returns:
+            Number of bytes removed
+        """
+        limit = self.max_bytes if max_bytes is None else int(max_bytes)
+        entries = []
+        total = 0
+        for p, fn, st in self._entries():
+            if fn.startswith(".tmp_"):
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+        if total <= limit:
+            return 0
+        entries.sort()
+        removed = 0
+        for _, sz, p in entries:
+            if total - removed <= limit:
+                break
+            try:
+                os.remove(p)
+                removed += sz
+            except OSError:
+                pass
+        return removed
+
+
+def open_stage_cache(ctx) -> Optional[StageCache]:
+    """Return the StageCache configured in ctx, or None when caching is off."""
+    if not isinstance(ctx, dict):
+        return None
+    cache = ctx.get("_stage_cache")
+    if isinstance(cache, StageCache):
+        return cache
+    root = ctx.get("stage_cache")
+    if not root:
+        return None
+    cache = StageCache(root, ctx.get("stage_cache_max"))
+    ctx["_stage_cache"] = cache
+    return cache
@@ -0,0 +1,120 @@
+"""
+Per-file, per-stage tracing for the compiler (-c --trace out.json).
+
+Spans are kept in memory as Chrome trace-event "complete" events ("ph": "X")
+and written by write_trace; the file opens in chrome://tracing or Perfetto.
+Timestamps come from the wall clock (microseconds) so spans recorded by
+worker processes line up with the parent's.
+
+Tracing is off unless enable() was called in the current process, and
+record() is then a no-op. Stages keep their existing time.time() bookkeeping
+and report a finished span with record(stage, name, start, ...).
+
+Process-pool workers record into their own list; task functions return it
+with their result (take_events) and the parent merges it (add_events).
+Thread-pool workers share the parent's list.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+_EVENTS: Optional[List[Dict]] = None
+
+
+def enable(on: bool = True) -> None:
+    """Start (or stop) collecting spans in this process."""
+    global _EVENTS
+    _EVENTS = [] if on else None
+
+
+def enabled() -> bool:
+    return _EVENTS is not None
+
+
+def record(
+    stage: str,
+    name: str,
+    start: float,
+    end: Optional[float] = None,
+    bytes_in: Optional[int] = None,
+    bytes_out: Optional[int] = None,
+) -> None:
+    """
+    Record one finished span.
+
+    Args:
+        stage: Stage name (IA, CA, LA, SA, MA, BS, LZSS, OS, link, write, ...)
+        name: File the stage worked on
+        start: time.time() at stage start
+        end: time.time() at stage end (None = now)
+        bytes_in: Input size, if meaningful for the stage
+        bytes_out: Output size, if meaningful for the stage
+    """
+    events = _EVENTS
+    if events is None:
+        return
+    if end is None:
+        end = time.time()
+    args = {"file": name}
+    if bytes_in is not None:
+        args["bytes_in"] = int(bytes_in)
+    if bytes_out is not None:
+        args["bytes_out"] = int(bytes_out)
+    events.append(
+        {
+            "name": f"{stage} {name}" if name else stage,
+            "cat": stage,
+            "ph": "X",
+            "ts": int(start * 1e6),
+            "dur": max(0, int((end - start) * 1e6)),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        }
+    )
+
+
+def take_events() -> Optional[List[Dict]]:
+    """Return and clear the spans recorded so far (None when disabled)."""
+    global _EVENTS
+    if _EVENTS is None:
+        return None
+    events = _EVENTS
+    _EVENTS = []
+    return events
+
+
+def add_events(events: Optional[List[Dict]]) -> None:
+    """Merge spans returned by a worker process."""
+    if _EVENTS is not None and events:
+        _EVENTS.extend(events)
+
+
+def write_trace(path: str) -> None:
+    """Write the collected spans as a Chrome trace-event JSON file."""
+    events = list(_EVENTS or [])
+    main_pid = os.getpid()
+    meta = []
+    for pid in sorted({e["pid"] for e in events} | {main_pid}):
+        label = "siglus-ssu" if pid == main_pid else f"worker {pid}"
+        meta.append(
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": 0,
+                "args": {"name": label},
+            }
+        )
+    d = os.path.dirname(os.path.abspath(path))
+    if d:
+        os.makedirs(d, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"traceEvents": meta + events, "displayTimeUnit": "ms"},
+            f,
+            ensure_ascii=False,
+        )
@@ -0,0 +1,155 @@
+"""
+Watch mode for the compiler (-c --watch).
+
+Keeps one process alive and rebuilds whenever the input directory changes,
+so the fixed per-invocation cost (imports, const.py tables, include
+analysis, worker pool startup) is paid once. Each build runs the normal
+incremental compile (the tmp dir is kept between builds) with a session dict
+that carries warm state from build to build:
+
+- ia/ia_key: ia_data, ia_hash and inc_symbols for the current include set
+- compile_pool: the --parallel worker pool (recreated when ia_data changes)
+
+Editors can drive the process through stdin, one command per line:
+
+    build   rebuild now, even if no file changed
+    quit    stop watching
+
+After every build a "[WATCH] ok <seconds>" or "[WATCH] fail <seconds>" line
+is printed. Closing stdin only stops command input; the watcher keeps
+running until "quit" or Ctrl+C.
+"""
+
+import os
+import queue
+import sys
+import threading
+import time
+
+
+def _snapshot(root, skip_dirs):
+    skip = {os.path.normcase(os.path.abspath(d)) for d in skip_dirs if d}
+    out = {}
+    for base, dirs, files in os.walk(root):
+        dirs[:] = [
+            d
+            for d in dirs
+            if os.path.normcase(os.path.abspath(os.path.join(base, d))) not in skip
+        ]
+        for fn in files:
+            p = os.path.join(base, fn)
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            out[p] = (st.st_mtime_ns, st.st_size)
+    return out
+
+
+def _read_commands(stream, cmds):
+    # Read the raw fd: a thread blocked in sys.stdin.readline() holds the
+    # buffer lock, and forked pool workers deadlock closing stdin on start.
+    try:
+        fd = stream.fileno()
+    except Exception:
+        fd = None
+    try:
+        if fd is None:
+            for line in stream:
+                cmds.put(line.strip().lower())
+            return
+        buf = b""
+        while True:
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                break
+            buf += chunk
+            while b"\n" in buf:
+                line, buf = buf.split(b"\n", 1)
+                cmds.put(line.decode("utf-8", "replace").strip().lower())
+        if buf.strip():
+            cmds.put(buf.decode("utf-8", "replace").strip().lower())
+    except Exception:
+        pass
+
+
+def _build(argv, session):
+    from . import compiler
+    from .BS import set_shuffle_seed
+
+    # Every build starts from the default shuffle state, like a fresh process
+    set_shuffle_seed(1)
+    t = time.time()
+    try:
+        rc = compiler.main(argv, session=session)
+    except Exception as e:
+        sys.stderr.write(f"{e}\n")
+        rc = 1
+    state = "ok" if rc == 0 else "fail"
+    print(f"[WATCH] {state} {time.time() - t:.3f}s")
+    sys.stdout.flush()
+    return rc
+
+
+def close_session(session):
+    pool = session.pop("compile_pool", None)
+    if pool is not None:
+        pool.shutdown()
+
+
+def watch_loop(argv, inp, skip_dirs=(), interval=0.5, stream=None):
+    """
+    Build, then rebuild on every change under inp until told to quit.
+
+    Args:
+        argv: Compiler arguments (without --watch; must include --tmp)
+        inp: Input directory to watch
+        skip_dirs: Directories below inp to ignore (output, tmp)
+        interval: Polling interval in seconds
+        stream: Command input (default: sys.stdin)
+
+    Returns:
+        Exit code of the last build
+    """
+    cmds = queue.Queue()
+    reader = threading.Thread(
+        target=_read_commands, args=(stream or sys.stdin, cmds), daemon=True
+    )
+    reader.start()
+    print(f"[WATCH] watching {inp} (commands: build, quit)")
+    session = {}
+    rc = 1
+    try:
+        snap = _snapshot(inp, skip_dirs)
+        rc = _build(argv, session)
+        while True:
+            try:
+                cmd = cmds.get(timeout=interval)
+            except queue.Empty:
+                cmd = None
+            if cmd in ("quit", "exit"):
+                break
+            if cmd == "build":
+                snap = _snapshot(inp, skip_dirs)
+                rc = _build(argv, session)
+                continue
+            if cmd:
+                print(f"[WATCH] unknown command: {cmd}")
+                sys.stdout.flush()
+            cur = _snapshot(inp, skip_dirs)
+            if cur == snap:
+                continue
+            # Let a multi-file save settle before building
+            while True:
+                time.sleep(interval)
+                nxt = _snapshot(inp, skip_dirs)
+                if nxt == cur:
+                    break
+                cur = nxt
+            snap = cur
+            rc = _build(argv, session)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_session(session)
+    return rc
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Startup-time benchmark: import cost of every siglus-ssu mode."""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PKG = "siglus_scene_script_utility"
+MODES = [
+    ("-c", "compiler"),
+    ("-x", "extract"),
+    ("-a", "analyze"),
+    ("-k", "koe_collector"),
+    ("-e", "exec"),
+    ("-m", "textmap"),
+]
+RUNS = int(os.environ.get("STARTUP_RUNS", "10"))
+ENV = dict(os.environ)
+ENV.pop("PYTHONDONTWRITEBYTECODE", None)  # measure with a warm .pyc cache
+
+
+def run(mod):
+    """Return (wall ms of the whole interpreter, cumulative import ms of mod)."""
+    t = time.perf_counter()
+    r = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {PKG}.{mod}"],
+        env=ENV,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = (time.perf_counter() - t) * 1000.0
+    cum = 0.0
+    for line in r.stderr.splitlines():
+        if line.rstrip().endswith(f"| {PKG}.{mod}"):
+            cum = int(line.split("|")[1]) / 1000.0
+    return wall, cum
+
+
+# Interpreter baseline (no package import)
+t = time.perf_counter()
+for _ in range(RUNS):
+    subprocess.run([sys.executable, "-c", "pass"], env=ENV, check=True)
+base = (time.perf_counter() - t) * 1000.0 / RUNS
+
+print("=" * 60)
+print(f"STARTUP BENCHMARK ({RUNS} runs, median)")
+print("=" * 60)
+print(f"python -c pass: {base:.1f}ms")
+print(f"{'mode':<6}{'module':<16}{'process ms':>12}{'import ms':>12}")
+for flag, mod in MODES:
+    run(mod)  # warm the .pyc cache
+    res = [run(mod) for _ in range(RUNS)]
+    wall = statistics.median(r[0] for r in res)
+    cum = statistics.median(r[1] for r in res)
+    print(f"{flag:<6}{mod:<16}{wall:>12.1f}{cum:>12.1f}")
@@ -0,0 +1,182 @@
+import json
+import os
+import shutil
+import time
+
+import pytest
+
+from siglus_scene_script_utility import artifacts, compiler, linker
+from siglus_scene_script_utility.BS import set_shuffle_seed
+from siglus_scene_script_utility.artifacts import ArtifactStore
+
+
+def test_store_keeps_blobs_in_memory_within_budget(tmp_path):
+    st = ArtifactStore(str(tmp_path), persist=False, budget=8)
+    st.put("a", "dat", b"12345")
+    st.put("a", "lzss", b"xyz")
+    assert not list(tmp_path.iterdir())
+    st.put("b", "dat", b"spill")  # over budget: written instead of kept
+    assert (tmp_path / "b.dat").read_bytes() == b"spill"
+    assert st.get("b", "dat") == b"spill"
+    assert st.mem_size() == 8
+    st.put("a", "dat", b"new")  # a new .dat drops the old .lzss
+    assert st.get("a", "lzss") is None
+    assert st.get("c", "dat") is None
+    assert st.fresh("a") and not st.fresh("c")
+
+
+def _project(root):
+    root.mkdir()
+    (root / "global.inc").write_text(
+        "#define MAXV 10\n#property $a : int\n", encoding="utf-8"
+    )
+    for i in range(3):
+        (root / f"s{i}.ss").write_text(
+            f'#z00\n$a = MAXV + {i}\nprint("scene {i}")\n', encoding="utf-8"
+        )
+    return root
+
+
+def test_compile_without_tmp_does_not_write_scene_files(tmp_path, monkeypatch):
+    """Only --tmp builds write tmp/bs; both produce the same Scene.pck."""
+    src = _project(tmp_path / "src")
+    written = []
+    wr = artifacts.wr
+    monkeypatch.setattr(
+        artifacts, "wr", lambda p, *a, **k: (written.append(p), wr(p, *a, **k))
+    )
+    outs = []
+    for extra in ([], ["--tmp", str(tmp_path / "tmp")]):
+        out = tmp_path / f"out{len(outs)}" / "Scene.pck"
+        set_shuffle_seed(1)
+        assert compiler.main(["--no-os", *extra, str(src), str(out)]) == 0
+        outs.append(out.read_bytes())
+        if not extra:
+            assert written == []
+    assert outs[0] == outs[1]
+    assert sorted(p.name for p in (tmp_path / "tmp" / "bs").iterdir()) == [
+        f"s{i}.{k}" for i in range(3) for k in ("dat", "lzss")
+    ]
+
+
+def test_lzss_pipeline_joins_in_scene_order(tmp_path):
+    from siglus_scene_script_utility.native_ops import lzss_pack, xor_cycle_inplace
+    from siglus_scene_script_utility.parallel import LzssPipeline
+
+    code = b"\x01\x02\x03"
+    st = ArtifactStore(str(tmp_path), persist=False)
+    ctx = {"artifacts": st, "easy_angou_code": code, "lzss_level": 17}
+    pipe = LzssPipeline(ctx, 2)
+    try:
+        for nm in ("b", "a", "b"):  # b is recompiled; its first blob is stale
+            st.put(nm, "dat", (nm * 50 + str(len(pipe._futures))).encode())
+        time.sleep(0.5)  # idle pipeline time is not LZSS time
+        names, dats, lzs = pipe.scenes(["a", "b"])
+        assert pipe.source_chunks() == (0, [])
+        assert 0 < pipe.lzss_time < 0.5
+    finally:
+        pipe.close()
+    assert names == ["a", "b"]
+    assert dats == [st.get("a", "dat"), st.get("b", "dat")]
+    for dat, lz in zip(dats, lzs):
+        want = bytearray(lzss_pack(dat))
+        xor_cycle_inplace(want, code, 0)
+        assert lz == bytes(want)
+    assert st.get("b", "lzss") == lzs[1]
+
+
+def _build(src, tmp, out, extra):
+    set_shuffle_seed(1)
+    argv = [*extra, "--tmp", str(tmp), str(src), str(out / "Scene.pck")]
+    assert compiler.main(argv) == 0
+    return (out / "Scene.pck").read_bytes()
+
+
+@pytest.mark.parametrize("mode", ["plain", "angou", "exe"])
+def test_patched_link_matches_full_link(tmp_path, monkeypatch, mode):
+    """Every incremental link patches Scene.pck to the bytes a full link writes."""
+    src = _project(tmp_path / "src")
+    with open(src / "global.inc", "a", encoding="utf-8") as f:
+        f.write("#command cmd_add(int) : int\n")
+    # s2 defines the inc command, so its labels must survive being reused
+    with open(src / "s2.ss", "a", encoding="utf-8") as f:
+        f.write("command cmd_add(property $v : int) : int {\n return($v + 1)\n}\n")
+    extra = {"plain": ["--no-angou"], "angou": [], "exe": []}[mode]
+    if mode == "exe":
+        (src / "暗号.dat").write_text("abcdefghijkl\n", encoding="utf-8")
+
+    patched, loaded = [], []
+    patch, load = linker._patch_pack, linker._load_scene_data
+
+    def counting_patch(*a):
+        patched.append(1)
+        return patch(*a)
+
+    def recording_load(ctx, names, *a, **k):
+        loaded.append(list(names))
+        return load(ctx, names, *a, **k)
+
+    monkeypatch.setattr(linker, "_patch_pack", counting_patch)
+    monkeypatch.setattr(linker, "_load_scene_data", recording_load)
+
+    def edit(name, text=None, mode="a"):
+        if text is None:
+            (src / name).unlink()
+        else:
+            with open(src / name, mode, encoding="utf-8") as f:
+                f.write(text)
+
+    tmp, out = tmp_path / "tmp", tmp_path / "out"
+    _build(src, tmp, out, extra)
+    steps = [
+        ("nochange", lambda: None, []),
+        ("grow", lambda: edit("s1.ss", 'print("more text for s1")\n'), ["s1"]),
+        ("shrink", lambda: edit("s1.ss", '#z00\nprint("s1")\n', "w"), ["s1"]),
+        ("add", lambda: edit("s3.ss", '#z00\nprint("new scene")\n', "w"), ["s3"]),
+        ("delete", lambda: edit("s0.ss"), []),
+        ("inc", lambda: edit("global.inc", "#define EXTRA 1\n"), None),
+        ("tamper", lambda: (out / "Scene.pck").write_bytes(b"junk"), None),
+    ]
+    for step, change, want_loaded in steps:
+        change()
+        # Control: the same tmp dir without the link manifest
+        ctl_tmp, ctl_out = tmp_path / "ctl_tmp", tmp_path / "ctl_out"
+        shutil.rmtree(ctl_tmp, ignore_errors=True)
+        shutil.rmtree(ctl_out, ignore_errors=True)
+        shutil.copytree(tmp, ctl_tmp)
+        (ctl_tmp / "_link.json").unlink()
+        patched.clear()
+        full = _build(src, ctl_tmp, ctl_out, extra)
+        assert not patched, step
+        patched.clear()
+        loaded.clear()
+        assert _build(src, tmp, out, extra) == full, step
+        assert bool(patched) == (step != "tamper"), step
+        if want_loaded is not None:
+            assert loaded == [want_loaded], step
+        man = json.loads((tmp / "_link.json").read_text(encoding="utf-8"))
+        assert man["scenes"]["s2"][3], step  # labels of the command
+
+
+def test_link_manifest_must_match_config_and_packs(tmp_path):
+    """A manifest is only used for the config and pack files it recorded."""
+    pck = tmp_path / "Scene.pck"
+    pck.write_bytes(b"pack")
+    st = pck.stat()
+    man_path = tmp_path / "_link.json"
+    man = {"config": {"v": 1}, "packs": {str(pck): [st.st_size, st.st_mtime_ns]}}
+    man_path.write_text(json.dumps(man), encoding="utf-8")
+    targets = [(str(pck), None)]
+
+    def read(config=None):
+        return linker._read_link_manifest(str(man_path), config or {"v": 1}, targets)
+
+    assert read() == man
+    assert read({"v": 2}) is None
+    pck.write_bytes(b"pack")  # same size, new mtime
+    os.utime(pck, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+    assert read() is None
+    pck.unlink()
+    assert read() is None
+    man_path.write_text("{not json", encoding="utf-8")
+    assert linker._read_link_manifest(str(man_path), {"v": 1}, []) is None
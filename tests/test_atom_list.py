@@ -0,0 +1,27 @@
+from siglus_scene_script_utility import const as C
+from siglus_scene_script_utility.LA import AtomList, la_analize
+
+
+def test_atom_list_matches_dict_atoms():
+    """AtomList keeps the atom dicts LA used to return, including big opts."""
+    atoms = [
+        {"id": 0, "line": 1, "type": C.LA_T["VAL_INT"], "opt": 5, "subopt": 0},
+        {"id": 1, "line": 2, "type": C.LA_T["VAL_INT"], "opt": 1 << 70, "subopt": 3},
+        {"id": 2, "line": 2, "type": C.LA_T["EOF"], "opt": 0, "subopt": 0},
+    ]
+    al = AtomList.from_dicts(atoms)
+    assert len(al) == 3
+    assert list(al) == atoms
+    assert al[-1] == atoms[-1]
+    assert al[0:2] == atoms[0:2]
+    assert al.type(1) == C.LA_T["VAL_INT"] and al.opt(1) == 1 << 70
+    # Reads past the end see NONE atoms, like SA's old sentinel padding
+    assert al.get(10)["type"] == C.LA_T["NONE"]
+
+
+def test_la_analize_returns_atom_list():
+    lad, err = la_analize({"scn_text": "x = 1\n"})
+    assert err is None
+    atoms = lad["atom_list"]
+    assert isinstance(atoms, AtomList)
+    assert atoms.type(len(atoms) - 1) == C.LA_T["EOF"]
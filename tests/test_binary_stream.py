@@ -0,0 +1,21 @@
+import struct
+
+from siglus_scene_script_utility.BS import BinaryStream
+
+
+def test_binary_stream_shapes_and_back_patching():
+    s = BinaryStream()
+    s.push_u8(0x1FF)
+    s.push_i32(-2)
+    s.push_op(3, 7)
+    s.push_op(4, 1, -1)
+    s.push_op(5)
+    s.write_i32_at(1, 0x12345678)
+    s.write_u8_at(0, 9)
+    assert s.to_bytes() == (
+        struct.pack("<Bi", 9, 0x12345678)
+        + struct.pack("<Bi", 3, 7)
+        + struct.pack("<Bii", 4, 1, -1)
+        + b"\x05"
+    )
+    assert s.size() == 20
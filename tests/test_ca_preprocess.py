@@ -0,0 +1,82 @@
+from siglus_scene_script_utility.CA import CharacterAnalizer, _rt, _rt_add
+
+
+def _ca():
+    ca = CharacterAnalizer()
+    ca.iad = {"name_set": {"dbg"}}
+    return ca
+
+
+def test_analize_file_1_strips_comments_and_lowercases_outside_quotes():
+    src = "A = \"Hi;//\" ; note\nB /* x\ny */ = 'Q' // tail\nC/*/D\n"
+    assert _ca().analize_file_1(src) == "a = \"Hi;//\" \nb \n = 'Q' \ncd\n"
+
+
+def test_analize_file_1_reports_quote_errors_with_line():
+    ca = _ca()
+    assert ca.analize_file_1("a\nx = 'ab'\n") == 0
+    assert ca.get_error_line() == 2
+    assert ca.get_error_str() == (
+        "Single quotes are not closed or contain more than one character."
+    )
+    assert ca.analize_file_1('a\n\nx = "\\q"') == 0
+    assert ca.get_error_line() == 3
+    assert ca.get_error_str().startswith("Invalid escape")
+    assert ca.analize_file_1("a\n/* open\n\n") == 0
+    assert ca.get_error_line() == 2
+
+
+def test_analize_file_2_ifdef_and_inc_blocks():
+    src = "#ifdef dbg\na\n#else\nb\n#endif\n#inc_start\n#define x 1\n#inc_end\nc\n"
+    scn, inc = _ca().analize_file_2(src)
+    assert scn == "\na\n\n\n\n\n\n\nc\n"
+    assert inc == "\n#define x 1\n"
+
+
+def _tree(*reps):
+    rt = _rt()
+    for tp, name, after, args in reps:
+        _rt_add(rt, name, {"type": tp, "name": name, "after": after, "args": args})
+    return {"replace_tree": rt}
+
+
+def test_analize_line_rescans_defines_but_not_replaces():
+    iad = _tree(
+        ("define", "one", "two", []),
+        ("define", "two", "2", []),
+        ("replace", "rep", "one", []),
+        ("macro", "@add", "(a + b)", [{"name": "a"}, {"name": "b", "def": "1"}]),
+    )
+    ca = CharacterAnalizer()
+    assert (
+        ca.analize_line("one rep @add(one) @add(x,y)", iad) == "2 one (2 + 1) (x + y)"
+    )
+    assert {"one", "two", "rep", "@add"} <= ca.used_names
+
+
+def test_analize_line_stops_endless_define_expansion():
+    ca = CharacterAnalizer()
+    assert ca.analize_line("a\nloop\n", _tree(("define", "loop", "x loop", []))) is None
+    assert ca.get_error_line() == 2
+    assert ca.get_error_str() == "Infinite loop detected during inc file replacement."
+
+
+def test_analize_file_uses_shared_automaton_and_local_defines(tmp_path):
+    from siglus_scene_script_utility.BS import _copy_ia_data, build_ia_data
+
+    (tmp_path / "global.inc").write_text("#define INCV 7\n", encoding="utf-8")
+    base = build_ia_data({"scn_path": str(tmp_path), "utf8": True})
+    assert base["replace_ac"] is not None
+
+    iad = _copy_ia_data(base)
+    pcad = {}
+    assert CharacterAnalizer().analize_file("$a = INCV\n", iad, pcad)
+    assert pcad["scn_text"] == "$a = 7\n"
+    assert iad["replace_ac"] is base["replace_ac"]
+
+    iad = _copy_ia_data(base)
+    pcad = {}
+    src = "#inc_start\n#define LOCV INCV + 1\n#inc_end\n$a = LOCV\n"
+    assert CharacterAnalizer().analize_file(src, iad, pcad)
+    assert pcad["scn_text"] == "\n\n\n$a = 7 + 1\n"
+    assert iad["replace_ac"] is not base["replace_ac"]
@@ -0,0 +1,24 @@
+from siglus_scene_script_utility import MA
+from siglus_scene_script_utility import const as C
+
+
+def test_system_form_table_cache_matches_fresh_build(tmp_path, monkeypatch):
+    """The pickled system table is the same table create_system_form_table builds."""
+    fresh = MA.FormTable()
+    fresh.create_system_form_table()
+    path = str(tmp_path / "ft.pickle")
+    monkeypatch.setattr(MA, "_system_form_table_path", lambda: path)
+    for _ in range(2):  # build and store, then load
+        monkeypatch.setattr(MA, "_SYSTEM_FORM_TABLE", None)
+        ft = MA.system_form_table()
+        assert ft.f == fresh.f
+        assert ft.call_base == fresh.call_base
+    assert MA.system_form_table() is ft
+
+
+def test_form_name_reverse_index_keeps_first_name():
+    for code in {int(v) for v in C._FORM_CODE.values()}:
+        first = next(k for k, v in C._FORM_CODE.items() if int(v) == code)
+        assert MA._form_name(code) == first
+    assert MA._form_name("int") == "int"
+    assert MA._form_name(object) is object
@@ -0,0 +1,46 @@
+import pickle
+
+from siglus_scene_script_utility.BS import _copy_ia_data, build_ia_data
+from siglus_scene_script_utility.CA import CharacterAnalizer
+from siglus_scene_script_utility.LA import la_analize
+from siglus_scene_script_utility.MA import MA
+from siglus_scene_script_utility.SA import SA
+
+INC = """#define MAXV 10
+#property $gflag : int
+#command cmd_common(int) : int
+"""
+
+SCRIPT = """#inc_start
+#define LOCV MAXV + 2
+#property $lp : int
+#command lcmd(int) : int
+#inc_end
+#z00
+$lp = LOCV
+$gflag = lcmd($lp)
+command lcmd(property $v : int) : int {
+  return($v + 1)
+}
+"""
+
+
+def test_compiling_a_script_leaves_shared_ia_data_untouched(tmp_path):
+    """Script-local declarations go to the overlay, never to the shared data."""
+    (tmp_path / "global.inc").write_text(INC, encoding="utf-8")
+    base = build_ia_data({"scn_path": str(tmp_path), "utf8": True})
+    before = pickle.dumps(base)
+
+    iad = _copy_ia_data(base)
+    pcad = {}
+    assert CharacterAnalizer().analize_file(SCRIPT, iad, pcad)
+    lad, err = la_analize(pcad)
+    assert err is None
+    ok, sad = SA(iad, lad).analize()
+    assert ok
+    ok, _ = MA(iad, lad, sad).analize()
+    assert ok
+
+    assert pickle.dumps(base) == before
+    assert "locv" in iad["name_set"] and "locv" not in base["name_set"]
+    assert len(iad["command_list"]) == len(base["command_list"]) + 1
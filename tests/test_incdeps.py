@@ -0,0 +1,76 @@
+from siglus_scene_script_utility import compiler, incdeps
+from siglus_scene_script_utility.BS import build_ia_data, set_shuffle_seed
+
+
+def _symbols(tmp_path, inc_text):
+    (tmp_path / "global.inc").write_text(inc_text, encoding="utf-8")
+    ctx = {"scn_path": str(tmp_path), "utf8": True}
+    iad = build_ia_data(ctx)
+    return ctx["inc_symbols"], incdeps.replace_entries(iad), iad
+
+
+def test_inc_change_only_affects_scripts_using_changed_symbols(tmp_path):
+    """Editing or adding an inc symbol only rebuilds scripts that can see it."""
+    base = "#define MAXV 10\n#define OTHER 1\n#property $gflag : int\n"
+    old_sym, _, old_iad = _symbols(tmp_path, base)
+    new_sym, reps, new_iad = _symbols(
+        tmp_path, base.replace("MAXV 10", "MAXV 12") + "#define NEWX 3\n"
+    )
+    assert incdeps.inc_shape(old_iad, "utf-8") == incdeps.inc_shape(new_iad, "utf-8")
+
+    def affected(src, deps):
+        return incdeps.affected(src, deps, old_sym, new_sym, reps)
+
+    assert affected("x = MAXV", ["maxv"])
+    assert not affected("x = $gflag", ["$gflag"])
+    assert affected("x = OTHER", ["other"])  # expands a replacement
+    assert affected("x = NewX", ["other"])
+    assert affected("x = OTHER", None)
+
+
+def test_inc_property_count_change_changes_shape(tmp_path):
+    """Adding an inc property renumbers scene properties: full rebuild."""
+    _, _, old_iad = _symbols(tmp_path, "#property $a : int\n")
+    _, _, new_iad = _symbols(tmp_path, "#property $a : int\n#property $b : int\n")
+    assert incdeps.inc_shape(old_iad, "utf-8") != incdeps.inc_shape(new_iad, "utf-8")
+
+
+def _inc_rebuild_matches_full(tmp_path, old_inc, new_inc, script):
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "global.inc").write_text(old_inc, encoding="utf-8")
+    (src / "s0.ss").write_text(script, encoding="utf-8")
+    (src / "s1.ss").write_text('#z00\nprint("other")\n', encoding="utf-8")
+
+    def build(tmp, out):
+        set_shuffle_seed(1)
+        argv = ["--no-os", "--tmp", str(tmp_path / tmp), str(src)]
+        assert compiler.main([*argv, str(tmp_path / out / "Scene.pck")]) == 0
+        return (tmp_path / out / "Scene.pck").read_bytes()
+
+    build("tmp", "old")
+    (src / "global.inc").write_text(new_inc, encoding="utf-8")
+    assert build("tmp", "inc") == build("full", "full")
+
+
+def test_new_name_formed_by_define_body_and_source(tmp_path):
+    """PRE expands to 1 and joins the following 0 into the new name 10."""
+    inc = "#property $a : int\n#define PRE 1\n"
+    _inc_rebuild_matches_full(
+        tmp_path, inc, inc + "#define 10 3\n", '#z00\n$a = PRE0\nprint("x")\n'
+    )
+
+
+def test_new_name_formed_by_local_define_body_and_source(tmp_path):
+    """Same join through the script's own #define, which is no inc symbol."""
+    inc = "#property $a : int\n"
+    script = "#inc_start\n#define PRE 1\n#inc_end\n#z00\n$a = PRE0\n"
+    _inc_rebuild_matches_full(tmp_path, inc, inc + "#define 10 3\n", script)
+
+
+def test_new_name_formed_by_macro_argument(tmp_path):
+    """The default argument 10 of @M is expanded where @x is substituted."""
+    inc = "#property $a : int\n#macro @M(@x(10)) @x\n"
+    _inc_rebuild_matches_full(
+        tmp_path, inc, inc + "#define 10 3\n", '#z00\n$a = @M()\nprint("x")\n'
+    )
@@ -31,3 +31,108 @@ def test_lzss_level_impact():
     # However, since the look ahead is always 17 in implementation, level controls max match length
     # A smaller max match length means less compression for long repetitions
     assert len(c_low) >= len(c_high)
+
+
+@pytest.mark.parametrize("threads", [None, 1, 3])
+def test_lzss_pack_many(threads):
+    """Batch compression matches lzss_pack + easy angou XOR, in input order."""
+    from siglus_scene_script_utility.native_ops import (
+        lzss_pack_many,
+        xor_cycle_inplace,
+    )
+
+    srcs = [b"abc" * 300, b"", bytes(range(256)) * 20, b"Hello, World! " * 50]
+    code = b"\x11\x22\x33\x44\x55"
+    assert lzss_pack_many(srcs, 17, None, threads) == [lzss_pack(s) for s in srcs]
+    enc = lzss_pack_many(srcs, 5, code, threads)
+    for s, e in zip(srcs, enc):
+        b = bytearray(e)
+        xor_cycle_inplace(b, code, 0)
+        assert lzss_unpack(bytes(b)) == s
+    assert lzss_pack_many([], 17, code, threads) == []
+
+
+def _fast_cases():
+    import random
+
+    r = random.Random(1)
+    far = bytes(r.randrange(256) for _ in range(5000))
+    return [
+        b"a",
+        b"ab",
+        b"a" * 41,
+        b"Hello, World! " * 500,
+        bytes(r.randrange(16) for _ in range(20000)),
+        far + far[:100],
+    ]
+
+
+@pytest.mark.parametrize("data", _fast_cases(), ids=lambda d: str(len(d)))
+def test_lzss_fast_roundtrip(data):
+    """--lzss-fast streams decode with lzss_unpack (native and pure Python)."""
+    from siglus_scene_script_utility.native_ops import (
+        LZSS_LEVEL_FAST,
+        _py_lzss_pack_fast,
+        _py_lzss_unpack,
+    )
+
+    for packed in (lzss_pack(data, level=LZSS_LEVEL_FAST), _py_lzss_pack_fast(data)):
+        assert int.from_bytes(packed[:4], "little") == len(packed)
+        assert lzss_unpack(packed) == data
+        assert _py_lzss_unpack(packed) == data
+
+
+def test_lzss_fast_ratio():
+    """The fast encoder stays close to the original encoder's ratio."""
+    from siglus_scene_script_utility.native_ops import LZSS_LEVEL_FAST
+
+    data = b"Hello, World! " * 5000 + bytes(range(256)) * 40
+    fast = lzss_pack(data, level=LZSS_LEVEL_FAST)
+    assert len(fast) <= len(lzss_pack(data)) * 1.1
+    assert lzss_pack(b"", level=LZSS_LEVEL_FAST) == b""
+
+
+@pytest.mark.parametrize("data", _fast_cases(), ids=lambda d: str(len(d)))
+def test_lzss_optimal_roundtrip(data):
+    """--lzss-optimal streams decode and are never larger than level 17."""
+    from siglus_scene_script_utility.native_ops import (
+        LZSS_LEVEL_OPTIMAL,
+        _py_lzss_pack_optimal,
+    )
+
+    packed = lzss_pack(data, level=LZSS_LEVEL_OPTIMAL)
+    assert packed == _py_lzss_pack_optimal(data)
+    assert lzss_unpack(packed) == data
+    assert len(packed) <= len(lzss_pack(data))
+
+
+def test_lzss_levels_fall_back_without_native_support(monkeypatch):
+    """Levels 0 / 18 use Python when the native build predates them."""
+    from siglus_scene_script_utility import native_ops as N
+
+    calls = []
+
+    def old_level(src, level):
+        assert 2 <= level <= 17, level
+        calls.append(level)
+        return N._py_lzss_pack(src, level)
+
+    def old_many(srcs, level, code, threads):
+        assert 2 <= level <= 17, level
+        calls.append(level)
+        return [N._py_lzss_pack(s, level) for s in srcs]
+
+    monkeypatch.setattr(N, "_USE_NATIVE", True)
+    monkeypatch.setattr(N, "_native_lzss_pack_level", old_level)
+    monkeypatch.setattr(N, "_native_lzss_pack_many", old_many)
+    monkeypatch.setattr(N, "_native_lzss_fast", False)
+    monkeypatch.setattr(N, "_native_lzss_optimal", False)
+
+    data = b"Hello, World! " * 50
+    assert N.lzss_pack(data, N.LZSS_LEVEL_FAST) == N._py_lzss_pack_fast(data)
+    opt = N._py_lzss_pack_optimal(data)
+    assert N.lzss_pack(data, N.LZSS_LEVEL_OPTIMAL) == opt
+    assert N.lzss_pack_many([data], N.LZSS_LEVEL_OPTIMAL) == [opt]
+    assert calls == []
+    assert N.lzss_pack_many([data], 5) == [N._py_lzss_pack(data, 5)]
+    assert calls == [5]
@@ -0,0 +1,170 @@
+import io
+import struct
+
+import pytest
+
+from siglus_scene_script_utility import const as C
+from siglus_scene_script_utility.linker import _pack_layout, _patch_pack, _write_pack
+
+
+def test_one_pass_writes_plain_and_angou_packs():
+    blobs = [b"scene-one", b"", b"\x00\xff" * 40]
+    chunks = [b"hdr", b"os-chunk"]
+    hdr, head = _pack_layout(
+        [{"form": "int", "size": 0}],
+        ["cmd"],
+        ["$p"],
+        [(0, 12)],
+        ["a", "b", "c"],
+        [len(b) for b in blobs],
+        3,
+    )
+    code = bytes(range(1, 17))
+    plain, ang = io.BytesIO(), io.BytesIO()
+    size = _write_pack([(plain, None), (ang, code)], hdr, head, blobs, chunks)
+    p, a = plain.getvalue(), ang.getvalue()
+    assert size == len(p) == len(a)
+
+    fields = C._PACK_HDR_FIELDS
+    hp = dict(zip(fields, struct.unpack_from("<" + "i" * len(fields), p)))
+    ha = dict(zip(fields, struct.unpack_from("<" + "i" * len(fields), a)))
+    assert (hp["scn_data_exe_angou_mod"], ha["scn_data_exe_angou_mod"]) == (0, 1)
+    assert p[hp["header_size"] :] != a[ha["header_size"] :]
+    start = hp["scn_data_list_ofs"]
+    end = start + sum(len(b) for b in blobs)
+    assert p[start:end] == b"".join(blobs)
+    assert bytes(x ^ code[i % 16] for i, x in enumerate(blobs[2])) in a[start:end]
+    assert p[end:] == a[end:] == b"".join(chunks)
+    assert p[C._PACK_HDR_SIZE : start] == a[C._PACK_HDR_SIZE : start] == head
+
+
+def _pack(blobs, chunks, code, names=("a", "b", "c")):
+    hdr, head = _pack_layout([], [], [], [], list(names), [len(b) for b in blobs], 0)
+    out = io.BytesIO()
+    _write_pack([(out, code)], hdr, head, blobs, chunks)
+    return hdr, head, out.getvalue()
+
+
+def test_patch_pack_matches_full_write():
+    code = bytes(range(1, 17))
+    old = [b"one" * 10, b"two" * 10, b"three" * 10]
+    new = [old[0], b"TWO" * 12, old[2]]
+    chunks = [b"os-a", b"os-b"]
+    _, _, before = _pack(old, chunks, code)
+    hdr, head, want = _pack(new, chunks, code)
+
+    start = hdr["scn_data_list_ofs"]
+    ofs = [start, start + 30, start + 66]
+    old_ofs = [start, start + 30, start + 60]
+    segs = [
+        (ofs[0], 30, None, old_ofs[0], True),
+        (ofs[1], 36, new[1], None, True),
+        (ofs[2], 50, None, old_ofs[2], True),
+        (ofs[2] + 50, 4, chunks[0], old_ofs[2] + 50, False),
+        (ofs[2] + 54, 4, chunks[1], old_ofs[2] + 54, False),
+    ]
+    f = io.BytesIO(before)
+    size, written = _patch_pack(f, code, hdr, head, segs)
+    assert f.getvalue() == want
+    assert size == len(want)
+    assert written < len(want)
+
+    f = io.BytesIO(want)
+    segs = [(o, n, None, o, s) for o, n, _, _, s in segs]
+    assert _patch_pack(f, code, hdr, head, segs) == (len(want), 0)
+    assert f.getvalue() == want
+
+
+def test_pck_reader_views_scenes(tmp_path):
+    from siglus_scene_script_utility.extract import PckReader, _scene_dat
+    from siglus_scene_script_utility.native_ops import lzss_pack
+
+    dat = b"scene data " * 50
+    easy = bytes(range(3, 19))
+    lz = bytearray(lzss_pack(dat))
+    for i in range(len(lz)):
+        lz[i] ^= easy[i % 16]
+    blobs = [bytes(lz), b"raw"]
+    hdr, head = _pack_layout([], [], [], [], ["a", "b"], [len(b) for b in blobs], 0)
+    p = tmp_path / "Scene.pck"
+    with open(p, "wb") as f:
+        _write_pack([(f, None)], hdr, head, blobs, [])
+
+    with PckReader(str(p)) as pck:
+        scenes = pck.scenes()
+        assert [nm for nm, _ in scenes] == ["a", "b"]
+        assert all(isinstance(b, memoryview) for _, b in scenes)
+        assert [bytes(b) for _, b in scenes] == blobs
+        assert _scene_dat(scenes[0][1], b"", easy) == dat
+        assert _scene_dat(scenes[1][1], b"", easy) == b"raw"
+    with PckReader(str(p)) as pck:
+        held = pck.scenes()  # views still alive at close
+    assert bytes(held[1][1]) == b"raw"
+
+
+def test_pck_reader_truncated_pack_closes_on_error(tmp_path, monkeypatch):
+    from siglus_scene_script_utility import extract
+
+    hdr, head = _pack_layout([], [], [], [], ["a", "b"], [3, 3], 0)
+    p = tmp_path / "Scene.pck"
+    with open(p, "wb") as f:
+        _write_pack([(f, None)], hdr, head, [b"aaa", b"bbb"], [])
+    full = p.read_bytes()
+
+    for size in (0, C._PACK_HDR_SIZE - 1, C._PACK_HDR_SIZE + 4):
+        p.write_bytes(full[:size])
+        with extract.PckReader(str(p)) as pck:
+            assert pck.scenes() == []
+
+    opened = []
+
+    def spy(*a, **k):
+        opened.append(open(*a, **k))
+        return opened[-1]
+
+    def bad_header(dat):
+        raise struct.error("truncated")
+
+    monkeypatch.setattr(extract, "open", spy, raising=False)
+    monkeypatch.setattr(extract, "_parse_pack_header", bad_header)
+    p.write_bytes(full[: C._PACK_HDR_SIZE + 4])
+    with pytest.raises(struct.error):
+        extract.PckReader(str(p))
+    assert len(opened) == 1 and opened[0].closed
+
+
+class _ReadLog(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.reads = []
+
+    def read(self, n=-1):
+        b = super().read(n)
+        self.reads.append(len(b))
+        return b
+
+
+def test_patch_pack_shifts_reused_blobs_one_at_a_time():
+    code = bytes(range(1, 17))
+    rest = [bytes([i]) * (100 + i) for i in range(1, 9)]
+    chunks = [b"os-chunk"]
+    for first_old, first_new in ((b"a" * 10, b"A" * 500), (b"a" * 500, b"A" * 10)):
+        names = ["s%d" % i for i in range(len(rest) + 1)]
+        _, _, before = _pack([first_old] + rest, chunks, code, names)
+        hdr, head, want = _pack([first_new] + rest, chunks, code, names)
+
+        new_ofs = old_ofs = hdr["scn_data_list_ofs"]
+        old_ofs += len(first_old)
+        new_ofs += len(first_new)
+        segs = [(hdr["scn_data_list_ofs"], len(first_new), first_new, None, True)]
+        for b in rest:  # every reused blob moves by the same amount
+            segs.append((new_ofs, len(b), None, old_ofs, True))
+            new_ofs += len(b)
+            old_ofs += len(b)
+        segs.append((new_ofs, len(chunks[0]), chunks[0], old_ofs, False))
+        f = _ReadLog(before)
+        size, _ = _patch_pack(f, code, hdr, head, segs)
+        assert f.getvalue() == want
+        assert size == len(want)
+        # One blob in memory at a time (plus the header comparison)
+        assert max(f.reads[1:]) <= max(len(b) for b in rest)
@@ -0,0 +1,21 @@
+from siglus_scene_script_utility.parallel import compile_cost, order_by_cost
+
+
+def test_largest_first_keeps_ties_in_order():
+    cost = {"a": 1, "b": 5, "c": 1, "d": 3}
+    assert order_by_cost(list("abcd"), cost.get) == ["b", "d", "a", "c"]
+
+
+def test_compile_cost_uses_last_build_times_then_size(tmp_path):
+    paths = []
+    for name, size in (("a.ss", 100), ("big.ss", 5000), ("new.ss", 1000)):
+        p = tmp_path / name
+        p.write_bytes(b"x" * size)
+        paths.append(str(p))
+    ctx = {"compile_time_hint": {"a.ss": 2.0, "big.ss": 0.5}}
+    cost = compile_cost(ctx, paths)
+    # 2.5s for 5100 bytes: new.ss is estimated from its size at that rate
+    assert cost[paths[0]] == 2.0
+    assert abs(cost[paths[2]] - 1000 * 2.5 / 5100) < 1e-9
+    assert order_by_cost(paths, cost.get)[0] == paths[0]
+    assert compile_cost({}, paths)[paths[1]] == 5000
@@ -0,0 +1,16 @@
+from siglus_scene_script_utility.BS import (
+    _MSVCRand,
+    plan_shuffle_seeds,
+)
+
+
+def test_plan_shuffle_seeds_matches_serial_chain():
+    """Planned start states must match the serial per-file shuffle chain."""
+    counts = [1, 5, 0, 40, 2, 300]
+    seeds, final = plan_shuffle_seeds(counts, seed=1769178361)
+
+    rng = _MSVCRand(1769178361)
+    for n, seed in zip(counts, seeds):
+        assert rng.x == seed
+        rng.shuffle(list(range(n)))
+    assert rng.x == final
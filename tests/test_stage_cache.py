@@ -0,0 +1,91 @@
+import os
+
+from siglus_scene_script_utility.stage_cache import StageCache
+
+
+def test_stage_cache_roundtrip_and_lru_eviction(tmp_path):
+    """Entries round-trip and the least recently used ones are evicted first."""
+    cache = StageCache(str(tmp_path))
+    keys = [cache.front_key(b"src%d" % i, "ia", "cp932") for i in range(3)]
+    for i, k in enumerate(keys):
+        cache.put("bs", k, {"out_scn": bytes([i]) * 1000})
+        p = cache._path("bs", k)
+        os.utime(p, (1000 + i, 1000 + i))
+
+    assert cache.get("bs", keys[0]) == {"out_scn": b"\0" * 1000}
+    assert cache.get("la", keys[0]) is None
+
+    # keys[0] was just read, so keys[1] is now the oldest entry
+    one = os.path.getsize(cache._path("bs", keys[2]))
+    cache.evict(2 * one)
+    assert cache.get("bs", keys[1]) is None
+    assert cache.get("bs", keys[0]) is not None
+    assert cache.get("bs", keys[2]) is not None
+
+
+def test_lzss_cache_is_keyed_by_content(tmp_path):
+    """Scene LZSS blobs are reused by .dat bytes, level and easy code."""
+    from siglus_scene_script_utility.native_ops import lzss_pack_many
+    from siglus_scene_script_utility.parallel import lzss_compress_scenes
+
+    code = b"\x01\x02\x03"
+    dats = [b"scene one " * 50, b"scene two " * 50]
+    ctx = {"easy_angou_code": code, "lzss_level": 17, "stage_cache": str(tmp_path)}
+    first = lzss_compress_scenes(ctx, dats)
+    assert first == lzss_pack_many(dats, 17, code)
+
+    # A build in another tmp dir, same cache: hits come from the cache
+    ctx2 = dict(ctx)
+    ctx2.pop("_stage_cache")
+    cache = StageCache(str(tmp_path))
+    cache.put("lzss", cache.lzss_key(dats[0], 17, code), b"cached")
+    assert lzss_compress_scenes(ctx2, dats) == [b"cached", first[1]]
+
+    # Another level or easy code is a different entry
+    assert cache.lzss_key(dats[0], 5, code) != cache.lzss_key(dats[0], 17, code)
+    assert cache.lzss_key(dats[0], 17, b"\x09") != cache.lzss_key(dats[0], 17, code)
+    ctx3 = dict(ctx2, lzss_level=5)
+    ctx3.pop("_stage_cache")
+    assert lzss_compress_scenes(ctx3, dats)[0] != b"cached"
+
+
+def test_tool_version_follows_package_sources(tmp_path, monkeypatch):
+    """Editing any package source changes the version every key includes."""
+    from siglus_scene_script_utility import stage_cache
+
+    pkg = tmp_path / "pkg"
+    (pkg / "rust" / "src").mkdir(parents=True)
+    (pkg / "stage_cache.py").write_text("x = 1\n")
+    (pkg / "rust" / "src" / "lzss.rs").write_text("fn a() {}\n")
+    monkeypatch.setattr(stage_cache, "__file__", str(pkg / "stage_cache.py"))
+    versions = []
+    for edit in (None, "stage_cache.py", "rust/src/lzss.rs", "notes.txt"):
+        if edit:
+            with open(pkg / edit, "a") as f:
+                f.write("# changed\n")
+        monkeypatch.setattr(stage_cache, "_TOOL_VERSION", None)
+        versions.append(stage_cache.tool_version())
+    assert len(set(versions[:3])) == 3
+    assert versions[3] == versions[2]
+
+
+def test_debug_build_runs_ca_on_cache_hit(tmp_path):
+    """--debug --cache still writes tmp/ca dumps when the front key hits."""
+    from siglus_scene_script_utility import compiler
+    from siglus_scene_script_utility.BS import set_shuffle_seed
+
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "global.inc").write_text("#property $a : int\n", encoding="utf-8")
+    (src / "s0.ss").write_text('#z00\n$a = 1\nprint("hi")\n', encoding="utf-8")
+    cache = str(tmp_path / "cache")
+    outs = []
+    for i in range(2):
+        tmp = tmp_path / f"tmp{i}"
+        out = tmp_path / f"out{i}" / "Scene.pck"
+        argv = ["--no-os", "--debug", "--cache", cache, "--tmp", str(tmp)]
+        set_shuffle_seed(1)
+        assert compiler.main([*argv, str(src), str(out)]) == 0
+        assert (tmp / "ca" / "s0.txt").is_file()
+        outs.append(out.read_bytes())
+    assert outs[0] == outs[1]
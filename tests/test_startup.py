@@ -0,0 +1,88 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import siglus_scene_script_utility
+
+PKG = "siglus_scene_script_utility"
+
+# Cold-start budget per mode module (ms of cumulative import time, warm .pyc
+# cache), as documented in README.md under "Startup time".
+BUDGET_MS = {
+    "const": 10,
+    "extract": 60,
+    "analyze": 60,
+    "koe_collector": 60,
+    "exec": 60,
+    "compiler": 120,
+    "textmap": 120,
+}
+
+# Modules a mode must not pull in at import time
+NOT_LOADED = {
+    "const": ["CA", "compiler"],
+    "extract": ["compiler", "BS", "GEI", "linker"],
+    "analyze": ["compiler", "BS", "GEI", "linker"],
+    "koe_collector": ["compiler", "BS"],
+    "exec": ["const", "compiler"],
+}
+
+
+def _importtime(mod, pycache=None):
+    env = dict(os.environ)
+    if pycache is not None:
+        # Warm .pyc cache, kept out of the source tree
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        env["PYTHONPYCACHEPREFIX"] = str(pycache)
+    root = os.path.dirname(os.path.dirname(siglus_scene_script_utility.__file__))
+    env["PYTHONPATH"] = os.pathsep.join(
+        [root] + [p for p in [env.get("PYTHONPATH")] if p]
+    )
+    r = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {PKG}.{mod}"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    out = {}
+    for line in r.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = line.split("|")
+        try:
+            out[name.strip()] = int(cum) / 1000.0
+        except ValueError:
+            pass
+    return out
+
+
+def test_mode_imports_stay_lazy():
+    for mod, banned in NOT_LOADED.items():
+        loaded = _importtime(mod)
+        assert f"{PKG}.{mod}" in loaded
+        for b in banned:
+            assert f"{PKG}.{b}" not in loaded, (mod, b)
+
+
+def test_const_element_codes_load_on_first_use():
+    from siglus_scene_script_utility import const as C
+
+    assert C.ELM_GLOBAL_CUR_CALL == C.create_elm_code(0, 0, 83)
+    assert isinstance(C.ELM_GLOBAL_SEL, int)
+    assert C.is_global_sel_command(C.FM_GLOBAL, C.ELM_GLOBAL_SEL)
+    assert getattr(C, "ELM_NO_SUCH_ELEMENT", None) is None
+
+
+# Wall-clock budgets are flaky on shared CI runners, so only check them on
+# request (STARTUP_BUDGET=1); the laziness test above always runs.
+@pytest.mark.skipif(
+    os.environ.get("STARTUP_BUDGET") != "1", reason="set STARTUP_BUDGET=1 to run"
+)
+def test_mode_import_time_budget(tmp_path):
+    for mod, budget in BUDGET_MS.items():
+        _importtime(mod, tmp_path)  # warm the .pyc cache
+        best = min(_importtime(mod, tmp_path)[f"{PKG}.{mod}"] for _ in range(3))
+        assert best <= budget, f"{mod}: {best:.1f}ms > {budget}ms"
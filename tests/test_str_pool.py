@@ -0,0 +1,29 @@
+import struct
+
+from siglus_scene_script_utility.BS import _encode_str_pool, _str_key, _xor_u16
+
+
+def _encode_per_unit(sl, order):
+    out = bytearray()
+    for orig in order:
+        b = sl[orig].encode("utf-16le", "surrogatepass")
+        k = (28807 * orig) & 0xFFFFFFFF
+        for i in range(0, len(b), 2):
+            out.extend(struct.pack("<H", ((b[i] | (b[i + 1] << 8)) ^ k) & 0xFFFF))
+    return bytes(out)
+
+
+def test_str_pool_matches_per_unit_xor():
+    sl = ["", "abc", "日本語テキスト", "😀 \ud800", "x" * 3000, ""] * 7
+    order = list(range(len(sl)))[::-1]
+    pool, lens = _encode_str_pool(sl, order)
+    assert pool == _encode_per_unit(sl, order)
+    assert lens == [len(s.encode("utf-16le", "surrogatepass")) // 2 for s in sl]
+    assert _encode_str_pool([], []) == (b"", [])
+
+
+def test_str_xor_round_trip():
+    d = "セリフ\0end".encode("utf-16le")
+    k = _str_key(12345)
+    assert _xor_u16(_xor_u16(d, k), k) == d
+    assert _xor_u16(b"", k) == b""
@@ -0,0 +1,27 @@
+import json
+import time
+
+from siglus_scene_script_utility import tracing
+
+
+def test_trace_spans_written_as_chrome_events(tmp_path):
+    """Recorded spans round-trip to a Chrome trace-event file."""
+    tracing.enable()
+    try:
+        t = time.time()
+        tracing.record("BS", "a.ss", t, bytes_out=12)
+        worker = tracing.take_events()
+        assert tracing.take_events() == []
+        tracing.add_events(worker)
+        out = tmp_path / "trace.json"
+        tracing.write_trace(str(out))
+    finally:
+        tracing.enable(False)
+
+    events = json.loads(out.read_text(encoding="utf-8"))["traceEvents"]
+    spans = [e for e in events if e["ph"] == "X"]
+    assert [e["name"] for e in spans] == ["BS a.ss"]
+    assert spans[0]["args"] == {"file": "a.ss", "bytes_out": 12}
+    assert any(e["ph"] == "M" and e["pid"] == spans[0]["pid"] for e in events)
+    tracing.record("BS", "b.ss", t)
+    assert tracing.take_events() is None
@@ -0,0 +1,69 @@
+import sys
+import threading
+
+from siglus_scene_script_utility import compiler, watch
+from siglus_scene_script_utility.BS import set_shuffle_seed
+
+
+def _project(root):
+    root.mkdir()
+    (root / "global.inc").write_text(
+        "#define MAXV 10\n#property $a : int\n", encoding="utf-8"
+    )
+    for i in range(3):
+        (root / f"s{i}.ss").write_text(
+            f'#z00\n$a = MAXV + {i}\nprint("scene {i}")\n', encoding="utf-8"
+        )
+    return root
+
+
+class _Script:
+    """stdin stand-in: yields each command once the build before it is done."""
+
+    def __init__(self, steps, builds, rcs):
+        self.steps = steps
+        self.builds = builds
+        self.rcs = rcs
+
+    def fileno(self):
+        raise OSError("no fd")
+
+    def __iter__(self):
+        for wait_for, action, line in self.steps:
+            # On timeout send the command anyway; the test's asserts fail
+            with self.builds:
+                self.builds.wait_for(lambda: len(self.rcs) >= wait_for, 60)
+            if action:
+                action()
+            yield line + "\n"
+
+
+def test_watch_rebuilds_and_matches_one_shot_build(tmp_path, monkeypatch):
+    src = _project(tmp_path / "src")
+    out = tmp_path / "out" / "Scene.pck"
+    builds = threading.Condition()
+    rcs = []
+    build = watch._build
+
+    def counted(argv, session):
+        rc = build(argv, session)
+        with builds:
+            rcs.append(rc)
+            builds.notify_all()
+        return rc
+
+    def edit():
+        (src / "s1.ss").write_text('#z00\n$a = 5\nprint("edited")\n', encoding="utf-8")
+
+    monkeypatch.setattr(watch, "_build", counted)
+    steps = [(1, None, "build"), (2, edit, "build"), (3, None, "quit")]
+    monkeypatch.setattr(sys, "stdin", _Script(steps, builds, rcs))
+    # --wat is an abbreviation argparse resolves to --watch
+    argv = ["--no-os", "--wat", "--tmp", str(tmp_path / "tmp"), str(src), str(out)]
+    assert compiler.main(argv) == 0
+    assert len(rcs) >= 3 and set(rcs) == {0}
+
+    one = tmp_path / "one" / "Scene.pck"
+    set_shuffle_seed(1)
+    assert compiler.main(["--no-os", str(src), str(one)]) == 0
+    assert out.read_bytes() == one.read_bytes()